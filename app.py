@@ -1,13 +1,36 @@
 import streamlit as st
 from datetime import date
-import xml.etree.ElementTree as ET
-import yfinance as yf
+import os
+import threading
+import uuid
 import pandas as pd
 
-from prophet import Prophet
-from neuralprophet import NeuralProphet
 import plotly.graph_objects as go
 
+from stockpred.companies import DEFAULT_COMPANIES_XML
+from stockpred.api import (
+    ForecastResult, default_forecast_store, default_model_store, default_price_store, forecast, load_prices,
+    portfolio_summary, stored_forecast, stored_forecast_key, stream_prices, streaming_training_frame,
+    training_frame, tuned_params,
+)
+from stockpred.backtest import DEFAULT_FOLDS, backtest, summarize
+from stockpred.engines import ENGINES
+from stockpred.figures import (
+    FORECAST_COLOR, SerializedFigure, backtest_figure, component_figure, forecast_figure, monthly_figure,
+    portfolio_figure,
+)
+from stockpred.forecast_store import ForecastStore
+from stockpred.http_api import API_PORT_ENV_VAR, create_app, start_api_server
+from stockpred.jobs import CANCELLED, DONE, FAILED, Job, JobManager
+from stockpred.model_store import ModelStore
+from stockpred.prefetch import prefetch
+from stockpred.price_store import DEFAULT_INTERVAL, PriceStore
+from stockpred.render_cache import SizedLRU, intraday_cache_bytes, render_cache_bytes
+from stockpred.singleflight import flight_stats
+from stockpred.symbols import SymbolIndex
+from stockpred.trading_calendar import exchange_for_ticker, future_trading_days
+from stockpred.tracing import METRICS_PORT_ENV_VAR, RECORDER, labels, start_metrics_server, trace
+
 from PIL import Image
 import io
 import base64
@@ -459,83 +482,174 @@ div.element-container{
 )
 
 # -----------------------------
-# Load companies.xml
+# Load companies.xml (as a prefix / fuzzy search index, cached on disk)
 # -----------------------------
-@st.cache_data
-def load_companies_from_xml(xml_path: str = r"./Assets/companies.xml") -> dict:
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-    companies = {}
-    for company in root.findall("company"):
-        name = company.find("name").text.strip()
-        ticker = company.find("ticker").text.strip()
-        companies[name] = ticker
-    return companies
-
-companies = load_companies_from_xml()
-options = [f"{name} ({ticker})" for name, ticker in companies.items()]
+# Matches offered by the company pickers; the browser filters these as you type
+SEARCH_LIMIT = 200
+
+@st.cache_resource
+def load_symbol_index(xml_path: str = DEFAULT_COMPANIES_XML) -> SymbolIndex:
+    return SymbolIndex.load(xml_path)
+
+symbols = load_symbol_index()
+companies = symbols.companies()
+default_ticker = symbols.prefix("", 1)[0] if len(symbols) else None
 
 # -----------------------------
 # Load Yahoo Finance Data
 # -----------------------------
-@st.cache_data
-def load_data(ticker: str, start_dt, end_dt) -> pd.DataFrame:
-    df = yf.download(
-        ticker,
-        start=start_dt,
-        end=end_dt,
-        auto_adjust=True,
-        progress=False,
-        group_by="column",
+@st.cache_resource
+def get_price_store() -> PriceStore:
+    return default_price_store()
+
+# Warm the local store for the whole companies.xml universe once per server
+@st.cache_resource
+def start_prefetch() -> threading.Thread:
+    thread = threading.Thread(
+        target=prefetch,
+        args=(get_price_store(), list(companies.values()), date(2016, 1, 1), date(2026, 1, 1)),
+        name="stockpred-prefetch",
+        daemon=True,
     )
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    df = df.reset_index()
-    if "Date" in df.columns:
-        df["Date"] = pd.to_datetime(df["Date"]).dt.date
-    return df.reset_index(drop=True)
+    thread.start()
+    return thread
+
+if os.environ.get("STOCKPRED_PREFETCH_ON_BOOT", "1") != "0":
+    start_prefetch()
+
+# Prometheus text endpoint for the stage timings, e.g. STOCKPRED_METRICS_PORT=9108
+@st.cache_resource
+def get_metrics_server(port: int):
+    return start_metrics_server(port)
+
+if os.environ.get(METRICS_PORT_ENV_VAR):
+    get_metrics_server(int(os.environ[METRICS_PORT_ENV_VAR]))
+
+# Bar intervals offered by the app (price_store.INTERVALS lists all the store accepts)
+BAR_INTERVALS = {"1d": "Daily", "1h": "Hourly", "5m": "5-minute"}
+
+# One shared frame per ticker and range: its columns are read-only views of the price store's
+# memory-mapped file, so sessions share them instead of each unpickling a copy (cache_data)
+@st.cache_resource(max_entries=256)
+def load_data(ticker: str, start_dt, end_dt) -> pd.DataFrame:
+    return load_prices(ticker, start_dt, end_dt, prices=get_price_store())
+
+# Intraday ranges are streamed a chunk at a time and never held whole: only the daily training
+# frame and the latest chunk (for display) are kept, shared by sessions like load_data's frames
+@st.cache_resource
+def get_intraday_cache() -> SizedLRU:
+    return SizedLRU(intraday_cache_bytes())
+
+def load_intraday(ticker: str, start_dt, end_dt, interval: str, engine: str, progress=None) -> dict:
+    key = (ticker, start_dt, end_dt, interval, engine)
+    loaded = get_intraday_cache().get(key)
+    if loaded is not None:
+        return loaded
+    loaded = {"bars": 0, "latest": None}
+
+    def chunks():
+        for chunk in stream_prices(ticker, start_dt, end_dt, interval=interval, prices=get_price_store(),
+                                   progress=progress):
+            loaded["bars"] += len(chunk)
+            loaded["latest"] = chunk
+            yield chunk
+
+    loaded["history"] = streaming_training_frame(engine, chunks())
+    nbytes = sum(int(f.memory_usage(deep=True).sum()) for f in (loaded["history"], loaded["latest"]) if f is not None)
+    get_intraday_cache().put(key, loaded, nbytes)
+    return loaded
 
 # -----------------------------
-# Prophet / NeuralProphet helpers
+# Fitted-model cache (shared by all sessions of this server)
 # -----------------------------
-def to_prophet_df(df_prices: pd.DataFrame) -> pd.DataFrame:
-    df = df_prices[["Date", "Close"]].rename(columns={"Date": "ds", "Close": "y"}).copy()
-    df["ds"] = pd.to_datetime(df["ds"])
-    return df.dropna()
-
-def to_neuralprophet_df(df_prices: pd.DataFrame) -> pd.DataFrame:
-    df = df_prices[["Date", "Close"]].rename(columns={"Date": "ds", "Close": "y"}).copy()
-    df["ds"] = pd.to_datetime(df["ds"])
-    return df.dropna()
-
-def monthly_summary_from_yhat(forecast_future: pd.DataFrame, yhat_col: str) -> pd.DataFrame:
-    out = forecast_future.copy()
-    out["month"] = pd.to_datetime(out["ds"]).dt.month
-    return out.groupby("month", as_index=False)[yhat_col].mean()
-
-def find_yearly_col(df: pd.DataFrame):
-    if "yearly" in df.columns:
-        return "yearly"
-    yearly_cols = [c for c in df.columns if "yearly" in c.lower()]
-    return yearly_cols[0] if yearly_cols else None
+@st.cache_resource
+def get_model_store() -> ModelStore:
+    return default_model_store()
+
+# Nightly `forecast-all` results; live fits are written back on a miss
+@st.cache_resource
+def get_forecast_store() -> ForecastStore:
+    return default_forecast_store()
+
+# Companies in one portfolio comparison; the job pool is as wide so a full portfolio fits at once
+MAX_PORTFOLIO = 8
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    return JobManager(max_workers=MAX_PORTFOLIO)
+
+# HTTP forecast API in this process, so a fit from either side serves both
+@st.cache_resource
+def get_api_server(port: int):
+    app = create_app(
+        companies=companies, prices=get_price_store(),
+        models=get_model_store(), forecasts=get_forecast_store(),
+    )
+    return start_api_server(app, port)
+
+if os.environ.get(API_PORT_ENV_VAR):
+    get_api_server(int(os.environ[API_PORT_ENV_VAR]))
 
 # -----------------------------
 # Session State Defaults
 # -----------------------------
+# Widgets hold tickers; names and labels come from the index, never from parsing a label
 if "selected_company" not in st.session_state:
-    st.session_state.selected_company = options[0] if options else None
+    st.session_state.selected_company = default_ticker
+if "symbol_query" not in st.session_state:
+    st.session_state.symbol_query = ""
 if "start_date" not in st.session_state:
     st.session_state.start_date = date(2016, 1, 1)
 if "end_date" not in st.session_state:
     st.session_state.end_date = date(2026, 1, 1)
 if "forecast_years" not in st.session_state:
     st.session_state.forecast_years = 1
+if "interval" not in st.session_state:
+    st.session_state.interval = DEFAULT_INTERVAL
+
+if "forecast_request" not in st.session_state:
+    st.session_state.forecast_request = None
+if "portfolio" not in st.session_state:
+    st.session_state.portfolio = []
+if "portfolio_request" not in st.session_state:
+    st.session_state.portfolio_request = None
+if "_session_id" not in st.session_state:
+    st.session_state["_session_id"] = uuid.uuid4().hex
+session_id = st.session_state["_session_id"]
+
+def release_forecast_request():
+    # Stop waiting for the current job; it is cancelled once no session needs it
+    request = st.session_state.forecast_request
+    if request and request.get("key"):
+        get_job_manager().release(request["key"], session_id)
+    st.session_state.forecast_request = None
+
+def release_portfolio_request():
+    request = st.session_state.portfolio_request
+    if request:
+        for key in request.get("keys", {}).values():
+            get_job_manager().release(key, session_id)
+    st.session_state.portfolio_request = None
+    st.session_state.pop("_portfolio_results", None)
+
+def pick_top_match():
+    # A new search selects its best match; the dropdown lists the rest
+    if not st.session_state.get("portfolio_mode"):
+        matches = symbols.search(st.session_state.symbol_query, 1)
+        if matches:
+            st.session_state.selected_company = matches[0]
 
 def clear_selection():
-    st.session_state.selected_company = options[0] if options else None
+    st.session_state.selected_company = default_ticker
+    st.session_state.symbol_query = ""
     st.session_state.start_date = date(2016, 1, 1)
     st.session_state.end_date = date(2026, 1, 1)
     st.session_state.forecast_years = 1
+    st.session_state.interval = DEFAULT_INTERVAL
+    st.session_state.portfolio_mode = False
+    st.session_state.portfolio = []
+    release_forecast_request()
+    release_portfolio_request()
 
 # -----------------------------
 # Header image (Assets/stock.jpg)
@@ -582,7 +696,27 @@ with center_col:
         """,
         unsafe_allow_html=True,
     )
-    selected = st.selectbox("", options, key="selected_company", label_visibility="collapsed")
+    st.text_input(
+        "", key="symbol_query", on_change=pick_top_match, label_visibility="collapsed",
+        placeholder="🔎 Search by company name or ticker",
+    )
+    matches = symbols.search(st.session_state.symbol_query, SEARCH_LIMIT)
+    portfolio_mode = st.toggle("📂 Compare a portfolio", key="portfolio_mode")
+    if portfolio_mode:
+        # Chosen companies stay selectable whatever the current search shows
+        chosen = st.session_state.portfolio
+        st.multiselect(
+            "", chosen + [t for t in matches if t not in chosen], key="portfolio", format_func=symbols.label,
+            max_selections=MAX_PORTFOLIO, label_visibility="collapsed",
+            placeholder=f"Pick up to {MAX_PORTFOLIO} companies",
+        )
+        selected_ticker = None
+    else:
+        current = st.session_state.selected_company
+        selected_ticker = st.selectbox(
+            "", matches if current in matches or current is None else [current] + matches,
+            key="selected_company", format_func=symbols.label, label_visibility="collapsed",
+        )
     st.markdown("</div></div>", unsafe_allow_html=True)
 
 st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
@@ -625,6 +759,15 @@ with center_col2:
         unsafe_allow_html=True,
     )
     st.slider("", 1, 10, key="forecast_years", label_visibility="collapsed")
+    st.radio(
+        "Bars", list(BAR_INTERVALS), format_func=BAR_INTERVALS.get, key="interval", horizontal=True,
+        disabled=bool(st.session_state.get("portfolio_mode")),
+    )
+    if st.session_state.interval != DEFAULT_INTERVAL:
+        st.caption(
+            "Yahoo serves hourly bars for the last 730 days and 5-minute bars for the last 60. "
+            "Intraday history loads chunk by chunk; forecasts train on each day's last close."
+        )
     st.markdown("</div></div>", unsafe_allow_html=True)
 
 # Recommendation
@@ -643,6 +786,9 @@ st.markdown(
       <span class="reco-pill">Compare</span>
       Use <strong>NeuralProphet</strong> for experimentation and comparison, but for dependable results,
       <strong>Prophet is the best starting point</strong>.
+      <br><br>
+      <span class="reco-pill">Measure</span>
+      <strong>Compare Engines</strong> below backtests both on past prices of the selected stock.
     </div>
   </div>
 </div>
@@ -663,233 +809,545 @@ with b3:
 # -----------------------------
 # Convenience Variables
 # -----------------------------
-selected_name, selected_ticker = None, None
 n_days = int(st.session_state.forecast_years) * 365
-if selected:
-    selected_name = selected.split(" (")[0]
-    selected_ticker = companies[selected_name]
+selected_name = symbols.name(selected_ticker) if selected_ticker else None
+
+def request_forecast(engine: str):
+    # A new click supersedes this session's previous request
+    release_forecast_request()
+    st.session_state.forecast_request = dict(
+        engine=engine,
+        name=selected_name,
+        ticker=selected_ticker,
+        start=st.session_state.start_date,
+        end=st.session_state.end_date,
+        years=int(st.session_state.forecast_years),
+        periods=n_days,
+        interval=st.session_state.interval,
+        # Sweep winner for this ticker (python -m stockpred sweep), None for engine defaults
+        params=tuned_params(selected_ticker, engine),
+        fresh=True,
+    )
+    release_portfolio_request()
+
+def request_portfolio(engine: str):
+    release_portfolio_request()
+    release_forecast_request()
+    st.session_state.portfolio_request = dict(
+        engine=engine,
+        start=st.session_state.start_date,
+        end=st.session_state.end_date,
+        years=int(st.session_state.forecast_years),
+        periods=n_days,
+        members=[
+            dict(name=symbols.name(ticker), ticker=ticker, params=tuned_params(ticker, engine))
+            for ticker in st.session_state.portfolio
+        ],
+        fresh=True,
+    )
+
+def portfolio_members(request: dict) -> list:
+    # One single-forecast request per company, so portfolio fits share jobs and caches with the single view
+    common = {k: v for k, v in request.items() if k not in ("members", "fresh", "keys")}
+    return [{**common, **member} for member in request["members"]]
 
 # -----------------------------
 # Shared: load & show raw data
 # -----------------------------
-def show_raw_data(ticker: str):
-    data = load_data(ticker, st.session_state.start_date, st.session_state.end_date)
+def show_raw_data(ticker: str, start_dt, end_dt):
+    with trace("load_data", ticker=ticker):
+        data = load_data(ticker, start_dt, end_dt)
     st.markdown("<div class='spacer-md'></div>", unsafe_allow_html=True)
     st.subheader("📥 Raw Stock Data")
     st.write(
-        f"Data from {st.session_state.start_date} to {st.session_state.end_date} "
+        f"Data from {start_dt} to {end_dt} "
         f"({len(data)} rows)"
     )
     if data.empty:
         st.error("No data available for the selected range.")
         st.stop()
-    st.dataframe(data, use_container_width=True, hide_index=True)
+    st.dataframe(
+        data, use_container_width=True, hide_index=True,
+        column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")},
+    )
     return data
 
-# ============================================================
-# Prophet Forecasting & Plots (Weekly plot removed)
-# ============================================================
-if prophet_clicked:
-    st.success(
-        f"Running **Prophet** forecast for **{selected_name}** ({selected_ticker}) "
-        f"for **{st.session_state.forecast_years} year(s)** (≈ {n_days} days)."
+def show_intraday_data(ticker: str, start_dt, end_dt, interval: str, engine: str) -> pd.DataFrame:
+    # Progressive load of intraday bars; returns the training frame
+    st.markdown("<div class='spacer-md'></div>", unsafe_allow_html=True)
+    st.subheader("📥 Raw Stock Data")
+    bar = st.progress(0.0, text=f"Loading {BAR_INTERVALS[interval].lower()} bars…")
+    with trace("load_data", ticker=ticker, interval=interval):
+        loaded = load_intraday(ticker, start_dt, end_dt, interval, engine,
+                               progress=lambda fraction, message: bar.progress(fraction, text=message))
+    bar.empty()
+    st.write(
+        f"{BAR_INTERVALS[interval]} bars from {start_dt} to {end_dt} "
+        f"({loaded['bars']} rows, {len(loaded['history'])} trading days)"
     )
+    if loaded["latest"] is None:
+        st.error("No data available for the selected range.")
+        st.stop()
+    st.dataframe(
+        loaded["latest"], use_container_width=True, hide_index=True,
+        column_config={"Date": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm")},
+    )
+    st.caption(f"Latest {len(loaded['latest'])} bars shown; the forecast trains on each day's last close.")
+    return loaded["history"]
 
-    data = show_raw_data(selected_ticker)
-    df_p = to_prophet_df(data)
+def plotly_chart(fig: go.Figure, chart: str):
+    with trace("plotly_chart", chart=chart):
+        st.plotly_chart(fig, use_container_width=True)
 
-    if len(df_p) < 2:
-        st.error("Not enough valid data points to train the Prophet model.")
+# ============================================================
+# Forecast tables & plots (shared by both engines; weekly plot removed)
+# ============================================================
+def build_forecast_view(label: str, name: str, result: ForecastResult) -> dict:
+    # Everything the forecast section shows; cached per forecast key so reruns skip rebuilding it
+    ticker, df, forecast = result.ticker, result.history, result.forecast
+    yhat_col = result.yhat_col
+    if yhat_col is None:
+        st.error(f"{label} forecast does not contain a yhat column (e.g., yhat1).")
         st.stop()
 
-    model = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
-    model.fit(df_p)
+    lower_col = f"{yhat_col}_lower" if f"{yhat_col}_lower" in forecast.columns else None
+    upper_col = f"{yhat_col}_upper" if f"{yhat_col}_upper" in forecast.columns else None
 
-    future = model.make_future_dataframe(periods=n_days, freq="D")
-    forecast = model.predict(future)
+    forecast_future = result.future
+    cols = ["ds", yhat_col]
+    if lower_col and upper_col:
+        cols += [lower_col, upper_col]
 
-    last_hist = df_p["ds"].max()
-    forecast_future = forecast[forecast["ds"] > last_hist].copy()
+    sections = [(
+        f"📈 Actual vs Forecast ({label})", "actual_vs_forecast",
+        forecast_figure(f"{name} ({ticker}) — Actual vs Forecast", df, forecast, yhat_col, lower_col, upper_col),
+    )]
+    if "trend" in forecast.columns:
+        fig = component_figure(f"{name} — Trend Component", forecast, "trend", name="Trend", yaxis_title="Trend")
+    else:
+        fig = f"Trend component is not available in this {label} forecast output."
+    sections.append((f"📉 Trend ({label})", "trend", fig))
+    yearly_col = result.yearly_col
+    if yearly_col:
+        fig = component_figure(f"{name} — Yearly Seasonality", forecast, yearly_col, name="Yearly",
+                               yaxis_title="Seasonality Effect", color=FORECAST_COLOR)
+    else:
+        fig = "Yearly seasonality is not available in this forecast output."
+    sections.append((f"🗓️ Yearly Seasonality ({label})", "yearly", fig))
+    sections.append((
+        f"📅 Monthly Component ({label})", "monthly",
+        monthly_figure(f"{name} — Monthly Component (Avg Forecasted Price)", result.monthly, yhat_col),
+    ))
 
-    st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("📊 Forecasting Data Table (Prophet)")
-    st.dataframe(
-        forecast_future[["ds", "yhat", "yhat_lower", "yhat_upper"]].reset_index(drop=True),
-        use_container_width=True,
-        hide_index=True,
+    table = forecast_future[cols].reset_index(drop=True)
+    # Figures are kept as their JSON: serialized once here, then every hit ships it as is
+    sections = [
+        (subheader, chart, SerializedFigure.of(fig) if isinstance(fig, go.Figure) else fig)
+        for subheader, chart, fig in sections
+    ]
+    # Budget by what the view costs to hold and to ship: table memory plus figure JSON
+    nbytes = int(table.memory_usage(deep=True).sum()) + sum(
+        fig.nbytes for _, _, fig in sections if isinstance(fig, SerializedFigure)
     )
+    return {"label": label, "table": table, "sections": sections, "params": result.params, "nbytes": nbytes}
 
+def show_forecast_view(view: dict):
     st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("📈 Actual vs Forecast (Prophet)")
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df_p["ds"], y=df_p["y"], mode="lines", name="Actual",
-                             line=dict(color="#FF6B6B", width=2)))
-    fig.add_trace(go.Scatter(x=forecast["ds"], y=forecast["yhat"], mode="lines", name="Forecast",
-                             line=dict(color="#4D96FF", width=2)))
-    fig.add_trace(go.Scatter(x=forecast["ds"], y=forecast["yhat_upper"], mode="lines",
-                             line=dict(width=0), showlegend=False))
-    fig.add_trace(go.Scatter(x=forecast["ds"], y=forecast["yhat_lower"], mode="lines",
-                             fill="tonexty", fillcolor="rgba(77,150,255,0.30)",
-                             line=dict(width=0), name="Confidence Interval"))
-    fig.update_layout(
-        title=f"{selected_name} ({selected_ticker}) — Actual vs Forecast",
-        xaxis_title="Date", yaxis_title="Adjusted Close (USD)",
-        template="plotly_dark", hovermode="x unified",
-        margin=dict(l=30, r=30, t=60, b=30),
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.subheader(f"📊 Forecasting Data Table ({view['label']})")
+    if view.get("params"):
+        tuned = ", ".join(f"{k}={v}" for k, v in sorted(view["params"].items()))
+        st.caption(f"Tuned for this stock by the hyperparameter sweep: {tuned}")
+    st.dataframe(view["table"], use_container_width=True, hide_index=True)
 
-    st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("📉 Trend (Prophet)")
-    fig_trend = go.Figure()
-    fig_trend.add_trace(go.Scatter(x=forecast["ds"], y=forecast["trend"], mode="lines", name="Trend",
-                                   line=dict(color="#00D2A8", width=2)))
-    fig_trend.update_layout(
-        title=f"{selected_name} — Trend Component",
-        xaxis_title="Date", yaxis_title="Trend",
-        template="plotly_dark", hovermode="x unified",
-        margin=dict(l=30, r=30, t=60, b=30),
+    for subheader, chart, fig in view["sections"]:
+        st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
+        st.subheader(subheader)
+        if isinstance(fig, go.Figure):
+            plotly_chart(fig, chart)
+        else:
+            st.info(fig)
+
+@st.cache_resource
+def get_render_cache() -> SizedLRU:
+    return SizedLRU(render_cache_bytes())
+
+# ============================================================
+# Forecast jobs (fits run off the script thread, shared across sessions)
+# ============================================================
+ENGINE_LABELS = {"prophet": "Prophet", "neuralprophet": "NeuralProphet"}
+
+def forecast_key(request: dict, df: pd.DataFrame) -> str:
+    # Jobs and rendered views are keyed like the forecast store, price digest included, so new prices
+    # for the same window never reuse an older fit
+    return stored_forecast_key(
+        request["ticker"], request["start"], request["end"], request["engine"], history=df,
+        periods=request["periods"], params=request.get("params"), interval=request.get("interval", DEFAULT_INTERVAL),
     )
-    st.plotly_chart(fig_trend, use_container_width=True)
 
-    st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("🗓️ Yearly Seasonality (Prophet)")
-    yearly_col = find_yearly_col(forecast)
-    if yearly_col:
-        fig_yearly = go.Figure()
-        fig_yearly.add_trace(go.Scatter(x=forecast["ds"], y=forecast[yearly_col], mode="lines", name="Yearly",
-                                        line=dict(color="#4D96FF", width=2)))
-        fig_yearly.update_layout(
-            title=f"{selected_name} — Yearly Seasonality",
-            xaxis_title="Date", yaxis_title="Seasonality Effect",
-            template="plotly_dark", hovermode="x unified",
-            margin=dict(l=30, r=30, t=60, b=30),
+def submit_forecast_job(request: dict, df: pd.DataFrame, key: str, fresh: bool = False) -> Job:
+    model_store, forecast_store = get_model_store(), get_forecast_store()
+
+    def work(job: Job) -> ForecastResult:
+        return forecast(
+            request["ticker"], request["start"], request["end"], engine=request["engine"],
+            periods=request["periods"], history=df, prices=get_price_store(),
+            models=model_store, forecasts=forecast_store, params=request.get("params") or {},
+            interval=request.get("interval", DEFAULT_INTERVAL), progress=job.report,
         )
-        st.plotly_chart(fig_yearly, use_container_width=True)
-    else:
-        st.info("Yearly seasonality is not available in this forecast output.")
 
-    st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("📅 Monthly Component (Prophet)")
-    mdf = monthly_summary_from_yhat(forecast_future, "yhat")
-    fig_month = go.Figure()
-    fig_month.add_trace(go.Scatter(x=mdf["month"], y=mdf["yhat"], mode="lines+markers", name="Avg Forecast",
-                                   line=dict(color="#00D2A8", width=2), marker=dict(size=8)))
-    fig_month.update_layout(
-        title=f"{selected_name} — Monthly Component (Avg Forecasted Price)",
-        xaxis_title="Month", yaxis_title="Average Forecasted Price",
-        xaxis=dict(dtick=1), template="plotly_dark",
-        margin=dict(l=30, r=30, t=60, b=30),
-    )
-    st.plotly_chart(fig_month, use_container_width=True)
+    return get_job_manager().submit(key, work, owner=session_id, fresh=fresh)
 
-# ============================================================
-# NeuralProphet Forecasting & Plots (Weekly plot removed)
-# ============================================================
-if neural_clicked:
+@st.fragment(run_every=1.0)
+def show_job_progress(key: str):
+    job = get_job_manager().get(key)
+    if job is None or job.done:
+        st.rerun()
+    st.progress(job.progress, text=job.message)
+    if st.button("✖ Cancel", key="cancel_forecast_job"):
+        release_forecast_request()
+        st.rerun()
+
+def show_performance(request: dict):
+    spans = RECORDER.latest(ticker=request["ticker"], engine=request["engine"])
+    with st.expander("⏱️ Performance", expanded=False):
+        if not spans:
+            st.caption("No timings recorded for this forecast yet.")
+            return
+        mb = 1024 * 1024
+        st.dataframe(
+            pd.DataFrame({
+                "stage": [s["stage"] + (f" ({s['chart']})" if "chart" in s else "") for s in spans],
+                "wall (ms)": [round(s["wall"] * 1000, 1) for s in spans],
+                "cpu (ms)": [round(s["cpu"] * 1000, 1) for s in spans],
+                "peak RSS (MB)": [round(s["peak_rss"] / mb, 1) if s["peak_rss"] is not None else None for s in spans],
+                "RSS growth (MB)": [round(s["rss_growth"] / mb, 1) if s["rss_growth"] is not None else None for s in spans],
+                "status": [s["status"] for s in spans],
+            }),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.caption("All sessions on this server, by stage (seconds)")
+        st.dataframe(pd.DataFrame(RECORDER.summary()).round(4), use_container_width=True, hide_index=True)
+        cache = get_render_cache().stats()
+        st.caption(
+            f"Render cache: {cache['items']} views, {cache['bytes'] / mb:.1f} / {cache['max_bytes'] / mb:.0f} MB, "
+            f"{cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions"
+        )
+        flights = "; ".join(
+            f"{f['name']}: {f['hits']} hits, {f['misses']} misses, {f['coalesced']} coalesced, {f['inflight']} running"
+            for f in flight_stats()
+        )
+        if flights:
+            st.caption(f"Shared computations (downloads and fits): {flights}")
+
+def show_forecast_request(request: dict):
+    with labels(ticker=request["ticker"], engine=request["engine"]):
+        _show_forecast_request(request)
+    show_performance(request)
+
+def _show_forecast_request(request: dict):
+    engine, label = request["engine"], ENGINE_LABELS[request["engine"]]
     st.success(
-        f"Running **NeuralProphet** forecast for **{selected_name}** ({selected_ticker}) "
-        f"for **{st.session_state.forecast_years} year(s)** (≈ {n_days} days)."
+        f"Running **{label}** forecast for **{request['name']}** ({request['ticker']}) "
+        f"for **{request['years']} year(s)** "
+        f"(≈ {len(future_trading_days(request['end'], request['periods'], exchange_for_ticker(request['ticker'])))} "
+        f"trading days)."
     )
 
-    data = show_raw_data(selected_ticker)
-    df_np = to_neuralprophet_df(data)
+    interval = request.get("interval", DEFAULT_INTERVAL)
+    if interval == DEFAULT_INTERVAL:
+        df = training_frame(engine, show_raw_data(request["ticker"], request["start"], request["end"]))
+    else:
+        df = show_intraday_data(request["ticker"], request["start"], request["end"], interval, engine)
 
-    if len(df_np) < 2:
-        st.error("Not enough valid data points to train the NeuralProphet model.")
+    if len(df) < 2:
+        st.error(f"Not enough valid data points to train the {label} model.")
         st.stop()
 
-    np_model = NeuralProphet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False, epochs=50)
-    np_model.fit(df_np, freq="D")
+    key = forecast_key(request, df)
+    if request.get("key") not in (None, key):
+        # The prices changed since the last run: stop waiting for the fit of the old ones
+        get_job_manager().release(request["key"], session_id)
+    request["key"] = key
+    fresh = request.pop("fresh", False)
+    view = get_render_cache().get(key)
+    if view is not None:
+        show_forecast_view(view)
+        return
 
-    future_np = np_model.make_future_dataframe(df_np, periods=n_days, n_historic_predictions=True)
-    fc_np = np_model.predict(future_np)
+    result = stored_forecast(
+        request["ticker"], request["start"], request["end"], engine=engine,
+        history=df, periods=request["periods"], forecasts=get_forecast_store(), params=request.get("params"),
+        interval=interval,
+    )
+    if result is None:
+        job = get_job_manager().get(key)
+        if job is None or fresh:
+            job = submit_forecast_job(request, df, key, fresh)
+        if not job.done:
+            st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
+            show_job_progress(key)
+            return
+        if job.status == CANCELLED:
+            st.info(f"The {label} forecast was cancelled.")
+            return
+        if job.status == FAILED:
+            st.error(f"The {label} forecast failed: {job.error}")
+            return
+        result = job.result
 
-    yhat_col = "yhat1" if "yhat1" in fc_np.columns else None
-    if yhat_col is None:
-        yhat_candidates = [c for c in fc_np.columns if c.lower().startswith("yhat")]
-        if not yhat_candidates:
-            st.error("NeuralProphet forecast does not contain a yhat column (e.g., yhat1).")
-            st.stop()
-        yhat_col = yhat_candidates[0]
+    with trace("build_view"):
+        view = build_forecast_view(label, request["name"], result)
+    get_render_cache().put(key, view, view["nbytes"])
+    show_forecast_view(view)
 
-    lower_col = f"{yhat_col}_lower" if f"{yhat_col}_lower" in fc_np.columns else None
-    upper_col = f"{yhat_col}_upper" if f"{yhat_col}_upper" in fc_np.columns else None
+# ============================================================
+# Portfolio comparison (one forecast job per company, fitted side by side)
+# ============================================================
+def collect_portfolio(request: dict, fresh: bool = False) -> dict:
+    # Finished results (or error messages) by ticker in the order they finished; submits missing jobs
+    finished = st.session_state.setdefault("_portfolio_results", {})
+    # Job key per ticker, set once its prices are loaded
+    keys = request.setdefault("keys", {})
+    for member in portfolio_members(request):
+        ticker, engine = member["ticker"], member["engine"]
+        if ticker in finished:
+            continue
+        job = get_job_manager().get(keys[ticker]) if ticker in keys else None
+        if job is None or fresh:
+            df = training_frame(engine, load_data(ticker, member["start"], member["end"]))
+            if len(df) < 2:
+                finished[ticker] = f"Not enough valid data points to train the {ENGINE_LABELS[engine]} model."
+                continue
+            keys[ticker] = forecast_key(member, df)
+            result = stored_forecast(
+                ticker, member["start"], member["end"], engine=engine, history=df, periods=member["periods"],
+                forecasts=get_forecast_store(), params=member.get("params"),
+            )
+            if result is not None:
+                finished[ticker] = result
+                continue
+            job = submit_forecast_job(member, df, keys[ticker], fresh)
+        if not job.done:
+            continue
+        if job.status == DONE:
+            finished[ticker] = job.result
+        elif job.status == CANCELLED:
+            finished[ticker] = "The forecast was cancelled."
+        else:
+            finished[ticker] = f"The forecast failed: {job.error}"
+    return finished
 
-    last_hist = df_np["ds"].max()
-    fc_np_future = fc_np[fc_np["ds"] > last_hist].copy()
+def show_portfolio_view(request: dict, results: dict):
+    label = ENGINE_LABELS[request["engine"]]
+    names = {member["ticker"]: member["name"] for member in request["members"]}
+    done = [result for result in results.values() if isinstance(result, ForecastResult)]
+    if done:
+        summary = portfolio_summary(done)
+        st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
+        st.subheader(f"📊 Portfolio Summary ({label})")
+        st.dataframe(
+            pd.DataFrame({
+                "company": summary["ticker"].map(lambda t: f"{names[t]} ({t})"),
+                "last close": summary["last_close"].round(2),
+                "forecast": summary["forecast"].round(2),
+                "forecast date": pd.to_datetime(summary["forecast_date"]).dt.date,
+                "expected return (%)": summary["expected_return"].round(1),
+                "interval width (%)": summary["interval_width"].round(1),
+            }),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.caption(
+            "Read at the end of the forecast horizon. Interval width is the spread of the forecast's "
+            "uncertainty interval relative to the forecast price."
+        )
+        plotly_chart(
+            portfolio_figure(
+                f"Portfolio — Forecasts Rebased to Last Close ({label})",
+                [(result.ticker, result.history, result.future, result.yhat_col) for result in done],
+            ),
+            "portfolio",
+        )
 
-    st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("📊 Forecasting Data Table (NeuralProphet)")
-    cols = ["ds", yhat_col]
-    if lower_col and upper_col:
-        cols += [lower_col, upper_col]
-    st.dataframe(fc_np_future[cols].reset_index(drop=True), use_container_width=True, hide_index=True)
+    for ticker, result in results.items():
+        st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
+        st.subheader(f"📈 {names[ticker]} ({ticker}) — {label}")
+        if not isinstance(result, ForecastResult):
+            st.warning(result)
+            continue
+        yhat_col = result.yhat_col
+        lower, upper = f"{yhat_col}_lower", f"{yhat_col}_upper"
+        has_band = lower in result.forecast.columns and upper in result.forecast.columns
+        plotly_chart(
+            forecast_figure(
+                f"{names[ticker]} ({ticker}) — Actual vs Forecast", result.history, result.forecast, yhat_col,
+                lower if has_band else None, upper if has_band else None,
+            ),
+            "actual_vs_forecast",
+        )
 
+@st.fragment(run_every=1.0)
+def show_portfolio_progress(request: dict):
+    # Charts appear as their fits finish; the full page reruns once all have
+    results = collect_portfolio(request)
+    if len(results) == len(request["members"]):
+        st.rerun()
+    show_portfolio_view(request, results)
     st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("📈 Actual vs Forecast (NeuralProphet)")
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df_np["ds"], y=df_np["y"], mode="lines", name="Actual",
-                             line=dict(color="#FF6B6B", width=2)))
-    fig.add_trace(go.Scatter(x=fc_np["ds"], y=fc_np[yhat_col], mode="lines", name="Forecast",
-                             line=dict(color="#4D96FF", width=2)))
-    if lower_col and upper_col:
-        fig.add_trace(go.Scatter(x=fc_np["ds"], y=fc_np[upper_col], mode="lines", line=dict(width=0), showlegend=False))
-        fig.add_trace(go.Scatter(x=fc_np["ds"], y=fc_np[lower_col], mode="lines",
-                                 fill="tonexty", fillcolor="rgba(77,150,255,0.30)",
-                                 line=dict(width=0), name="Confidence Interval"))
-    fig.update_layout(
-        title=f"{selected_name} ({selected_ticker}) — Actual vs Forecast",
-        xaxis_title="Date", yaxis_title="Adjusted Close (USD)",
-        template="plotly_dark", hovermode="x unified",
-        margin=dict(l=30, r=30, t=60, b=30),
+    for member in portfolio_members(request):
+        if member["ticker"] in results:
+            continue
+        key = request.get("keys", {}).get(member["ticker"])
+        job = get_job_manager().get(key) if key is not None else None
+        st.progress(job.progress if job else 0.0, text=f"{member['name']}: {job.message if job else 'Queued'}")
+    if st.button("✖ Cancel", key="cancel_portfolio_jobs"):
+        release_portfolio_request()
+        st.rerun()
+
+def show_portfolio_request(request: dict):
+    label, tickers = ENGINE_LABELS[request["engine"]], [member["ticker"] for member in request["members"]]
+    if not tickers:
+        st.info("Pick at least one company to compare.")
+        return
+    st.success(
+        f"Running **{label}** forecasts for **{len(tickers)} companies** for **{request['years']} year(s)**, "
+        "fitted side by side."
     )
-    st.plotly_chart(fig, use_container_width=True)
+    fresh = request.pop("fresh", False)
+    if fresh:
+        # One batched download for every company missing prices, before any fit starts
+        with trace("prefetch", tickers=len(tickers)):
+            prefetch(get_price_store(), tickers, request["start"], request["end"])
+    results = collect_portfolio(request, fresh)
+    if len(results) < len(tickers):
+        show_portfolio_progress(request)
+    else:
+        show_portfolio_view(request, results)
 
-    st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("📉 Trend (NeuralProphet)")
-    if "trend" in fc_np.columns:
-        fig_trend = go.Figure()
-        fig_trend.add_trace(go.Scatter(x=fc_np["ds"], y=fc_np["trend"], mode="lines", name="Trend",
-                                       line=dict(color="#00D2A8", width=2)))
-        fig_trend.update_layout(
-            title=f"{selected_name} — Trend Component",
-            xaxis_title="Date", yaxis_title="Trend",
-            template="plotly_dark", hovermode="x unified",
-            margin=dict(l=30, r=30, t=60, b=30),
-        )
-        st.plotly_chart(fig_trend, use_container_width=True)
+if prophet_clicked:
+    if portfolio_mode:
+        request_portfolio("prophet")
     else:
-        st.info("Trend component is not available in this NeuralProphet forecast output.")
+        request_forecast("prophet")
+if neural_clicked:
+    if portfolio_mode:
+        request_portfolio("neuralprophet")
+    else:
+        request_forecast("neuralprophet")
 
-    st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("🗓️ Yearly Seasonality (NeuralProphet)")
-    yearly_col = find_yearly_col(fc_np)
-    if yearly_col:
-        fig_yearly = go.Figure()
-        fig_yearly.add_trace(go.Scatter(x=fc_np["ds"], y=fc_np[yearly_col], mode="lines", name="Yearly",
-                                        line=dict(color="#4D96FF", width=2)))
-        fig_yearly.update_layout(
-            title=f"{selected_name} — Yearly Seasonality",
-            xaxis_title="Date", yaxis_title="Seasonality Effect",
-            template="plotly_dark", hovermode="x unified",
-            margin=dict(l=30, r=30, t=60, b=30),
+if st.session_state.get("forecast_request"):
+    show_forecast_request(st.session_state.forecast_request)
+if st.session_state.get("portfolio_request"):
+    show_portfolio_request(st.session_state.portfolio_request)
+
+# ============================================================
+# Engine backtest (walk-forward comparison on past prices)
+# ============================================================
+BACKTEST_LABELS = {**ENGINE_LABELS, "fastlinear": "Fast linear"}
+
+def backtest_key(ticker: str, engines: list, n_folds: int) -> tuple:
+    return ("backtest", ticker, st.session_state.start_date, st.session_state.end_date, n_days, tuple(engines), n_folds)
+
+def submit_backtest_job(key: tuple) -> Job:
+    _, ticker, start, end, periods, engines, n_folds = key
+
+    def work(job: Job) -> pd.DataFrame:
+        return backtest(
+            ticker, start, end, engines=engines, n_folds=n_folds, periods=periods,
+            prices=get_price_store(), progress=job.report,
         )
-        st.plotly_chart(fig_yearly, use_container_width=True)
-    else:
-        st.info("Yearly seasonality is not available in this forecast output.")
 
-    st.markdown("<div class='spacer-sm'></div>", unsafe_allow_html=True)
-    st.subheader("📅 Monthly Component (NeuralProphet)")
-    mdf = monthly_summary_from_yhat(fc_np_future, yhat_col)
-    fig_month = go.Figure()
-    fig_month.add_trace(go.Scatter(x=mdf["month"], y=mdf[yhat_col], mode="lines+markers", name="Avg Forecast",
-                                   line=dict(color="#00D2A8", width=2), marker=dict(size=8)))
-    fig_month.update_layout(
-        title=f"{selected_name} — Monthly Component (Avg Forecasted Price)",
-        xaxis_title="Month", yaxis_title="Average Forecasted Price",
-        xaxis=dict(dtick=1), template="plotly_dark",
-        margin=dict(l=30, r=30, t=60, b=30),
+    return get_job_manager().submit(key, work, owner=session_id)
+
+@st.fragment(run_every=1.0)
+def show_backtest_progress(key: tuple):
+    job = get_job_manager().get(key)
+    if job is None or job.done:
+        st.rerun()
+    st.progress(job.progress, text=job.message)
+    if st.button("✖ Cancel", key="cancel_backtest_job"):
+        get_job_manager().release(key, session_id)
+        st.rerun()
+
+def show_backtest_results(name: str, folds: pd.DataFrame):
+    summary = summarize(folds)
+    best = summary.iloc[0]
+    st.markdown(
+        f"Lowest average error on **{name}**: **{BACKTEST_LABELS.get(best['engine'], best['engine'])}** "
+        f"(MAPE {best['mape']:.1f}% over {best['folds']} folds)."
+    )
+    st.dataframe(
+        pd.DataFrame({
+            "engine": summary["engine"].map(lambda e: BACKTEST_LABELS.get(e, e)),
+            "folds": summary["folds"],
+            "MAPE (%)": summary["mape"].round(2),
+            "MAPE std": summary["mape_std"].round(2),
+            "RMSE": summary["rmse"].round(2),
+            "interval coverage (%)": (summary["coverage"] * 100).round(1),
+            "fit (s)": summary["fit_seconds"].round(2),
+            "failed": summary["failed"],
+        }),
+        use_container_width=True,
+        hide_index=True,
     )
-    st.plotly_chart(fig_month, use_container_width=True)
+    st.caption("Coverage is the share of actual prices inside the forecast's 80% interval (ideal ≈ 80%).")
+    plotly_chart(backtest_figure(f"{name} — MAPE per Cutoff", folds), "backtest")
+
+def show_backtest(name: str, ticker: str):
+    with st.expander("🧪 Compare Engines (walk-forward backtest)", expanded=False):
+        st.caption(
+            "Refits each engine at several past cutoffs inside the selected date range and scores its "
+            f"{st.session_state.forecast_years}-year forecast against the prices that followed."
+        )
+        c1, c2 = st.columns([3, 1])
+        with c1:
+            engines = st.multiselect(
+                "Engines", list(BACKTEST_LABELS), default=list(ENGINE_LABELS),
+                format_func=BACKTEST_LABELS.get, key="backtest_engines",
+            )
+        with c2:
+            n_folds = int(st.number_input("Folds", 2, 10, DEFAULT_FOLDS, key="backtest_folds"))
+        if not engines:
+            st.info("Pick at least one engine.")
+            return
+
+        # Nothing is read on a plain rerun (the expander's body runs even when collapsed):
+        # stored results are looked up only when the button is pressed, then kept for the session
+        key = backtest_key(ticker, engines, n_folds)
+        shown = st.session_state.get("backtest_result")
+        folds = shown[1] if shown is not None and shown[0] == key else None
+        job = get_job_manager().get(key)
+        if folds is None and job is not None and job.status == DONE:
+            folds = job.result
+        if folds is not None:
+            show_backtest_results(name, folds)
+            return
+        if job is not None and not job.done:
+            show_backtest_progress(key)
+            return
+        if job is not None and job.status == FAILED:
+            st.error(f"The backtest failed: {job.error}")
+        if st.button("▶ Run Backtest", key="run_backtest"):
+            _, _, start, end, periods, _, _ = key
+            folds = backtest(
+                ticker, start, end, engines=engines, n_folds=n_folds, periods=periods,
+                prices=get_price_store(), cached_only=True,
+            )
+            if folds is not None:
+                st.session_state.backtest_result = (key, folds)
+            else:
+                submit_backtest_job(key)
+            st.rerun()
+
+if selected_ticker:
+    show_backtest(selected_name, selected_ticker)
+
+# Model libraries (Stan, Torch) are imported on first use; once the page is out,
+# load them on a background thread so the first button press does not wait.
+@st.cache_resource
+def preload_engines():
+    return ENGINES.preload(list(ENGINE_LABELS))
 
+if os.environ.get("STOCKPRED_PRELOAD_ENGINES", "1") != "0":
+    preload_engines()
@@ -0,0 +1,45 @@
+"""Compare two ``benchmarks.pipeline`` JSON reports stage by stage.
+
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 1.2]
+
+Prints the candidate/baseline ratio of the best time for every matching
+record and exits non-zero when any stage got slower than ``--threshold``.
+"""
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+KEYS = ["ticker", "engine", "history_years", "horizon_years", "stage"]
+
+
+def load(path) -> pd.DataFrame:
+    with open(path) as fh:
+        return pd.DataFrame(json.load(fh)["results"])
+
+
+def compare(baseline: pd.DataFrame, candidate: pd.DataFrame) -> pd.DataFrame:
+    merged = baseline[KEYS + ["seconds"]].merge(candidate[KEYS + ["seconds"]], on=KEYS, suffixes=("_base", "_new"))
+    merged["ratio"] = merged["seconds_new"] / merged["seconds_base"]
+    return merged.sort_values("ratio", ascending=False).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    table = compare(load(args.baseline), load(args.candidate))
+    with pd.option_context("display.width", 160, "display.max_rows", 500):
+        print(table.round(4).to_string(index=False))
+    slower = table[table["ratio"] > args.threshold]
+    if not slower.empty:
+        print(f"\n{len(slower)} stage(s) slower than {args.threshold:.2f}x")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Accuracy and speed of the fast linear engine against real Prophet.
+
+    python -m benchmarks.fastlinear_accuracy [--tickers AAPL MSFT] [--years 8] [--horizon 252]
+
+For each ticker the last ``horizon`` rows are held out. Both engines are fit on
+the rest; we report how closely FastLinear tracks Prophet (in-sample and over
+the horizon) and each engine's error against the held-out prices.
+``tests/test_fastlinear_accuracy.py`` bounds the same numbers on synthetic fixtures.
+"""
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import DEFAULT_TICKERS, ensure_fixtures
+from stockpred.fastlinear import FastLinear, fit_many
+from stockpred.frames import to_prophet_df
+from stockpred.price_store import FixtureProvider
+
+
+def _mape(a, b) -> float:
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    return float(np.mean(np.abs((a - b) / a)) * 100)
+
+
+def run(tickers, years: int, horizon: int, fixtures=None) -> dict:
+    from prophet import Prophet
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    provider = FixtureProvider(ensure_fixtures(tickers, root=fixtures))
+    frames, holdout = {}, {}
+    for ticker in tickers:
+        prices = provider.fetch(ticker, pd.Timestamp("2000-01-01").date(), pd.Timestamp("2026-01-01").date())
+        df = to_prophet_df(prices).tail(years * 252 + horizon).reset_index(drop=True)
+        frames[ticker], holdout[ticker] = df.iloc[:-horizon], df.iloc[-horizon:]
+
+    started = time.perf_counter()
+    fast_models = fit_many(frames)
+    fast_seconds = time.perf_counter() - started
+
+    rows = []
+    prophet_seconds = 0.0
+    for ticker, train in frames.items():
+        future = pd.concat([train[["ds"]], holdout[ticker][["ds"]]], ignore_index=True)
+        t0 = time.perf_counter()
+        m = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
+        m.fit(train)
+        fc_prophet = m.predict(future)
+        prophet_seconds += time.perf_counter() - t0
+        fc_fast = fast_models[ticker].predict(future)
+
+        n = len(train)
+        actual = holdout[ticker]["y"].to_numpy()
+        rows.append({
+            "ticker": ticker,
+            "in_sample_mape_vs_prophet": _mape(fc_prophet["yhat"][:n], fc_fast["yhat"][:n]),
+            "horizon_mape_vs_prophet": _mape(fc_prophet["yhat"][n:], fc_fast["yhat"][n:]),
+            "trend_corr": float(np.corrcoef(fc_prophet["trend"], fc_fast["trend"])[0, 1]),
+            "yearly_corr": float(np.corrcoef(fc_prophet["yearly"], fc_fast["yearly"])[0, 1]),
+            "prophet_holdout_mape": _mape(actual, fc_prophet["yhat"][n:]),
+            "fastlinear_holdout_mape": _mape(actual, fc_fast["yhat"][n:]),
+            "prophet_coverage": float(np.mean(
+                (actual >= fc_prophet["yhat_lower"][n:]) & (actual <= fc_prophet["yhat_upper"][n:]))),
+            "fastlinear_coverage": float(np.mean(
+                (actual >= fc_fast["yhat_lower"][n:]) & (actual <= fc_fast["yhat_upper"][n:]))),
+        })
+
+    single = time.perf_counter()
+    for train in frames.values():
+        FastLinear().fit(train)
+    single_seconds = time.perf_counter() - single
+
+    table = pd.DataFrame(rows).set_index("ticker")
+    return {
+        "tickers": len(frames),
+        "train_rows": int(np.mean([len(f) for f in frames.values()])),
+        "horizon": horizon,
+        "prophet_seconds": round(prophet_seconds, 3),
+        "fastlinear_batched_seconds": round(fast_seconds, 4),
+        "fastlinear_sequential_seconds": round(single_seconds, 4),
+        "mean": table.mean().round(4).to_dict(),
+        "per_ticker": table.round(4).reset_index().to_dict(orient="records"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fastlinear_accuracy")
+    parser.add_argument("--tickers", nargs="+", default=DEFAULT_TICKERS)
+    parser.add_argument("--years", type=int, default=8, help="training history in years")
+    parser.add_argument("--horizon", type=int, default=252, help="held-out rows")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.tickers, args.years, args.horizon), indent=2))
+
+
+if __name__ == "__main__":
+    main()
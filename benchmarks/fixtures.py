@@ -0,0 +1,64 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from stockpred.price_store import FIXTURES_ENV_VAR, PRICE_COLUMNS
+
+DEFAULT_FIXTURES_DIR = Path(__file__).parent / "fixtures"
+DEFAULT_TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "JPM"]
+
+
+def synthetic_prices(ticker: str, start: str = "2000-01-03", end: str = "2026-01-01") -> pd.DataFrame:
+    # Deterministic per ticker: drifting GBM with a mild yearly cycle on business days
+    rng = np.random.default_rng(int(hashlib.md5(ticker.encode("utf-8")).hexdigest()[:8], 16))
+    ds = pd.bdate_range(start, end, inclusive="left")
+    season = 0.002 * np.sin(2 * np.pi * ds.dayofyear.to_numpy() / 365.25)
+    returns = rng.normal(0.0004, 0.018, len(ds)) + np.diff(season, prepend=season[0])
+    close = 50.0 * np.exp(np.cumsum(returns))
+    spread = np.abs(rng.normal(0, 0.01, len(ds)))
+    return pd.DataFrame({
+        "Date": ds,
+        "Close": close,
+        "High": close * (1 + spread),
+        "Low": close * (1 - spread),
+        "Open": close * (1 + rng.normal(0, 0.005, len(ds))),
+        "Volume": rng.integers(1_000_000, 50_000_000, len(ds)),
+    })[PRICE_COLUMNS]
+
+
+def synthetic_intraday(ticker: str, interval: str = "5m", start: str = "2024-01-02", end: str = "2026-01-01") -> pd.DataFrame:
+    # Regular-session bars (09:30-16:00) on business days, the same walk at a finer step
+    rng = np.random.default_rng(int(hashlib.md5(f"{ticker}@{interval}".encode("utf-8")).hexdigest()[:8], 16))
+    step = pd.Timedelta(interval.replace("m", "min"))
+    session = pd.timedelta_range("09:30:00", "16:00:00", freq=step, closed="left")
+    days = pd.bdate_range(start, end, inclusive="left")
+    ds = (days.to_numpy()[:, None] + session.to_numpy()[None, :]).ravel()
+    returns = rng.normal(0.0004 / len(session), 0.018 / np.sqrt(len(session)), len(ds))
+    close = 50.0 * np.exp(np.cumsum(returns))
+    spread = np.abs(rng.normal(0, 0.002, len(ds)))
+    return pd.DataFrame({
+        "Date": ds,
+        "Close": close,
+        "High": close * (1 + spread),
+        "Low": close * (1 - spread),
+        "Open": close * (1 + rng.normal(0, 0.001, len(ds))),
+        "Volume": rng.integers(1_000, 500_000, len(ds)),
+    })[PRICE_COLUMNS]
+
+
+def fixtures_dir() -> Path:
+    return Path(os.environ.get(FIXTURES_ENV_VAR, DEFAULT_FIXTURES_DIR))
+
+
+def ensure_fixtures(tickers: Iterable[str] = DEFAULT_TICKERS, root: Path = None) -> Path:
+    # Recorded fixtures win; missing tickers are synthesized
+    root = Path(root) if root is not None else fixtures_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    for ticker in tickers:
+        if not (root / f"{ticker}.parquet").exists() and not (root / f"{ticker}.csv").exists():
+            synthetic_prices(ticker).to_parquet(root / f"{ticker}.parquet", index=False)
+    return root
@@ -0,0 +1,100 @@
+"""Bytes held per ticker by the price frame and the engines' training frames.
+
+    python -m benchmarks.memory [--tickers AAPL MSFT] [--years 10] [--out results.json]
+
+Prices come from the fixtures through a throwaway price store, as in
+``benchmarks.pipeline``. Two layouts are measured for the same rows:
+
+    before  the previous pipeline: float64 columns, ``datetime.date`` objects in an
+            object ``Date`` column, and a private copy per engine frame
+    after   stockpred.api.load_prices + ENGINE_FRAMES as they are now
+
+``private`` counts distinct column buffers owned by the process (a frame viewing
+an array already counted adds nothing); ``shared`` counts read-only buffers
+backed by the store's memory-mapped file, which the OS shares between sessions
+and processes.
+"""
+import argparse
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import ensure_fixtures
+from stockpred.api import load_prices
+from stockpred.frames import to_neuralprophet_df, to_prophet_df
+from stockpred.price_store import FixtureProvider, PriceStore
+
+DEFAULT_TICKERS = ["AAPL", "MSFT"]
+DEFAULT_YEARS = 10
+DEFAULT_END = date(2026, 1, 1)
+
+
+def _legacy_frames(prices: pd.DataFrame) -> list:
+    # What load_data, to_prophet_df and to_neuralprophet_df used to hold
+    legacy = prices.astype({c: "float64" for c in prices.columns if c != "Date"})
+    legacy["Date"] = pd.to_datetime(legacy["Date"]).dt.date
+    frames = [legacy]
+    for _ in ("prophet", "neuralprophet"):
+        df = legacy[["Date", "Close"]].rename(columns={"Date": "ds", "Close": "y"}).copy()
+        df["ds"] = pd.to_datetime(df["ds"])
+        frames.append(df.dropna())
+    return frames
+
+
+def footprint(frames: list) -> dict:
+    seen, private, shared = [], 0, 0
+    for frame in frames:
+        private += int(frame.index.memory_usage())
+        for col in frame.columns:
+            values = frame[col].to_numpy()
+            if any(np.shares_memory(values, other) for other in seen):
+                continue
+            seen.append(values)
+            size = int(frame[col].memory_usage(index=False, deep=True))
+            if values.flags.writeable:
+                private += size
+            else:
+                shared += size
+    return {"private": private, "shared": shared, "total": private + shared}
+
+
+def run(tickers, years: int, end: date = DEFAULT_END) -> dict:
+    provider = FixtureProvider(ensure_fixtures(tickers))
+    start = date(end.year - years, end.month, end.day)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp), provider=provider)
+        for ticker in tickers:
+            prices = load_prices(ticker, start, end, prices=store)
+            before = footprint(_legacy_frames(prices))
+            after = footprint([prices, to_prophet_df(prices), to_neuralprophet_df(prices)])
+            rows.append({
+                "ticker": ticker, "rows": len(prices),
+                "before_private": before["private"], "after_private": after["private"],
+                "after_shared": after["shared"],
+                "before_per_row": before["total"] / max(1, len(prices)),
+                "after_per_row": after["total"] / max(1, len(prices)),
+                "reduction": before["total"] / max(1, after["total"]),
+            })
+    return {"years": years, "end": str(end), "per_ticker": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory")
+    parser.add_argument("--tickers", nargs="+", default=DEFAULT_TICKERS)
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS, help="years of history per ticker")
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.tickers, args.years)
+    print(pd.DataFrame(report["per_ticker"]).round(2).to_string(index=False))
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Stage timings for the data -> fit -> predict -> render pipeline, offline.
+
+    python -m benchmarks.pipeline [--history 1 5 10 25] [--horizons 1 5 10]
+                                  [--engines prophet neuralprophet] [--out results.json]
+
+Prices come from the fixtures in ``benchmarks/fixtures`` (see ``benchmarks.record``)
+through a throwaway price store, so no network is touched. Every stage is timed
+on its own:
+
+    load_data_cold / load_data_warm  stockpred.api.load_prices (what the app's load_data wraps)
+    to_frame                         to_prophet_df / to_neuralprophet_df
+    fit                              engine fit (once per ticker, history and engine)
+    predict                          make_future_dataframe + predict
+    monthly_summary                  monthly_summary_from_yhat on the future rows
+    figures                          stockpred.figures construction + JSON serialization of the
+                                     app's charts (``bytes`` is the payload size)
+
+Fits do not depend on the horizon, so each fitted model is reused for every
+``--horizons`` value. Results are written as JSON (one record per
+ticker/engine/history/horizon/stage) together with the commit they ran on;
+``python -m benchmarks.compare old.json new.json`` diffs two runs.
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.fixtures import ensure_fixtures
+from stockpred.api import load_prices
+from stockpred.frames import ENGINE_FRAMES, find_yearly_col, find_yhat_col, monthly_summary_from_yhat
+from stockpred.price_store import FixtureProvider, PriceStore
+
+DEFAULT_TICKERS = ["AAPL", "MSFT"]
+DEFAULT_HISTORY_YEARS = [1, 5, 10, 25]
+DEFAULT_HORIZON_YEARS = [1, 5, 10]
+DEFAULT_ENGINES = ["prophet", "neuralprophet"]
+DEFAULT_END = date(2026, 1, 1)
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _timed(fn, repeat: int = 1):
+    # Returns (last result, list of wall-clock seconds)
+    seconds = []
+    result = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - started)
+    return result, seconds
+
+
+def build_figures(df: pd.DataFrame, forecast: pd.DataFrame, mdf: pd.DataFrame, max_points=None) -> int:
+    # The app's four charts via stockpred.figures, serialized as st.plotly_chart would; returns JSON bytes
+    from stockpred.figures import component_figure, forecast_figure, monthly_figure
+
+    yhat_col = find_yhat_col(forecast)
+    bounds = [f"{yhat_col}_lower", f"{yhat_col}_upper"]
+    bounds = bounds if set(bounds) <= set(forecast.columns) else [None, None]
+    figs = [forecast_figure("Actual vs Forecast", df, forecast, yhat_col, *bounds, max_points=max_points)]
+    if "trend" in forecast.columns:
+        figs.append(component_figure("Trend", forecast, "trend", name="Trend", yaxis_title="Trend",
+                                     max_points=max_points))
+    yearly_col = find_yearly_col(forecast)
+    if yearly_col:
+        figs.append(component_figure("Yearly", forecast, yearly_col, name="Yearly", yaxis_title="Seasonality",
+                                     max_points=max_points))
+    figs.append(monthly_figure("Monthly", mdf, yhat_col))
+    return sum(len(fig.to_json()) for fig in figs)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(tickers, history_years, horizon_years, engines, repeat: int = 3, end: date = DEFAULT_END,
+        max_points=None) -> dict:
+    from stockpred.engines import ENGINES
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    logging.getLogger("prophet").setLevel(logging.WARNING)
+    logging.getLogger("NP").setLevel(logging.WARNING)
+
+    provider = FixtureProvider(ensure_fixtures(tickers))
+    records = []
+
+    def record(ticker, engine, history, horizon, stage, seconds, **extra):
+        records.append({
+            "ticker": ticker, "engine": engine, "history_years": history, "horizon_years": horizon,
+            "stage": stage, "seconds": round(min(seconds), 6), "median": round(statistics.median(seconds), 6),
+            "runs": len(seconds), **extra,
+        })
+
+    with tempfile.TemporaryDirectory(prefix="stockpred-bench-") as tmp:
+        for history in history_years:
+            start = end.replace(year=end.year - history)
+            for ticker in tickers:
+                store = PriceStore(root=Path(tmp) / f"prices-{history}", provider=provider)
+                prices, cold = _timed(lambda: load_prices(ticker, start, end, prices=store))
+                _, warm = _timed(lambda: load_prices(ticker, start, end, prices=store), repeat)
+                record(ticker, None, history, None, "load_data_cold", cold, rows=len(prices))
+                record(ticker, None, history, None, "load_data_warm", warm, rows=len(prices))
+
+                for engine in engines:
+                    eng = ENGINES[engine]
+                    df, secs = _timed(lambda: ENGINE_FRAMES[engine](prices), repeat)
+                    record(ticker, engine, history, None, "to_frame", secs, rows=len(df))
+                    model, secs = _timed(lambda: eng.fit(df, dict(eng.params)))
+                    record(ticker, engine, history, None, "fit", secs, rows=len(df))
+
+                    for horizon in horizon_years:
+                        periods = horizon * 365
+                        forecast, secs = _timed(lambda: eng.predict(model, df, periods), repeat)
+                        record(ticker, engine, history, horizon, "predict", secs, rows=len(forecast))
+                        future = forecast[forecast["ds"] > df["ds"].max()]
+                        yhat_col = find_yhat_col(forecast)
+                        mdf, secs = _timed(lambda: monthly_summary_from_yhat(future, yhat_col), repeat)
+                        record(ticker, engine, history, horizon, "monthly_summary", secs)
+                        payload, secs = _timed(lambda: build_figures(df, forecast, mdf, max_points), repeat)
+                        record(ticker, engine, history, horizon, "figures", secs, bytes=payload,
+                               points=len(df) + 3 * len(forecast))
+                    logging.info("%s %s %dy done", ticker, engine, history)
+
+    return {
+        "commit": _git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": {"tickers": list(tickers), "history_years": list(history_years),
+                   "horizon_years": list(horizon_years), "engines": list(engines), "repeat": repeat,
+                   "max_points": max_points},
+        "results": records,
+    }
+
+
+def summarize(report: dict) -> pd.DataFrame:
+    df = pd.DataFrame(report["results"])
+    return (df.groupby(["stage", "engine", "history_years", "horizon_years"], dropna=False)["seconds"]
+              .mean().unstack("history_years"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.pipeline")
+    parser.add_argument("--tickers", nargs="+", default=DEFAULT_TICKERS)
+    parser.add_argument("--history", nargs="+", type=int, default=DEFAULT_HISTORY_YEARS, help="years of history")
+    parser.add_argument("--horizons", nargs="+", type=int, default=DEFAULT_HORIZON_YEARS, help="forecast years")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINE_FRAMES), default=DEFAULT_ENGINES)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per cheap stage (fits run once)")
+    parser.add_argument("--max-points", type=int, default=None,
+                        help="points per chart trace (default: pixel budget, 0: no downsampling)")
+    parser.add_argument("--out", default=None, help="JSON output (default: benchmarks/results/pipeline-<commit>.json)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    report = run(args.tickers, args.history, args.horizons, args.engines, args.repeat, max_points=args.max_points)
+    out = Path(args.out) if args.out else RESULTS_DIR / f"pipeline-{report['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    with pd.option_context("display.width", 160, "display.max_rows", 200):
+        print(summarize(report).round(4))
+    print(f"\nwrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Record real OHLCV history from Yahoo Finance as offline benchmark fixtures.
+
+    python -m benchmarks.record [--tickers AAPL MSFT] [--start 2000-01-01] [--end 2026-01-01]
+
+Writes ``<TICKER>.parquet`` into the fixtures directory (``STOCKPRED_FIXTURES_DIR``
+or ``benchmarks/fixtures``). Recorded files take precedence over the synthetic
+series ``ensure_fixtures`` generates for tickers that were never recorded.
+"""
+import argparse
+from datetime import date
+
+from benchmarks.fixtures import DEFAULT_TICKERS, fixtures_dir
+from stockpred.price_store import YahooProvider
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.record")
+    parser.add_argument("--tickers", nargs="+", default=DEFAULT_TICKERS)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2000, 1, 1))
+    parser.add_argument("--end", type=date.fromisoformat, default=date(2026, 1, 1))
+    args = parser.parse_args(argv)
+
+    root = fixtures_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    frames = YahooProvider().fetch_many(args.tickers, args.start, args.end)
+    for ticker in args.tickers:
+        df = frames.get(ticker)
+        if df is None or df.empty:
+            print(f"{ticker:<8} no data")
+            continue
+        df.to_parquet(root / f"{ticker}.parquet", index=False)
+        print(f"{ticker:<8} {len(df):>6} rows  {df['Date'].min():%Y-%m-%d} .. {df['Date'].max():%Y-%m-%d}")
+
+
+if __name__ == "__main__":
+    main()
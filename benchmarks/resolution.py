@@ -0,0 +1,94 @@
+"""Fit time against backtest error at each training resolution.
+
+    python -m benchmarks.resolution [--tickers AAPL MSFT] [--engines prophet neuralprophet]
+                                    [--horizons 1 2 5 10] [--years 20] [--folds 3] [--out results.json]
+
+For every ticker, horizon and engine, ``stockpred.backtest`` runs the same
+walk-forward folds with daily, weekly and monthly training bars. Every fold is
+scored on the daily prices that followed, so the errors are comparable. Prices
+come from the fixtures through a throwaway price store, as in
+``benchmarks.pipeline``. The table reports the bars per fit, the mean fit
+seconds and MAPE, and the speedup and MAPE change against daily bars. ``policy``
+marks the resolution ``choose_resolution`` picks for the horizon.
+"""
+import argparse
+import json
+import logging
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.fixtures import ensure_fixtures
+from stockpred.api import horizon_days, load_prices
+from stockpred.backtest import BacktestStore, backtest
+from stockpred.price_store import FixtureProvider, PriceStore
+from stockpred.resolution import BAR_DAYS, DAILY, RESOLUTIONS, choose_resolution
+
+DEFAULT_TICKERS = ["AAPL", "MSFT"]
+DEFAULT_ENGINES = ["prophet", "neuralprophet"]
+DEFAULT_HORIZONS = [1, 2, 5, 10]
+DEFAULT_YEARS = 20
+DEFAULT_FOLDS = 3
+DEFAULT_END = date(2026, 1, 1)
+
+
+def run(tickers, engines, horizons, years: int, n_folds: int, end: date = DEFAULT_END) -> dict:
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    start = date(end.year - years, end.month, end.day)
+    provider = FixtureProvider(ensure_fixtures(tickers))
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        prices = PriceStore(Path(tmp) / "prices", provider=provider)
+        results = BacktestStore(Path(tmp) / "backtests")
+        for ticker in tickers:
+            ds = load_prices(ticker, start, end, prices=prices)["Date"]
+            for horizon in horizons:
+                picked = choose_resolution(horizon_days(horizon), ds)
+                for resolution in RESOLUTIONS:
+                    folds = backtest(ticker, start, end, horizon, engines, n_folds,
+                                     resolution=resolution, prices=prices, store=results)
+                    ok = folds[folds["error"].isna()]
+                    for engine, group in ok.groupby("engine"):
+                        rows.append({
+                            "ticker": ticker, "engine": engine, "horizon": horizon, "resolution": resolution,
+                            "policy": resolution == picked, "folds": len(group),
+                            # Folds count daily rows; a coarse fit trains on about this many bars
+                            "bars": float(group["train_rows"].mean() * BAR_DAYS[DAILY] / BAR_DAYS[resolution]),
+                            "fit_seconds": float(group["fit_seconds"].mean()),
+                            "mape": float(group["mape"].mean()),
+                            "coverage": float(group["coverage"].mean()),
+                        })
+    per_fold = pd.DataFrame(rows)
+    summary = per_fold.groupby(["engine", "horizon", "resolution"], sort=False).agg(
+        bars=("bars", "mean"), fit_seconds=("fit_seconds", "mean"), mape=("mape", "mean"),
+        coverage=("coverage", "mean"), policy=("policy", "all"),
+    ).reset_index()
+    daily = summary[summary["resolution"] == DAILY].set_index(["engine", "horizon"])
+    key = pd.MultiIndex.from_frame(summary[["engine", "horizon"]])
+    summary["speedup"] = daily["fit_seconds"].reindex(key).to_numpy() / summary["fit_seconds"]
+    summary["mape_change"] = summary["mape"] - daily["mape"].reindex(key).to_numpy()
+    return {"years": years, "folds": n_folds, "end": str(end), "tickers": list(tickers),
+            "summary": summary.to_dict("records"), "per_ticker": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.resolution")
+    parser.add_argument("--tickers", nargs="+", default=DEFAULT_TICKERS)
+    parser.add_argument("--engines", nargs="+", choices=["prophet", "neuralprophet", "fastlinear"],
+                        default=DEFAULT_ENGINES)
+    parser.add_argument("--horizons", nargs="+", type=int, default=DEFAULT_HORIZONS, help="forecast years")
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS, help="years of history per ticker")
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS, help="cutoffs per backtest")
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.tickers, args.engines, args.horizons, args.years, args.folds)
+    print(pd.DataFrame(report["summary"]).round(3).to_string(index=False))
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Cold-start cost of the app: module import time and time to first paint.
+
+    python -m benchmarks.startup [--repeat 3] [--out results.json]
+
+Every measurement runs in a fresh interpreter. ``lazy`` is the current tree,
+where the engine registry imports Prophet / NeuralProphet on first use; ``eager``
+imports both libraries up front, which is what the app used to do at module top.
+First paint is one ``AppTest`` run of ``app.py`` (company selector rendered),
+with boot-time prefetch and engine preloading disabled so only the script is
+timed.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+EAGER_IMPORTS = "import prophet, neuralprophet\n"
+IMPORT_SNIPPET = """
+import time
+t = time.perf_counter()
+{eager}import stockpred.engines
+print(time.perf_counter() - t)
+"""
+PAINT_SNIPPET = """
+import time
+t = time.perf_counter()
+{eager}from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=300)
+at.run()
+assert not at.exception, at.exception
+assert at.selectbox, "company selector not rendered"
+print(time.perf_counter() - t)
+"""
+FIRST_USE_SNIPPET = """
+import time
+import stockpred.engines
+t = time.perf_counter()
+stockpred.engines.ENGINES[{engine!r}]
+print(time.perf_counter() - t)
+"""
+
+
+def _run(snippet: str) -> float:
+    env = dict(os.environ, PYTHONPATH=str(ROOT), STOCKPRED_PREFETCH_ON_BOOT="0", STOCKPRED_PRELOAD_ENGINES="0")
+    out = subprocess.run([sys.executable, "-c", snippet], cwd=ROOT, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr[-2000:])
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _measure(snippet: str, repeat: int) -> dict:
+    runs = [_run(snippet) for _ in range(repeat)]
+    return {"median": round(statistics.median(runs), 4), "min": round(min(runs), 4), "runs": runs}
+
+
+def run(repeat: int = 3) -> dict:
+    results = {}
+    for mode, eager in (("lazy", ""), ("eager", EAGER_IMPORTS)):
+        results[f"import_{mode}"] = _measure(IMPORT_SNIPPET.format(eager=eager), repeat)
+        results[f"first_paint_{mode}"] = _measure(PAINT_SNIPPET.format(eager=eager), repeat)
+    for engine in ("prophet", "neuralprophet"):
+        results[f"first_use_{engine}"] = _measure(FIRST_USE_SNIPPET.format(engine=engine), repeat)
+    return {"python": sys.version.split()[0], "repeat": repeat, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="optional JSON output path")
+    args = parser.parse_args(argv)
+
+    report = run(args.repeat)
+    for name, stats in report["results"].items():
+        print(f"{name:<26} {stats['median']:>8.3f}s  (min {stats['min']:.3f}s)")
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
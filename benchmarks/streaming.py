@@ -0,0 +1,95 @@
+"""Peak memory of building an intraday training frame whole vs streamed.
+
+    python -m benchmarks.streaming [--ticker AAPL] [--interval 5m] [--years 5] [--out results.json]
+
+Synthetic regular-session bars (``benchmarks.fixtures.synthetic_intraday``) are
+stored once in a throwaway price store, then the daily training frame is built
+two ways from it:
+
+    whole   load_prices over the full range, then training_frame and a daily resample
+    stream  streaming_training_frame over stream_prices (one CHUNK_DAYS slice at a time)
+
+``peak`` is the tracemalloc high-water mark of each build (NumPy and pandas
+buffers); it grows with the range for ``whole`` and with the chunk for ``stream``.
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.fixtures import synthetic_intraday
+from stockpred.api import TRAINING_RULE, load_prices, stream_prices, streaming_training_frame, training_frame
+from stockpred.frames import last_per_period
+from stockpred.price_store import CHUNK_DAYS, FixtureProvider, PriceStore
+
+DEFAULT_TICKER = "AAPL"
+DEFAULT_INTERVAL = "5m"
+DEFAULT_YEARS = 5
+DEFAULT_END = date(2026, 1, 1)
+ENGINE = "prophet"
+
+
+def _measure(build) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = build()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak, time.perf_counter() - started
+
+
+def run(ticker: str, interval: str, years: int, end: date = DEFAULT_END) -> dict:
+    start = date(end.year - years, end.month, end.day)
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = Path(tmp) / "fixtures"
+        fixtures.mkdir()
+        bars = synthetic_intraday(ticker, interval, str(start), str(end))
+        bars.to_parquet(fixtures / f"{ticker}@{interval}.parquet", index=False)
+        n_bars, bar_bytes = len(bars), int(bars.memory_usage(index=False).sum())
+        del bars
+
+        store = PriceStore(Path(tmp) / "prices", provider=FixtureProvider(fixtures))
+        fill_started = time.perf_counter()
+        for _ in stream_prices(ticker, start, end, interval=interval, prices=store):
+            pass
+        fill_seconds = time.perf_counter() - fill_started
+
+        whole, whole_peak, whole_seconds = _measure(lambda: last_per_period(
+            training_frame(ENGINE, load_prices(ticker, start, end, interval=interval, prices=store)), TRAINING_RULE,
+        ))
+        streamed, stream_peak, stream_seconds = _measure(lambda: streaming_training_frame(
+            ENGINE, stream_prices(ticker, start, end, interval=interval, prices=store),
+        ))
+    return {
+        "ticker": ticker, "interval": interval, "years": years, "chunk_days": CHUNK_DAYS[interval],
+        "bars": n_bars, "bar_bytes": bar_bytes, "training_rows": len(streamed),
+        "identical": bool(whole.equals(streamed)),
+        "fill_seconds": fill_seconds,
+        "whole_peak": whole_peak, "stream_peak": stream_peak,
+        "whole_seconds": whole_seconds, "stream_seconds": stream_seconds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.streaming")
+    parser.add_argument("--ticker", default=DEFAULT_TICKER)
+    parser.add_argument("--interval", default=DEFAULT_INTERVAL, choices=[i for i in CHUNK_DAYS if i != "1d"])
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS, help="years of intraday history")
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.ticker, args.interval, args.years)
+    print(pd.Series(report).to_string())
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
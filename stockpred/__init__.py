@@ -0,0 +1,16 @@
+"""Forecasting helpers shared by the Streamlit app and offline jobs.
+
+``stockpred.forecast`` and ``stockpred.ForecastResult`` are the public entry
+points (see ``stockpred.api``); they are resolved on first access so importing
+a submodule stays cheap.
+"""
+
+__all__ = ["ForecastResult", "InsufficientDataError", "forecast"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from stockpred import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module 'stockpred' has no attribute {name!r}")
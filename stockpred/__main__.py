@@ -0,0 +1,141 @@
+import argparse
+import json
+import logging
+from datetime import date
+
+from stockpred import http_api
+from stockpred import prefetch as prefetch_mod
+from stockpred.api import DEFAULT_END, DEFAULT_START
+from stockpred.companies import DEFAULT_COMPANIES_XML, read_companies
+from stockpred.price_store import PriceStore
+
+
+def _add_universe_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--xml", default=DEFAULT_COMPANIES_XML, help="companies.xml to read tickers from")
+    parser.add_argument("--tickers", nargs="*", help="explicit tickers (overrides --xml)")
+    parser.add_argument("--start", type=date.fromisoformat, default=DEFAULT_START)
+    parser.add_argument("--end", type=date.fromisoformat, default=DEFAULT_END)
+
+
+def _tickers(args) -> list:
+    return args.tickers or list(read_companies(args.xml).values())
+
+
+def cmd_prefetch(args):
+    summary = prefetch_mod.prefetch(
+        PriceStore(), _tickers(args), args.start, args.end,
+        batch_size=args.batch_size, max_workers=args.workers,
+        retries=args.retries, backoff=args.backoff,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+def cmd_forecast_all(args):
+    from stockpred.batch import forecast_all
+
+    report = forecast_all(
+        _tickers(args), args.start, args.end, args.years, args.out,
+        engines=args.engines, workers=args.workers, threads_per_worker=args.threads_per_worker,
+    )
+    for row in report.pop("per_ticker"):
+        seconds = f"{row['seconds']:.2f}s" if row["seconds"] is not None else "-"
+        print(f"{row['ticker']:<10} {row['engine']:<14} {seconds:>9}  {row['error'] or ''}")
+    print(json.dumps(report, indent=2, default=str))
+
+
+def cmd_backtest(args):
+    from stockpred.backtest import backtest, summarize
+
+    for ticker in _tickers(args):
+        folds = backtest(ticker, args.start, args.end, args.years, args.engines, args.folds,
+                         resolution=args.resolution, workers=args.workers)
+        print(f"\n{ticker}")
+        print(summarize(folds).round(3).to_string(index=False))
+        if args.verbose:
+            print(folds.round(3).to_string(index=False))
+
+
+def cmd_sweep(args):
+    from stockpred.api import InsufficientDataError
+    from stockpred.sweep import sweep
+
+    for ticker in _tickers(args):
+        for engine in args.engines:
+            try:
+                report = sweep(ticker, args.start, args.end, args.years, engine, args.method, args.eta,
+                               workers=args.workers, save=not args.dry_run)
+            except InsufficientDataError as exc:
+                print(f"{ticker:<10} {engine:<14} {exc}")
+                continue
+            trials = report.pop("per_trial")
+            print(f"{ticker:<10} {engine:<14} mape {report['mape'] or float('nan'):.3f}  {report['params']}")
+            print(f"{'':<10} {report['trials']} trials, {report['budget_used']:.2f} of {report['grid_budget']:.0f} "
+                  f"full fits ({report['saved_fraction']:.0%} saved), {report['fit_seconds']:.1f}s fitting "
+                  f"vs ~{report['grid_seconds_estimate']:.1f}s for the full grid")
+            if args.verbose:
+                print(trials.round(3).to_string(index=False))
+
+
+def cmd_serve(args):
+    app = http_api.create_app(companies=read_companies(args.xml), fit_workers=args.fit_workers)
+    http_api.serve(app, host=args.host, port=args.port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m stockpred")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("prefetch", help="warm the local price store for the whole universe")
+    _add_universe_args(p)
+    p.add_argument("--batch-size", type=int, default=prefetch_mod.DEFAULT_BATCH_SIZE)
+    p.add_argument("--workers", type=int, default=prefetch_mod.DEFAULT_MAX_WORKERS)
+    p.add_argument("--retries", type=int, default=prefetch_mod.DEFAULT_RETRIES)
+    p.add_argument("--backoff", type=float, default=prefetch_mod.DEFAULT_BACKOFF)
+    p.set_defaults(func=cmd_prefetch)
+
+    p = sub.add_parser("forecast-all", help="fit and forecast every ticker in a process pool")
+    _add_universe_args(p)
+    p.add_argument("--years", type=int, default=1, help="forecast horizon in years")
+    p.add_argument("--engines", nargs="+", choices=["prophet", "neuralprophet", "fastlinear"], default=None)
+    p.add_argument("--workers", type=int, default=None, help="worker processes (default: cores / threads)")
+    p.add_argument("--threads-per-worker", type=int, default=1, help="Stan/Torch/BLAS threads per worker")
+    p.add_argument("--out", default="./forecasts", help="output directory for the Parquet results")
+    p.set_defaults(func=cmd_forecast_all)
+
+    p = sub.add_parser("backtest", help="walk-forward backtest of the engines per ticker")
+    _add_universe_args(p)
+    p.add_argument("--years", type=int, default=1, help="forecast horizon in years")
+    p.add_argument("--engines", nargs="+", choices=["prophet", "neuralprophet", "fastlinear"],
+                   default=["prophet", "neuralprophet"])
+    p.add_argument("--folds", type=int, default=5, help="number of cutoffs")
+    p.add_argument("--resolution", choices=["daily", "weekly", "monthly", "auto"], default="daily",
+                   help="training bars (auto: the coarsest the horizon allows)")
+    p.add_argument("--workers", type=int, default=None, help="worker processes for the folds (default: cores)")
+    p.add_argument("--verbose", action="store_true", help="also print every fold")
+    p.set_defaults(func=cmd_backtest)
+
+    p = sub.add_parser("sweep", help="tune engine hyperparameters per ticker by successive halving / Hyperband")
+    _add_universe_args(p)
+    p.add_argument("--years", type=int, default=1, help="holdout horizon in years")
+    p.add_argument("--engines", nargs="+", choices=["prophet", "neuralprophet"], default=["prophet"])
+    p.add_argument("--method", choices=["halving", "hyperband"], default="halving")
+    p.add_argument("--eta", type=int, default=3, help="keep the best 1/eta of each rung")
+    p.add_argument("--workers", type=int, default=None, help="worker processes for the trials (default: cores)")
+    p.add_argument("--dry-run", action="store_true", help="report the winners without saving them")
+    p.add_argument("--verbose", action="store_true", help="also print every trial")
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("serve", help="serve prices and forecasts over HTTP (ASGI, needs uvicorn)")
+    p.add_argument("--xml", default=DEFAULT_COMPANIES_XML, help="companies.xml listing the tickers to serve")
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=http_api.DEFAULT_PORT)
+    p.add_argument("--fit-workers", type=int, default=http_api.DEFAULT_FIT_WORKERS, help="threads running live fits")
+    p.set_defaults(func=cmd_serve)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Pure forecasting API shared by the Streamlit app, batch jobs and benchmarks.
+
+Nothing here touches Streamlit. The price, model and forecast stores a call
+uses are passed in, or default to one store of each kind per process
+(``default_price_store`` and friends), so ``forecast`` can run concurrently from
+threads and processes and repeated calls share open backends and in-memory caches.
+
+    from datetime import date
+    from stockpred import forecast
+
+    result = forecast("AAPL", date(2016, 1, 1), date(2026, 1, 1), horizon=1, engine="prophet")
+    result.future[["ds", result.yhat_col]]
+"""
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from stockpred.engines import ENGINES, fit_and_predict
+from stockpred.forecast_store import ForecastStore
+from stockpred.frames import (
+    ENGINE_FRAMES,
+    find_yearly_col,
+    find_yhat_col,
+    last_per_period,
+    monthly_summary_from_yhat,
+    period_ordinals,
+    to_components_df,
+)
+from stockpred.model_store import ModelStore, frame_digest
+from stockpred.price_store import DEFAULT_INTERVAL, PriceStore
+from stockpred.resolution import DAILY, SEASONALITY, resample_bars, resolve
+from stockpred.tracing import trace
+from stockpred.tuned_params import TunedParamsStore, params_digest
+
+DAYS_PER_YEAR = 365
+DEFAULT_ENGINE = "prophet"
+PORTFOLIO_COLUMNS = ["ticker", "engine", "last_close", "forecast_date", "forecast", "expected_return", "interval_width"]
+# The app's default training window
+DEFAULT_START = date(2016, 1, 1)
+DEFAULT_END = date(2026, 1, 1)
+# Intraday bars are trained on as the last close of each day
+TRAINING_RULE = "D"
+
+
+class InsufficientDataError(ValueError):
+    """Raised when the requested window has fewer than two usable prices."""
+
+
+@dataclass(frozen=True)
+class ForecastResult:
+    ticker: str
+    engine: str
+    start: date
+    end: date
+    periods: int
+    history: pd.DataFrame
+    forecast: pd.DataFrame
+    source: str  # "store" when read back precomputed, "fit" when computed by this call
+    params: Optional[dict] = None  # tuned overrides of the engine defaults, if a sweep found any
+    resolution: str = DAILY  # bars the model was trained on (stockpred.resolution)
+
+    @property
+    def yhat_col(self) -> Optional[str]:
+        return find_yhat_col(self.forecast)
+
+    @property
+    def yearly_col(self) -> Optional[str]:
+        return find_yearly_col(self.forecast)
+
+    @property
+    def future(self) -> pd.DataFrame:
+        return self.forecast[self.forecast["ds"] > self.history["ds"].max()]
+
+    @property
+    def monthly(self) -> pd.DataFrame:
+        return monthly_summary_from_yhat(self.future, self.yhat_col)
+
+    @property
+    def components(self) -> pd.DataFrame:
+        return to_components_df(self.forecast)
+
+    @property
+    def last_close(self) -> float:
+        return float(self.history.loc[self.history["ds"].idxmax(), "y"])
+
+
+# Stores used when a call does not pass its own: opened on first use, then shared by the process
+@lru_cache(maxsize=None)
+def default_price_store() -> PriceStore:
+    return PriceStore()
+
+
+@lru_cache(maxsize=None)
+def default_model_store() -> ModelStore:
+    return ModelStore()
+
+
+@lru_cache(maxsize=None)
+def default_forecast_store() -> ForecastStore:
+    return ForecastStore()
+
+
+@lru_cache(maxsize=None)
+def default_tuned_store() -> TunedParamsStore:
+    return TunedParamsStore()
+
+
+def horizon_days(horizon: int) -> int:
+    # Calendar-day horizon for a number of years (the app's forecast_years slider)
+    return int(horizon) * DAYS_PER_YEAR
+
+
+def load_prices(
+    ticker: str, start: date, end: date, *, interval: str = DEFAULT_INTERVAL, prices: Optional[PriceStore] = None,
+) -> pd.DataFrame:
+    # datetime64 dates and float32 prices, read-only views of the store's mapped file where possible
+    prices = prices if prices is not None else default_price_store()
+    return prices.get(ticker, start, end, interval)
+
+
+def stream_prices(
+    ticker: str,
+    start: date,
+    end: date,
+    *,
+    interval: str = DEFAULT_INTERVAL,
+    prices: Optional[PriceStore] = None,
+    progress: Optional[Callable[[float, str], None]] = None,
+) -> Iterator[pd.DataFrame]:
+    # ``load_prices`` one date chunk at a time (PriceStore.stream), for ranges too long to hold at once
+    prices = prices if prices is not None else default_price_store()
+    return prices.stream(ticker, start, end, interval, progress=progress)
+
+
+def tuned_params(
+    ticker: str, engine: str, *, tuned: Optional[TunedParamsStore] = None, resolution: str = DAILY,
+) -> Optional[dict]:
+    # The ticker's sweep winner for ``engine`` (python -m stockpred sweep), or None for defaults.
+    # Sweeps score daily fits, so weekly and monthly fits keep the defaults.
+    if resolution != DAILY:
+        return None
+    tuned = tuned if tuned is not None else default_tuned_store()
+    return tuned.get(ticker, engine)
+
+
+def training_frame(engine: str, prices: pd.DataFrame) -> pd.DataFrame:
+    convert = ENGINE_FRAMES[engine]
+    with trace(convert.__name__, engine=engine):
+        return convert(prices)
+
+
+def streaming_training_frame(engine: str, chunks: Iterable[pd.DataFrame], rule: str = TRAINING_RULE) -> pd.DataFrame:
+    """``training_frame`` built from price chunks as they arrive (``stream_prices``).
+
+    Each chunk is converted (dropping missing prices) and reduced to the last
+    close of every ``rule`` period. Its last period may continue in the next
+    chunk, so those rows are carried over instead of emitted. Only one chunk of
+    bars is held at a time; the result has one row per period.
+    """
+    convert = ENGINE_FRAMES[engine]
+    pieces, carry = [], None
+    with trace("streaming_training_frame", engine=engine, rule=rule):
+        for chunk in chunks:
+            df = convert(chunk)
+            if carry is not None:
+                df = pd.concat([carry, df], ignore_index=True)
+            if df.empty:
+                continue
+            periods = period_ordinals(df["ds"], rule)
+            open_period = periods == periods[-1]
+            carry = df[open_period]
+            if not open_period.all():
+                pieces.append(last_per_period(df[~open_period], rule))
+        if carry is not None and len(carry):
+            pieces.append(last_per_period(carry, rule))
+    if not pieces:
+        return pd.DataFrame({"ds": pd.Series(dtype="datetime64[ns]"), "y": pd.Series(dtype="float32")})
+    return pd.concat(pieces, ignore_index=True)
+
+
+def forecast_variant(params: Optional[dict], interval: str = DEFAULT_INTERVAL, resolution: str = DAILY) -> str:
+    # Forecast store tag: tuned parameters, intraday source bars and a coarser training resolution
+    parts = (params_digest(params), "" if interval == DEFAULT_INTERVAL else interval,
+             "" if resolution == DAILY else resolution)
+    return "-".join(part for part in parts if part)
+
+
+def stored_forecast_key(
+    ticker: str,
+    start: date,
+    end: date,
+    engine: str,
+    *,
+    history: pd.DataFrame,
+    periods: int,
+    params: Optional[dict] = None,
+    interval: str = DEFAULT_INTERVAL,
+    resolution: str = DAILY,
+    digest: Optional[str] = None,
+) -> str:
+    # The forecast store key ``stored_forecast`` reads for this request and history
+    resolution = resolve(resolution, periods, history["ds"])
+    digest = frame_digest(history) if digest is None else digest
+    return ForecastStore.key(ticker, engine, start, end, periods, digest, forecast_variant(params, interval, resolution))
+
+
+def stored_forecast(
+    ticker: str,
+    start: date,
+    end: date,
+    horizon: int = 1,
+    engine: str = DEFAULT_ENGINE,
+    *,
+    history: pd.DataFrame,
+    periods: Optional[int] = None,
+    forecasts: Optional[ForecastStore] = None,
+    params: Optional[dict] = None,
+    interval: str = DEFAULT_INTERVAL,
+    resolution: str = DAILY,
+    digest: Optional[str] = None,
+) -> Optional[ForecastResult]:
+    # Precomputed result (nightly batch or an earlier fit) for these overrides and this exact history, or None
+    periods = horizon_days(horizon) if periods is None else int(periods)
+    forecasts = forecasts if forecasts is not None else default_forecast_store()
+    resolution = resolve(resolution, periods, history["ds"])
+    digest = frame_digest(history) if digest is None else digest
+    frame = forecasts.get(ticker, engine, start, end, periods, digest, forecast_variant(params, interval, resolution))
+    if frame is None:
+        return None
+    history = resample_bars(history, resolution)
+    return ForecastResult(ticker, engine, start, end, periods, history, frame, "store", params, resolution)
+
+
+def forecast(
+    ticker: str,
+    start: date,
+    end: date,
+    horizon: int = 1,
+    engine: str = DEFAULT_ENGINE,
+    *,
+    periods: Optional[int] = None,
+    history: Optional[pd.DataFrame] = None,
+    prices: Optional[PriceStore] = None,
+    models: Optional[ModelStore] = None,
+    forecasts: Optional[ForecastStore] = None,
+    tuned: Optional[TunedParamsStore] = None,
+    params: Optional[dict] = None,
+    interval: str = DEFAULT_INTERVAL,
+    resolution: str = DAILY,
+    progress: Optional[Callable[[float, str], None]] = None,
+) -> ForecastResult:
+    """Forecast ``ticker`` from prices in ``[start, end)`` for ``horizon`` years.
+
+    ``periods`` overrides the horizon in calendar days. ``history`` skips the
+    price load when the caller already has the training frame. ``params``
+    overrides engine defaults; when omitted the ticker's sweep winner (if any) is
+    used for daily fits. Intraday ``interval`` bars are streamed and trained on as
+    daily closes. The model trains on daily bars unless ``resolution`` asks for
+    weekly or monthly ones, or for ``"auto"``, the coarsest the horizon allows
+    (``resolution.choose_resolution``); coarse bars fit faster but their intervals
+    cover far fewer of the realised prices. ``history`` is daily. Results are read
+    from and written back to the forecast store; fits go through the model store
+    (warm starts, cached forecasts).
+    """
+    periods = horizon_days(horizon) if periods is None else int(periods)
+    if history is None and interval != DEFAULT_INTERVAL:
+        history = streaming_training_frame(engine, stream_prices(ticker, start, end, interval=interval, prices=prices))
+    elif history is None:
+        history = training_frame(engine, load_prices(ticker, start, end, prices=prices))
+    if len(history) < 2:
+        raise InsufficientDataError(f"Not enough valid data points to train the {engine} model for {ticker}.")
+
+    forecasts = forecasts if forecasts is not None else default_forecast_store()
+    resolution = resolve(resolution, periods, history["ds"])
+    if params is None:
+        params = tuned_params(ticker, engine, tuned=tuned, resolution=resolution)
+    digest = frame_digest(history)
+    stored = stored_forecast(
+        ticker, start, end, engine=engine, history=history, periods=periods, forecasts=forecasts, params=params,
+        interval=interval, resolution=resolution, digest=digest,
+    )
+    if stored is not None:
+        return stored
+    history = resample_bars(history, resolution)
+    overrides = {**(params or {}), **SEASONALITY[resolution]}
+    frame = fit_and_predict(
+        engine, history, periods,
+        ticker=ticker, params={**ENGINES[engine].params, **overrides} if overrides else None,
+        store=models if models is not None else default_model_store(), progress=progress,
+    )
+    forecasts.put(ticker, engine, start, end, periods, digest, frame, forecast_variant(params, interval, resolution))
+    return ForecastResult(ticker, engine, start, end, periods, history, frame, "fit", params, resolution)
+
+
+def portfolio_summary(results: Iterable[ForecastResult]) -> pd.DataFrame:
+    """One row per forecast, read at the end of its horizon.
+
+    ``expected_return`` is the forecast over the last close and ``interval_width``
+    the uncertainty interval over the forecast, both in percent.
+    """
+    rows = []
+    for result in results:
+        future, col = result.future, result.yhat_col
+        if future.empty or col is None:
+            continue
+        end = future.iloc[-1]
+        yhat = float(end[col])
+        lower, upper = end.get(f"{col}_lower"), end.get(f"{col}_upper")
+        rows.append({
+            "ticker": result.ticker, "engine": result.engine, "last_close": result.last_close,
+            "forecast_date": end["ds"], "forecast": yhat,
+            "expected_return": (yhat / result.last_close - 1) * 100,
+            "interval_width": (upper - lower) / abs(yhat) * 100 if lower is not None and upper is not None and yhat else np.nan,
+        })
+    return pd.DataFrame(rows, columns=PORTFOLIO_COLUMNS)
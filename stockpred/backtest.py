@@ -0,0 +1,323 @@
+"""Rolling-origin (walk-forward) backtests of the forecasting engines.
+
+Each fold trains on every price up to a cutoff and is scored on the following
+``periods`` calendar days: MAPE and RMSE of the point forecast, and the share of
+actual prices inside ``[yhat_lower, yhat_upper]``. Cutoffs step back from the
+end of the window by half a horizon (Prophet's ``cross_validation`` default).
+
+The training frame is prepared once per ticker and sliced for every fold, and
+the fast linear engine's Fourier features are computed once for all folds.
+Prophet and NeuralProphet folds run in a process pool. Results are cached per
+engine in the ``backtests`` namespace of the cache backend.
+
+Folds are cut on daily prices whatever the training resolution: weekly or
+monthly fits train on the fold's bars (``resolution.resample_bars``) and are
+scored against the daily prices that followed, with the forecast interpolated
+between bar dates.
+"""
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from stockpred.api import InsufficientDataError, horizon_days, load_prices
+from stockpred.cache_backend import CacheBackend, LocalBackend, open_backend
+from stockpred.engines import ENGINES
+from stockpred.frames import ENGINE_FRAMES, find_yhat_col
+from stockpred.model_store import frame_digest
+from stockpred.price_store import PriceStore
+from stockpred.resolution import DAILY, SEASONALITY, infer_resolution, resample_bars, resolve
+from stockpred.trading_calendar import exchange_for_ticker
+
+DEFAULT_FOLDS = 5
+DEFAULT_ENGINES = ("prophet", "neuralprophet")
+# Engines whose folds are cheap enough to run in the calling process
+IN_PROCESS_ENGINES = {"fastlinear"}
+# About one trading year before the first cutoff
+MIN_TRAIN_ROWS = 252
+FOLD_COLUMNS = [
+    "engine", "fold", "cutoff", "train_rows", "test_rows",
+    "mape", "rmse", "coverage", "fit_seconds", "predict_seconds", "error",
+]
+
+
+@dataclass(frozen=True)
+class Fold:
+    index: int
+    cutoff: pd.Timestamp
+    train_rows: int  # rows [0, train_rows) are on or before the cutoff
+    test_end: int  # rows [train_rows, test_end) fall in (cutoff, cutoff + horizon]
+
+
+def make_folds(
+    ds: pd.Series,
+    n_folds: int,
+    periods: int,
+    period_days: Optional[float] = None,
+    min_train_rows: int = MIN_TRAIN_ROWS,
+) -> List[Fold]:
+    # ``ds`` sorted ascending; folds that would train on too little history are dropped
+    dates = pd.to_datetime(pd.Series(ds)).to_numpy(dtype="datetime64[ns]")
+    horizon = pd.Timedelta(days=int(periods))
+    step = pd.Timedelta(days=period_days if period_days is not None else int(periods) // 2)
+    last = pd.Timestamp(dates[-1])
+    folds = []
+    for i in range(n_folds):
+        cutoff = last - horizon - (n_folds - 1 - i) * step
+        train_rows = int(np.searchsorted(dates, np.datetime64(cutoff), side="right"))
+        test_end = int(np.searchsorted(dates, np.datetime64(cutoff + horizon), side="right"))
+        if train_rows >= min_train_rows and test_end > train_rows:
+            folds.append(Fold(len(folds), cutoff, train_rows, test_end))
+    return folds
+
+
+def score(y, yhat, lower=None, upper=None) -> dict:
+    y, yhat = np.asarray(y, dtype=float), np.asarray(yhat, dtype=float)
+    err = yhat - y
+    nonzero = y != 0
+    out = {
+        "test_rows": int(len(y)),
+        "mape": float(np.mean(np.abs(err[nonzero] / y[nonzero])) * 100) if nonzero.any() else np.nan,
+        "rmse": float(np.sqrt(np.mean(err ** 2))) if len(y) else np.nan,
+        "coverage": np.nan,
+    }
+    if lower is not None and upper is not None:
+        lower, upper = np.asarray(lower, dtype=float), np.asarray(upper, dtype=float)
+        if not np.isnan(lower).all():
+            out["coverage"] = float(np.mean((y >= lower) & (y <= upper)))
+    return out
+
+
+def _interpolated(test: pd.DataFrame, pred: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    # Weekly / monthly forecasts at the daily test dates inside their range
+    pred = pred.sort_values("ds").drop_duplicates("ds")
+    x = pred["ds"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    test = test[(test["ds"] >= pred["ds"].iloc[0]) & (test["ds"] <= pred["ds"].iloc[-1])]
+    at = test["ds"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    out = test[["ds", "y"]].reset_index(drop=True)
+    for col in cols:
+        out[col] = np.interp(at, x, pred[col].to_numpy(dtype=float))
+    return out
+
+
+def _fold_row(engine: str, fold: Fold, test: pd.DataFrame, pred: pd.DataFrame, fit_s: float, predict_s: float) -> dict:
+    yhat_col = find_yhat_col(pred)
+    lower, upper = f"{yhat_col}_lower", f"{yhat_col}_upper"
+    # Only the forecast columns: NeuralProphet's output repeats ``y``
+    cols = [c for c in (yhat_col, lower, upper) if c in pred.columns]
+    if infer_resolution(pred["ds"]) == DAILY:
+        merged = test[["ds", "y"]].merge(pred[["ds"] + cols], on="ds", how="inner")
+    else:
+        merged = _interpolated(test, pred, cols)
+    scores = score(
+        merged["y"], merged[yhat_col],
+        merged[lower] if lower in merged.columns else None,
+        merged[upper] if upper in merged.columns else None,
+    )
+    return {
+        "engine": engine, "fold": fold.index, "cutoff": fold.cutoff, "train_rows": fold.train_rows,
+        **scores, "fit_seconds": fit_s, "predict_seconds": predict_s, "error": None,
+    }
+
+
+def run_fold(
+    engine: str, df: pd.DataFrame, fold: Fold, exchange: str, params: Optional[dict] = None, resolution: str = DAILY,
+) -> dict:
+    # One fold through the engine's own fit / predict (module level so it pickles into the pool)
+    eng = ENGINES[engine]
+    params = {**(eng.params if params is None else params), **SEASONALITY[resolution]}
+    train, test = df.iloc[:fold.train_rows], df.iloc[fold.train_rows:fold.test_end]
+    periods = (test["ds"].max() - train["ds"].max()).days
+    started = time.perf_counter()
+    train = resample_bars(train, resolution)
+    model = eng.fit(train, params)
+    fitted = time.perf_counter()
+    pred = eng.predict(model, train, periods, exchange=exchange)
+    return _fold_row(engine, fold, test, pred, fitted - started, time.perf_counter() - fitted)
+
+
+def _fastlinear_folds(df: pd.DataFrame, folds: List[Fold], params: Optional[dict] = None) -> List[dict]:
+    # Seasonality depends only on dates: compute it once for the whole frame, slice per fold
+    from stockpred.fastlinear import FASTLINEAR_PARAMS, FastLinear, seasonal_features
+
+    params = dict(FASTLINEAR_PARAMS if params is None else params)
+    seasonal = seasonal_features(df["ds"], **params)
+    rows = []
+    for fold in folds:
+        train, test = df.iloc[:fold.train_rows], df.iloc[fold.train_rows:fold.test_end]
+        started = time.perf_counter()
+        model = FastLinear(**params).fit(train, {k: v[:fold.train_rows] for k, v in seasonal.items()})
+        fitted = time.perf_counter()
+        pred = model.predict(test, {k: v[fold.train_rows:fold.test_end] for k, v in seasonal.items()})
+        rows.append(_fold_row("fastlinear", fold, test, pred, fitted - started, time.perf_counter() - fitted))
+    return rows
+
+
+def _failed_row(engine: str, fold: Fold, exc: BaseException) -> dict:
+    row = dict.fromkeys(FOLD_COLUMNS)
+    row.update(engine=engine, fold=fold.index, cutoff=fold.cutoff, train_rows=fold.train_rows,
+               mape=np.nan, rmse=np.nan, coverage=np.nan, error=f"{type(exc).__name__}: {exc}")
+    return row
+
+
+# -----------------------------
+# Results cache
+# -----------------------------
+class BacktestStore:
+    """Per-fold results by ticker, engine, window, horizon, fold count and data digest."""
+
+    def __init__(self, root: Optional[Path] = None, *, backend: Optional[CacheBackend] = None):
+        if backend is None:
+            backend = LocalBackend(root) if root is not None else open_backend("backtests")
+        self.backend = backend
+
+    @staticmethod
+    def _key(
+        ticker: str, engine: str, start: date, end: date, periods: int, n_folds: int, digest: str,
+        resolution: str = DAILY,
+    ) -> str:
+        suffix = f"-{resolution}" if resolution != DAILY else ""
+        return f"{ticker}/{engine}/{start}_{end}_{int(periods)}_{int(n_folds)}_{digest[:16]}{suffix}.parquet"
+
+    def get(self, *key) -> Optional[pd.DataFrame]:
+        payload = self.backend.get(self._key(*key))
+        return pd.read_parquet(io.BytesIO(payload)) if payload is not None else None
+
+    def put(self, *key, folds: pd.DataFrame):
+        buf = io.BytesIO()
+        folds.to_parquet(buf, index=False)
+        self.backend.put(self._key(*key), buf.getvalue())
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def prepare_frames(prices: pd.DataFrame, engines: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    # One clean, sorted training frame per converter, shared by every engine using it and every fold
+    by_converter = {}
+    frames = {}
+    for engine in engines:
+        convert = ENGINE_FRAMES[engine]
+        if convert not in by_converter:
+            by_converter[convert] = convert(prices).sort_values("ds").reset_index(drop=True)
+        frames[engine] = by_converter[convert]
+    return frames
+
+
+def backtest(
+    ticker: str,
+    start: date,
+    end: date,
+    horizon: int = 1,
+    engines: Iterable[str] = DEFAULT_ENGINES,
+    n_folds: int = DEFAULT_FOLDS,
+    *,
+    periods: Optional[int] = None,
+    resolution: str = DAILY,
+    prices: Optional[PriceStore] = None,
+    store: Optional[BacktestStore] = None,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[float, str], None]] = None,
+    cached_only: bool = False,
+) -> Optional[pd.DataFrame]:
+    """Per-fold scores (``FOLD_COLUMNS``) of ``engines`` on ``ticker`` over ``[start, end)``.
+
+    Engines train at ``resolution``, daily by default like ``api.forecast``
+    (``"auto"`` picks the coarsest the horizon allows). Engines with cached results for the same prices are
+    not re-run. With ``cached_only`` nothing is fitted and ``None`` is returned
+    unless every engine is cached.
+    """
+    engines = list(dict.fromkeys(engines))
+    periods = horizon_days(horizon) if periods is None else int(periods)
+    store = store if store is not None else BacktestStore()
+    report = progress or (lambda fraction, message="": None)
+
+    frames = prepare_frames(load_prices(ticker, start, end, prices=prices), engines)
+    digests = {engine: frame_digest(df) for engine, df in frames.items()}
+    resolution = resolve(resolution, periods, frames[engines[0]]["ds"])
+    results = {}
+    for engine in engines:
+        cached = store.get(ticker, engine, start, end, periods, n_folds, digests[engine], resolution)
+        if cached is not None:
+            results[engine] = cached
+    todo = [engine for engine in engines if engine not in results]
+    if todo and cached_only:
+        return None
+
+    if todo:
+        folds = make_folds(frames[todo[0]]["ds"], n_folds, periods)
+        if not folds:
+            raise InsufficientDataError(
+                f"Not enough history for {n_folds} folds of {periods} days for {ticker}; "
+                "widen the date range or shorten the horizon."
+            )
+        exchange = exchange_for_ticker(ticker)
+        rows: Dict[str, List[dict]] = {engine: [] for engine in todo}
+        total, done = len(folds) * len(todo), 0
+        report(0.0, f"Backtesting {len(folds)} folds")
+
+        for engine in (e for e in todo if e in IN_PROCESS_ENGINES):
+            if resolution == DAILY:
+                rows[engine] = _fastlinear_folds(frames[engine], folds)
+            else:
+                rows[engine] = [run_fold(engine, frames[engine], fold, exchange, resolution=resolution) for fold in folds]
+            done += len(folds)
+            report(done / total, f"{engine}: {len(folds)} folds done")
+
+        pooled = [engine for engine in todo if engine not in IN_PROCESS_ENGINES]
+        if pooled:
+            from stockpred.batch import init_worker
+
+            n_tasks = len(folds) * len(pooled)
+            pool = ProcessPoolExecutor(
+                max_workers=min(n_tasks, workers or os.cpu_count() or 2),
+                mp_context=multiprocessing.get_context("spawn"), initializer=init_worker, initargs=(1,),
+            )
+            try:
+                futures = {
+                    pool.submit(run_fold, engine, frames[engine], fold, exchange, None, resolution): (engine, fold)
+                    for engine in pooled
+                    for fold in folds
+                }
+                for future in as_completed(futures):
+                    engine, fold = futures[future]
+                    try:
+                        rows[engine].append(future.result())
+                    except Exception as exc:
+                        rows[engine].append(_failed_row(engine, fold, exc))
+                    done += 1
+                    report(done / total, f"{engine}: fold {fold.index + 1} of {len(folds)} done")
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        for engine, engine_rows in rows.items():
+            folds_df = pd.DataFrame(engine_rows, columns=FOLD_COLUMNS).sort_values("fold").reset_index(drop=True)
+            if folds_df["error"].isna().all():
+                store.put(ticker, engine, start, end, periods, n_folds, digests[engine], resolution, folds=folds_df)
+            results[engine] = folds_df
+
+    return pd.concat([results[engine] for engine in engines], ignore_index=True)
+
+
+def summarize(folds: pd.DataFrame) -> pd.DataFrame:
+    # One row per engine, best (lowest) mean MAPE first
+    ok = folds[folds["error"].isna()]
+    summary = ok.groupby("engine").agg(
+        folds=("fold", "count"),
+        mape=("mape", "mean"),
+        mape_std=("mape", "std"),
+        rmse=("rmse", "mean"),
+        coverage=("coverage", "mean"),
+        fit_seconds=("fit_seconds", "mean"),
+    ).reindex(list(dict.fromkeys(folds["engine"])))
+    summary["folds"] = summary["folds"].fillna(0).astype(int)
+    summary["failed"] = folds[folds["error"].notna()].groupby("engine").size().reindex(summary.index).fillna(0).astype(int)
+    return summary.rename_axis("engine").reset_index().sort_values("mape", na_position="last").reset_index(drop=True)
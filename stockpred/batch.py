@@ -0,0 +1,183 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from stockpred.frames import ENGINE_FRAMES, to_components_df
+from stockpred.prefetch import prefetch
+from stockpred.resolution import DAILY
+
+log = logging.getLogger(__name__)
+
+# Engines fitted together in the parent process instead of one pool task per ticker
+BATCHED_ENGINES = {"fastlinear"}
+# Native thread pools used by NumPy/BLAS, Stan and Torch in each worker process
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "STAN_NUM_THREADS"]
+
+OUTPUT_SCHEMA = pa.schema([
+    ("ticker", pa.string()),
+    ("engine", pa.string()),
+    ("as_of", pa.date32()),
+    ("ds", pa.timestamp("ns")),
+    ("yhat", pa.float64()),
+    ("yhat_lower", pa.float64()),
+    ("yhat_upper", pa.float64()),
+    ("trend", pa.float64()),
+    ("yearly", pa.float64()),
+    ("weekly", pa.float64()),
+])
+
+
+def init_worker(threads: int):
+    # Spawned workers only: the parent process keeps its own thread settings. Stan reads
+    # these when it launches; BLAS pools NumPy already loaded are limited through threadpoolctl.
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    logging.getLogger("prophet").setLevel(logging.WARNING)
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    logging.getLogger("NP").setLevel(logging.WARNING)
+
+
+def forecast_ticker(ticker: str, engine: str, start: date, end: date, periods: int) -> dict:
+    from stockpred.api import InsufficientDataError, forecast
+
+    started = time.perf_counter()
+    try:
+        result = forecast(ticker, start, end, engine=engine, periods=periods)
+    except InsufficientDataError:
+        return {"ticker": ticker, "engine": engine, "seconds": time.perf_counter() - started,
+                "rows": 0, "error": "not enough data", "forecast": None}
+    return {"ticker": ticker, "engine": engine, "seconds": time.perf_counter() - started,
+            "rows": len(result.history), "error": None, "forecast": result.components}
+
+
+def forecast_fastlinear_batch(
+    tickers: List[str], start: date, end: date, periods: int, resolution: str = DAILY,
+) -> List[dict]:
+    # One batched least-squares solve per group of tickers sharing trading dates
+    from stockpred.api import default_forecast_store, default_price_store, forecast_variant
+    from stockpred.fastlinear import FASTLINEAR_PARAMS, fit_many, predict_fastlinear
+    from stockpred.model_store import frame_digest
+    from stockpred.resolution import SEASONALITY, resample_bars, resolve
+    from stockpred.trading_calendar import exchange_for_ticker
+
+    started = time.perf_counter()
+    store = default_price_store()
+    frames = {ticker: ENGINE_FRAMES["fastlinear"](store.get(ticker, start, end)) for ticker in tickers}
+    # The digest and resolution api.forecast would use, so its lookups find these forecasts
+    digests = {ticker: frame_digest(df) for ticker, df in frames.items()}
+    resolutions = {ticker: resolve(resolution, periods, df["ds"]) for ticker, df in frames.items()}
+    frames = {ticker: resample_bars(df, resolutions[ticker]) for ticker, df in frames.items()}
+    models = {}
+    for group_resolution in set(resolutions.values()):
+        group = {t: df for t, df in frames.items() if resolutions[t] == group_resolution and len(df) >= 2}
+        models.update(fit_many(group, **{**FASTLINEAR_PARAMS, **SEASONALITY[group_resolution]}))
+    forecast_store = default_forecast_store()
+    per_fit = (time.perf_counter() - started) / max(1, len(tickers))
+    results = []
+    for ticker, df in frames.items():
+        model = models.get(ticker)
+        if model is None:
+            results.append({"ticker": ticker, "engine": "fastlinear", "seconds": per_fit,
+                            "rows": len(df), "error": "not enough data", "forecast": None})
+            continue
+        forecast = predict_fastlinear(model, df, periods, exchange_for_ticker(ticker))
+        forecast_store.put(ticker, "fastlinear", start, end, periods, digests[ticker], forecast,
+                           forecast_variant(None, resolution=resolutions[ticker]))
+        results.append({"ticker": ticker, "engine": "fastlinear", "seconds": per_fit,
+                        "rows": len(df), "error": None, "forecast": to_components_df(forecast)})
+    return results
+
+
+def forecast_all(
+    tickers: Iterable[str],
+    start: date,
+    end: date,
+    years: int,
+    out_dir: Path,
+    engines: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    threads_per_worker: int = 1,
+) -> dict:
+    from stockpred.api import default_price_store, horizon_days
+
+    tickers = list(dict.fromkeys(tickers))
+    engines = engines or [e for e in ENGINE_FRAMES if e not in BATCHED_ENGINES]
+    workers = workers or max(1, (os.cpu_count() or 2) // max(1, threads_per_worker))
+    periods = horizon_days(years)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"forecasts-{end.isoformat()}-{years}y.parquet"
+
+    # Fill the price store once up front so workers only read local files
+    prefetch(default_price_store(), tickers, start, end)
+
+    started = time.perf_counter()
+    timings = []
+
+    def record(result: dict, writer: pq.ParquetWriter):
+        forecast = result.pop("forecast")
+        if forecast is not None:
+            forecast.insert(0, "as_of", end)
+            forecast.insert(0, "engine", result["engine"])
+            forecast.insert(0, "ticker", result["ticker"])
+            writer.write_table(pa.Table.from_pandas(forecast, schema=OUTPUT_SCHEMA, preserve_index=False))
+        timings.append(result)
+        log.info("%-8s %-14s %s", result["ticker"], result["engine"],
+                 f"{result['seconds']:.2f}s" if result["seconds"] is not None else result["error"])
+
+    pooled = [engine for engine in engines if engine not in BATCHED_ENGINES]
+    ctx = multiprocessing.get_context("spawn")
+    with pq.ParquetWriter(out_path, OUTPUT_SCHEMA) as writer:
+        if "fastlinear" in engines:
+            for result in forecast_fastlinear_batch(tickers, start, end, periods):
+                record(result, writer)
+        if pooled:
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=ctx, initializer=init_worker, initargs=(threads_per_worker,)
+            ) as pool:
+                futures = {
+                    pool.submit(forecast_ticker, ticker, engine, start, end, periods): (ticker, engine)
+                    for ticker in tickers
+                    for engine in pooled
+                }
+                for future in as_completed(futures):
+                    ticker, engine = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        result = {"ticker": ticker, "engine": engine, "seconds": None, "rows": 0,
+                                  "error": repr(exc), "forecast": None}
+                    record(result, writer)
+
+    total = time.perf_counter() - started
+    ok = [t for t in timings if t["error"] is None]
+    return {
+        "output": str(out_path),
+        "fits": len(ok),
+        "failed": [(t["ticker"], t["engine"], t["error"]) for t in timings if t["error"] is not None],
+        "workers": workers,
+        "threads_per_worker": threads_per_worker,
+        "wall_seconds": round(total, 2),
+        "fits_per_minute": round(60 * len(ok) / total, 2) if total > 0 else None,
+        "per_ticker": sorted(timings, key=lambda t: (t["ticker"], t["engine"])),
+    }
@@ -0,0 +1,387 @@
+"""Key-value backends behind the price, model and forecast stores.
+
+Keys are ``/``-separated strings inside a namespace (``prices``, ``models``,
+``forecasts``); values are bytes. Every backend also provides a distributed
+lock, so with several app replicas on one backend only one node downloads a
+ticker or fits a model while the others wait and then read its result.
+
+``STOCKPRED_CACHE_URL`` picks the backend:
+
+* unset: local disk under ``STOCKPRED_CACHE_DIR`` (the default, single node);
+* ``file:///mnt/shared/stockpred``: the same layout in a directory shared by
+  every node (NFS, SMB), locked with lock files;
+* ``redis://host:6379/0``: Redis (needs the ``redis`` package).
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+from stockpred.config import CACHE_URL_ENV_VAR, cache_dir, temp_path
+
+log = logging.getLogger(__name__)
+
+# A holder refreshes its lock every ttl / 3; a lock not refreshed for ``ttl`` is stale
+DEFAULT_LOCK_TTL = 60.0
+DEFAULT_LOCK_TIMEOUT = 900.0
+LOCK_POLL_SECONDS = 0.05
+LOCK_DIR = ".locks"
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+class DistributedLock(ABC):
+    """Context manager around a backend lock, kept alive by a heartbeat thread while held."""
+
+    def __init__(self, name: str, ttl: float, timeout: float):
+        self.name = name
+        self.ttl = ttl
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    @abstractmethod
+    def _try_acquire(self) -> bool:
+        ...
+
+    @abstractmethod
+    def _refresh(self) -> bool:
+        # Extends the lock; False when it is no longer ours
+        ...
+
+    @abstractmethod
+    def _release(self):
+        ...
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while not self._try_acquire():
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f"Timed out after {self.timeout:.0f}s waiting for lock {self.name!r}")
+            time.sleep(LOCK_POLL_SECONDS)
+        self._heartbeat = threading.Thread(target=self._beat, name=f"lock-{self.name}", daemon=True)
+        self._heartbeat.start()
+
+    def _beat(self):
+        while not self._stop.wait(self.ttl / 3):
+            # A failed refresh must not end the heartbeat, or the lock expires under running work
+            try:
+                if not self._refresh():
+                    log.warning("Lock %r was lost while held: it went stale and was taken over", self.name)
+            except Exception:
+                log.warning("Could not refresh lock %r; retrying", self.name, exc_info=True)
+
+    def release(self):
+        self._stop.set()
+        self._release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class CacheBackend(ABC):
+    # True when the backend enforces its own size limit (e.g. Redis maxmemory), so stores skip eviction
+    manages_size = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, value: bytes):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    def delete_prefix(self, prefix: str):
+        for key in self.keys(prefix):
+            self.delete(key)
+
+    def exists(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    @abstractmethod
+    def keys(self, prefix: str = "") -> List[str]:
+        ...
+
+    @abstractmethod
+    def entries(self, prefix: str = "") -> List[Tuple[str, int, float]]:
+        # (key, size in bytes, last used) for size-bounded eviction
+        ...
+
+    def touch(self, key: str):
+        pass
+
+    def local_path(self, key: str) -> Optional[Path]:
+        # A file that can be memory-mapped directly, when the backend is a filesystem
+        return None
+
+    @abstractmethod
+    def lock(self, name: str, ttl: float = DEFAULT_LOCK_TTL, timeout: float = DEFAULT_LOCK_TIMEOUT) -> DistributedLock:
+        ...
+
+
+# -----------------------------
+# Local or shared directory
+# -----------------------------
+class _FileLock(DistributedLock):
+    def __init__(self, path: Path, name: str, ttl: float, timeout: float):
+        super().__init__(name, ttl, timeout)
+        self.path = path
+
+    def _try_acquire(self) -> bool:
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            self._break_if_stale()
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(self.token)
+        return True
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Tuple[str, float]]:
+        # (token, last refresh) of a lock file, or None when there is none
+        try:
+            return path.read_text(), path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _claim(self) -> Optional[Path]:
+        # Moves the lock file to a name of our own, so the file checked next cannot change under us
+        claimed = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.path.rename(claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def _restore(self, claimed: Path):
+        # Puts back a lock claimed by mistake; link does not overwrite a lock created meanwhile
+        try:
+            os.link(claimed, self.path)
+        except FileExistsError:
+            log.warning("Lock %r was taken again while it was set aside", self.name)
+        claimed.unlink(missing_ok=True)
+
+    def _break_if_stale(self):
+        seen = self._read(self.path)
+        if seen is None or time.time() - seen[1] <= self.ttl:
+            return
+        # The holder died without releasing. Another waiter may break the same lock and take a new
+        # one before our rename, so only the stale file we saw is discarded; anything else goes back.
+        claimed = self._claim()
+        if claimed is None:
+            return
+        taken = self._read(claimed)
+        if taken is not None and taken[0] == seen[0] and time.time() - taken[1] > self.ttl:
+            claimed.unlink(missing_ok=True)
+        else:
+            self._restore(claimed)
+
+    def _owned(self) -> bool:
+        try:
+            return self.path.read_text() == self.token
+        except FileNotFoundError:
+            return False
+
+    def _refresh(self) -> bool:
+        if not self._owned():
+            return False
+        os.utime(self.path)
+        return True
+
+    def _release(self):
+        # Checked again once set aside: if ours went stale and another node took it over after the
+        # first check, its lock is put back rather than deleted
+        if not self._owned():
+            return
+        claimed = self._claim()
+        if claimed is None:
+            return
+        taken = self._read(claimed)
+        if taken is not None and taken[0] == self.token:
+            claimed.unlink(missing_ok=True)
+        else:
+            self._restore(claimed)
+
+
+class LocalBackend(CacheBackend):
+    """Files under ``root``; writes go through a temp file and an atomic rename.
+
+    Works for one machine and for a directory shared by several nodes: the lock
+    is an exclusively-created lock file under ``root/.locks``.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    def put(self, key: str, value: bytes):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = temp_path(path)
+        tmp.write_bytes(value)
+        tmp.replace(path)
+
+    def delete(self, key: str):
+        self._path(key).unlink(missing_ok=True)
+
+    def delete_prefix(self, prefix: str):
+        path = self._path(prefix)
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            super().delete_prefix(prefix)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def _files(self, prefix: str):
+        base = self._path(prefix) if prefix.endswith("/") or not prefix else self.root
+        if not base.is_dir():
+            return
+        for path in base.rglob("*"):
+            rel = path.relative_to(self.root).as_posix()
+            if rel.startswith(LOCK_DIR) or path.name.endswith(".tmp") or not rel.startswith(prefix):
+                continue
+            if path.is_file():
+                yield rel, path
+
+    def keys(self, prefix: str = "") -> List[str]:
+        return [key for key, _ in self._files(prefix)]
+
+    def entries(self, prefix: str = "") -> List[Tuple[str, int, float]]:
+        out = []
+        for key, path in self._files(prefix):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            out.append((key, st.st_size, st.st_mtime))
+        return out
+
+    def touch(self, key: str):
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
+
+    def lock(self, name: str, ttl: float = DEFAULT_LOCK_TTL, timeout: float = DEFAULT_LOCK_TIMEOUT) -> DistributedLock:
+        locks = self.root / LOCK_DIR
+        locks.mkdir(exist_ok=True)
+        return _FileLock(locks / (name.replace("/", "_") + ".lock"), name, ttl, timeout)
+
+
+# -----------------------------
+# Redis
+# -----------------------------
+# Delete / extend the lock only while it still holds our token
+_RELEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+_REFRESH = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end return 0"
+
+
+def _glob_escape(text: str) -> str:
+    return "".join("\\" + c if c in "*?[]\\" else c for c in text)
+
+
+class _RedisLock(DistributedLock):
+    def __init__(self, client, key: str, name: str, ttl: float, timeout: float):
+        super().__init__(name, ttl, timeout)
+        self.client = client
+        self.key = key
+
+    def _try_acquire(self) -> bool:
+        return bool(self.client.set(self.key, self.token, nx=True, px=int(self.ttl * 1000)))
+
+    def _refresh(self) -> bool:
+        return bool(self.client.eval(_REFRESH, 1, self.key, self.token, int(self.ttl * 1000)))
+
+    def _release(self):
+        self.client.eval(_RELEASE, 1, self.key, self.token)
+
+
+class RedisBackend(CacheBackend):
+    """Values in Redis under ``stockpred:<namespace>:<key>``.
+
+    Size is left to the server: run it with ``maxmemory`` and
+    ``maxmemory-policy allkeys-lru``; reads ``TOUCH`` keys to keep them recent.
+    """
+
+    manages_size = True
+
+    def __init__(self, url: str, namespace: str = ""):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = f"stockpred:{namespace}:" if namespace else "stockpred:"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def put(self, key: str, value: bytes):
+        self.client.set(self.prefix + key, value)
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def exists(self, key: str) -> bool:
+        return bool(self.client.exists(self.prefix + key))
+
+    def keys(self, prefix: str = "") -> List[str]:
+        n = len(self.prefix)
+        match = _glob_escape(self.prefix + prefix) + "*"
+        return [k.decode("utf-8")[n:] for k in self.client.scan_iter(match=match, count=1000)
+                if not k.startswith(b"stockpred:lock:")]
+
+    def entries(self, prefix: str = "") -> List[Tuple[str, int, float]]:
+        keys = self.keys(prefix)
+        pipe = self.client.pipeline()
+        for key in keys:
+            pipe.strlen(self.prefix + key)
+        return [(key, size, 0.0) for key, size in zip(keys, pipe.execute())]
+
+    def touch(self, key: str):
+        self.client.touch(self.prefix + key)
+
+    def lock(self, name: str, ttl: float = DEFAULT_LOCK_TTL, timeout: float = DEFAULT_LOCK_TIMEOUT) -> DistributedLock:
+        return _RedisLock(self.client, f"stockpred:lock:{self.prefix}{name}", name, ttl, timeout)
+
+
+def open_backend(namespace: str, url: Optional[str] = None) -> CacheBackend:
+    url = url if url is not None else os.environ.get(CACHE_URL_ENV_VAR)
+    if not url:
+        return LocalBackend(cache_dir(namespace))
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return LocalBackend(Path(parsed.path) / namespace)
+    if parsed.scheme in ("redis", "rediss", "unix"):
+        return RedisBackend(url, namespace)
+    raise ValueError(f"Unsupported {CACHE_URL_ENV_VAR} scheme {parsed.scheme!r} (use file:// or redis://)")
@@ -0,0 +1,14 @@
+import xml.etree.ElementTree as ET
+
+DEFAULT_COMPANIES_XML = r"./Assets/companies.xml"
+
+
+def read_companies(xml_path: str = DEFAULT_COMPANIES_XML) -> dict:
+    tree = ET.parse(xml_path)
+    root = tree.getroot()
+    companies = {}
+    for company in root.findall("company"):
+        name = company.find("name").text.strip()
+        ticker = company.find("ticker").text.strip()
+        companies[name] = ticker
+    return companies
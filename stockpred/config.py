@@ -0,0 +1,23 @@
+import os
+import threading
+from pathlib import Path
+
+# -----------------------------
+# Cache locations
+# -----------------------------
+CACHE_ENV_VAR = "STOCKPRED_CACHE_DIR"
+# Shared backend for several app replicas (file:///shared/dir or redis://host); see cache_backend
+CACHE_URL_ENV_VAR = "STOCKPRED_CACHE_URL"
+DEFAULT_CACHE_DIR = "./.cache"
+
+
+def cache_dir(*parts: str) -> Path:
+    root = Path(os.environ.get(CACHE_ENV_VAR, DEFAULT_CACHE_DIR))
+    path = root.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def temp_path(path: Path) -> Path:
+    # Sibling temp file unique to this process and thread; written then renamed over ``path``
+    return path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
@@ -0,0 +1,207 @@
+import importlib
+import logging
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+from stockpred.jobs import JobCancelled
+from stockpred.tracing import trace
+from stockpred.trading_calendar import exchange_for_ticker
+
+log = logging.getLogger(__name__)
+
+# Share of the progress bar spent fitting (the rest is cache lookups and predict)
+FIT_PROGRESS = (0.05, 0.9)
+# Third-party engines: ``[project.entry-points."stockpred.engines"] name = "package.module:ENGINE"``
+ENTRY_POINT_GROUP = "stockpred.engines"
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+@dataclass(frozen=True)
+class Engine:
+    name: str
+    params: dict
+    fit: Callable
+    warm_fit: Callable
+    predict: Callable
+    dump: Callable
+    load: Callable
+
+
+class EngineRegistry(Mapping):
+    """Engines by name, each imported from its own module on first use.
+
+    Registering records only a ``"module:attribute"`` path, so importing this
+    module never loads Stan, Torch or Lightning; ``ENGINES["prophet"]`` does,
+    once. ``preload`` performs those imports on a background thread.
+    """
+
+    def __init__(self):
+        self._targets: Dict[str, str] = {}
+        self._loaded: Dict[str, Engine] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._discovered = False
+
+    def register(self, name: str, target: str):
+        with self._guard:
+            self._targets[name] = target
+            self._loaded.pop(name, None)
+
+    def _discover(self):
+        # Entry points are read once and never override built-in names
+        with self._guard:
+            if self._discovered:
+                return
+            self._discovered = True
+            for ep in entry_points(group=ENTRY_POINT_GROUP):
+                self._targets.setdefault(ep.name, ep.value)
+
+    def __getitem__(self, name: str) -> Engine:
+        engine = self._loaded.get(name)
+        if engine is not None:
+            return engine
+        self._discover()
+        with self._guard:
+            target = self._targets.get(name)
+            if target is None:
+                raise KeyError(name)
+            lock = self._locks.setdefault(name, threading.Lock())
+        # One lock per engine: loading Torch for one engine never blocks another
+        with lock:
+            if name not in self._loaded:
+                module, _, attr = target.partition(":")
+                with trace("import_engine", engine=name):
+                    self._loaded[name] = getattr(importlib.import_module(module), attr or "ENGINE")
+        return self._loaded[name]
+
+    def __iter__(self):
+        self._discover()
+        return iter(list(self._targets))
+
+    def __len__(self) -> int:
+        self._discover()
+        return len(self._targets)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def preload(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        names = list(self if names is None else names)
+
+        def run():
+            for name in names:
+                try:
+                    self[name]
+                except Exception:
+                    log.warning("Could not preload engine %r", name, exc_info=True)
+
+        thread = threading.Thread(target=run, name="stockpred-engine-preload", daemon=True)
+        thread.start()
+        return thread
+
+
+ENGINES = EngineRegistry()
+ENGINES.register("fastlinear", "stockpred.fastlinear:ENGINE")
+ENGINES.register("prophet", "stockpred.prophet_engine:ENGINE")
+ENGINES.register("neuralprophet", "stockpred.neuralprophet_engine:ENGINE")
+
+
+def warm_start(eng: Engine, df: pd.DataFrame, params: dict, *, ticker, store, progress=None):
+    # Refit from the latest cached model trained on a prefix of ``df``
+    prefix_key = store.find_prefix(eng.name, ticker, df, params)
+    if prefix_key is None:
+        return None
+    previous = _load_model(eng, prefix_key, ticker, store)
+    if previous is None:
+        return None
+    if progress is not None:
+        progress(FIT_PROGRESS[0], "Warm-starting from a previous fit")
+    try:
+        with trace("warm_fit", engine=eng.name, ticker=ticker, rows=len(df)):
+            return eng.warm_fit(df, params, previous, progress=progress)
+    except JobCancelled:
+        raise
+    except Exception:
+        log.warning("Warm start of %s for %s failed; fitting from scratch", eng.name, ticker, exc_info=True)
+        return None
+
+
+def _load_model(eng: Engine, key: str, ticker, store):
+    # A cached model that no longer loads (library upgrade, truncated write) is a cache miss
+    try:
+        return store.load_model(key, eng)
+    except Exception:
+        log.warning("Could not load cached %s model %s; refitting", eng.name, key, exc_info=True)
+        return None
+
+
+def fit_and_predict(
+    engine: str,
+    df: pd.DataFrame,
+    periods: int,
+    *,
+    ticker: Optional[str] = None,
+    params: Optional[dict] = None,
+    store=None,
+    progress: Optional[Callable[[float, str], None]] = None,
+) -> pd.DataFrame:
+    eng = ENGINES[engine]
+    params = dict(eng.params if params is None else params)
+    exchange = exchange_for_ticker(ticker)
+    report = progress or (lambda fraction, message="": None)
+    if store is None:
+        report(FIT_PROGRESS[0], f"Fitting {engine}")
+        with trace("fit", engine=engine, ticker=ticker, rows=len(df)):
+            model = eng.fit(df, params, progress=progress)
+        report(FIT_PROGRESS[1], "Predicting")
+        with trace("predict", engine=engine, ticker=ticker, periods=periods):
+            return eng.predict(model, df, periods, exchange=exchange)
+
+    report(0.0, "Checking model cache")
+    key = store.key(engine, df, params)
+    return store.flight.do(
+        (key, periods, exchange),
+        lambda: _fit_and_predict_locked(eng, key, df, periods, params, ticker, store, progress),
+        lookup=lambda: store.load_forecast(key, periods, calendar=exchange),
+    )
+
+
+def _fit_and_predict_locked(eng: Engine, key: str, df, periods: int, params: dict, ticker, store, progress):
+    # Only one node sharing the cache backend fits a key; the rest wait here and then read its forecast
+    exchange = exchange_for_ticker(ticker)
+    lock = store.lock(key, periods, calendar=exchange)
+    with trace("lock_wait", engine=eng.name, ticker=ticker):
+        lock.acquire()
+    try:
+        forecast = store.load_forecast(key, periods, calendar=exchange)
+        if forecast is not None:
+            return forecast
+        return _fit_and_predict_cached(eng, key, df, periods, params, ticker, store, progress)
+    finally:
+        lock.release()
+
+
+def _fit_and_predict_cached(eng: Engine, key: str, df, periods: int, params: dict, ticker, store, progress):
+    exchange = exchange_for_ticker(ticker)
+    report = progress or (lambda fraction, message="": None)
+    with trace("load_model", engine=eng.name, ticker=ticker):
+        model = _load_model(eng, key, ticker, store)
+    if model is None:
+        model = warm_start(eng, df, params, ticker=ticker, store=store, progress=progress)
+        if model is None:
+            report(FIT_PROGRESS[0], f"Fitting {eng.name}")
+            with trace("fit", engine=eng.name, ticker=ticker, rows=len(df)):
+                model = eng.fit(df, params, progress=progress)
+        store.save_model(key, eng, model, ticker=ticker, df=df, params=params)
+    report(FIT_PROGRESS[1], "Predicting")
+    with trace("predict", engine=eng.name, ticker=ticker, periods=periods):
+        forecast = eng.predict(model, df, periods, exchange=exchange)
+    store.save_forecast(key, periods, forecast, calendar=exchange)
+    return forecast
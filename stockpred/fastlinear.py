@@ -0,0 +1,269 @@
+import hashlib
+import io
+import json
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from stockpred.engines import Engine
+from stockpred.trading_calendar import DEFAULT_EXCHANGE, future_frame
+
+# -----------------------------
+# Prophet-equivalent defaults
+# -----------------------------
+N_CHANGEPOINTS = 25
+CHANGEPOINT_RANGE = 0.8
+CHANGEPOINT_PRIOR_SCALE = 0.05
+SEASONALITY_PRIOR_SCALE = 10.0
+INTERVAL_WIDTH = 0.8
+YEARLY_ORDER = 10
+WEEKLY_ORDER = 3
+YEARLY_PERIOD = 365.25
+WEEKLY_PERIOD = 7.0
+
+_Z = {0.5: 0.6745, 0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+
+def _days(ds: pd.Series) -> np.ndarray:
+    return pd.to_datetime(ds).to_numpy(dtype="datetime64[ns]").astype(np.int64) / (86400 * 1e9)
+
+def _order(seasonality: Union[bool, int], default: int) -> int:
+    return default if seasonality is True else int(seasonality)
+
+def fourier_terms(days: np.ndarray, period: float, order: int) -> np.ndarray:
+    # Same basis as Prophet.fourier_series: [sin(1x), cos(1x), sin(2x), ...]
+    x = 2.0 * np.pi * np.arange(1, order + 1)[None, :] * days[:, None] / period
+    out = np.empty((len(days), 2 * order))
+    out[:, 0::2] = np.sin(x)
+    out[:, 1::2] = np.cos(x)
+    return out
+
+
+class FastLinear:
+    """Prophet-style additive model solved as regularized least squares.
+
+    Piecewise-linear trend with Prophet's changepoint placement plus Fourier
+    yearly/weekly seasonality. The Laplace prior on changepoint deltas is
+    replaced by a ridge penalty of matching variance, so a fit is one linear
+    solve and many series sharing dates can be solved together (``fit_many``).
+    ``predict`` returns Prophet's ``ds``/``trend``/``yhat*``/``yearly``/``weekly``
+    columns so the existing plots work unchanged.
+    """
+
+    def __init__(
+        self,
+        yearly_seasonality: Union[bool, int] = True,
+        weekly_seasonality: Union[bool, int] = True,
+        daily_seasonality: bool = False,
+        n_changepoints: int = N_CHANGEPOINTS,
+        changepoint_range: float = CHANGEPOINT_RANGE,
+        changepoint_prior_scale: float = CHANGEPOINT_PRIOR_SCALE,
+        seasonality_prior_scale: float = SEASONALITY_PRIOR_SCALE,
+        interval_width: float = INTERVAL_WIDTH,
+    ):
+        # daily_seasonality is accepted for signature parity; daily bars carry no intraday cycle.
+        # Like Prophet, an int seasonality is its Fourier order and True the default order.
+        self.yearly_seasonality = yearly_seasonality
+        self.weekly_seasonality = weekly_seasonality
+        self.n_changepoints = n_changepoints
+        self.changepoint_range = changepoint_range
+        self.changepoint_prior_scale = changepoint_prior_scale
+        self.seasonality_prior_scale = seasonality_prior_scale
+        self.interval_width = interval_width
+        self.history: Optional[pd.DataFrame] = None
+
+    # -----------------------------
+    # Design matrix
+    # -----------------------------
+    def _setup(self, ds: pd.Series):
+        days = _days(ds)
+        self.start = days.min()
+        self.t_scale = max(days.max() - self.start, 1.0)
+        hist_size = int(np.floor(len(days) * self.changepoint_range))
+        n_cp = min(self.n_changepoints, max(hist_size - 1, 0))
+        if n_cp > 0:
+            idx = np.linspace(0, hist_size - 1, n_cp + 1).round().astype(int)[1:]
+            self.changepoints_t = (days[idx] - self.start) / self.t_scale
+        else:
+            self.changepoints_t = np.zeros(0)
+
+    def _seasonal(self, days: np.ndarray) -> Dict[str, np.ndarray]:
+        blocks = {}
+        if self.yearly_seasonality:
+            blocks["yearly"] = fourier_terms(days, YEARLY_PERIOD, _order(self.yearly_seasonality, YEARLY_ORDER))
+        if self.weekly_seasonality:
+            blocks["weekly"] = fourier_terms(days, WEEKLY_PERIOD, _order(self.weekly_seasonality, WEEKLY_ORDER))
+        return blocks
+
+    def _design(self, ds: pd.Series, seasonal: Optional[Dict[str, np.ndarray]] = None):
+        # ``seasonal``: precomputed Fourier blocks for these rows (see ``seasonal_features``)
+        days = _days(ds)
+        t = (days - self.start) / self.t_scale
+        trend = np.column_stack([np.ones_like(t), t, np.maximum(t[:, None] - self.changepoints_t[None, :], 0.0)])
+        if seasonal is None:
+            seasonal = self._seasonal(days)
+        return t, trend, seasonal
+
+    def _penalty(self, n_seasonal: int, noise_var: float) -> np.ndarray:
+        # Gaussian priors with the variance of Prophet's priors: Laplace(0, b) -> N(0, 2 b^2)
+        n_cp = len(self.changepoints_t)
+        lam_cp = noise_var / (2.0 * self.changepoint_prior_scale ** 2)
+        lam_season = noise_var / (self.seasonality_prior_scale ** 2)
+        return np.concatenate([np.zeros(2), np.full(n_cp, lam_cp), np.full(n_seasonal, lam_season)])
+
+    # -----------------------------
+    # Fit / predict
+    # -----------------------------
+    def _solve(self, ds: pd.Series, Y: np.ndarray, seasonal: Optional[Dict[str, np.ndarray]] = None):
+        # Y: (n_rows, n_series), already scaled. Returns coefficients (n_features, n_series)
+        # and residuals. The first pass takes the noise level from first differences and
+        # the second from the first pass's residuals (MAP with ||r||^2 + sigma^2/v ||beta||^2).
+        _, trend, seasonal = self._design(ds, seasonal)
+        X = np.hstack([trend] + list(seasonal.values()))
+        XtX, XtY = X.T @ X, X.T @ Y
+        noise_var = float(np.median(np.var(np.diff(Y, axis=0), axis=0) / 2.0)) if len(Y) > 2 else 1.0
+        for _ in range(2):
+            penalty = self._penalty(X.shape[1] - trend.shape[1], max(noise_var, 1e-12))
+            coef = np.linalg.solve(XtX + np.diag(penalty), XtY)
+            resid = Y - X @ coef
+            noise_var = float(np.median(np.mean(resid ** 2, axis=0)))
+        return coef, resid
+
+    def _finish_fit(self, df: pd.DataFrame, scale: float, coef: np.ndarray, resid: np.ndarray):
+        self.history = df[["ds", "y"]].reset_index(drop=True)
+        self.y_scale = scale
+        self.coef = coef
+        self.sigma = float(np.sqrt(np.mean(resid ** 2))) if len(resid) else 0.0
+        n_cp = len(self.changepoints_t)
+        self.deltas = coef[2:2 + n_cp]
+        return self
+
+    def fit(self, df: pd.DataFrame, seasonal: Optional[Dict[str, np.ndarray]] = None) -> "FastLinear":
+        # With ``seasonal`` the rows of ``df`` must already be clean and sorted
+        if seasonal is None:
+            df = df.dropna(subset=["y"]).sort_values("ds")
+        self._setup(df["ds"])
+        scale = float(np.abs(df["y"]).max()) or 1.0
+        coef, resid = self._solve(df["ds"], (df["y"].to_numpy(dtype=float) / scale)[:, None], seasonal)
+        return self._finish_fit(df, scale, coef[:, 0], resid[:, 0])
+
+    def make_future_dataframe(self, periods: int, freq: str = "D", include_history: bool = True) -> pd.DataFrame:
+        last = self.history["ds"].max()
+        dates = pd.date_range(start=last, periods=periods + 1, freq=freq)[1:]
+        if include_history:
+            dates = np.concatenate([self.history["ds"].to_numpy(), dates.to_numpy()])
+        return pd.DataFrame({"ds": pd.to_datetime(dates)})
+
+    def predict(self, future: Optional[pd.DataFrame] = None, seasonal: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+        if future is None:
+            future = self.history[["ds"]]
+        ds = pd.to_datetime(future["ds"]).reset_index(drop=True)
+        t, trend_x, seasonal = self._design(ds, seasonal)
+        n_trend = trend_x.shape[1]
+        out = pd.DataFrame({"ds": ds})
+        out["trend"] = trend_x @ self.coef[:n_trend] * self.y_scale
+        offset = n_trend
+        additive = np.zeros(len(ds))
+        for name, block in seasonal.items():
+            width = block.shape[1]
+            out[name] = block @ self.coef[offset:offset + width] * self.y_scale
+            additive += out[name].to_numpy()
+            offset += width
+        yhat = out["trend"].to_numpy() + additive
+
+        # Interval: observation noise plus Prophet-like random future trend changes
+        # (Poisson-timed changepoints with Laplace magnitudes of the fitted mean |delta|)
+        z = _Z.get(round(self.interval_width, 2), 1.2816)
+        horizon = np.maximum(t - 1.0, 0.0)
+        rate = len(self.changepoints_t)
+        b = float(np.mean(np.abs(self.deltas))) if len(self.deltas) else 0.0
+        trend_var = rate * 2.0 * b ** 2 * horizon ** 3 / 3.0
+        half = z * np.sqrt(self.sigma ** 2 + trend_var) * self.y_scale
+        out["yhat_lower"] = yhat - half
+        out["yhat_upper"] = yhat + half
+        out["yhat"] = yhat
+        return out
+
+
+def seasonal_features(ds: pd.Series, **params) -> Dict[str, np.ndarray]:
+    # Fourier blocks depend only on the dates, so one computation can be sliced for many fits
+    return FastLinear(**params)._seasonal(_days(ds))
+
+
+def fit_many(frames: Dict[str, pd.DataFrame], **params) -> Dict[str, FastLinear]:
+    # Series with identical ``ds`` share one design matrix and one factorization
+    groups: Dict[str, list] = {}
+    cleaned = {}
+    for ticker, df in frames.items():
+        df = df.dropna(subset=["y"]).sort_values("ds").reset_index(drop=True)
+        if len(df) < 2:
+            continue
+        cleaned[ticker] = df
+        digest = hashlib.sha1(pd.to_datetime(df["ds"]).to_numpy(dtype="datetime64[ns]").tobytes()).hexdigest()
+        groups.setdefault(digest, []).append(ticker)
+
+    models = {}
+    for tickers in groups.values():
+        ds = cleaned[tickers[0]]["ds"]
+        scales = np.array([float(np.abs(cleaned[t]["y"]).max()) or 1.0 for t in tickers])
+        Y = np.column_stack([cleaned[t]["y"].to_numpy(dtype=float) for t in tickers]) / scales
+        template = FastLinear(**params)
+        template._setup(ds)
+        coef, resid = template._solve(ds, Y)
+        for j, ticker in enumerate(tickers):
+            model = FastLinear(**params)
+            model.start, model.t_scale, model.changepoints_t = template.start, template.t_scale, template.changepoints_t
+            models[ticker] = model._finish_fit(cleaned[ticker], scales[j], coef[:, j], resid[:, j])
+    return models
+
+
+# -----------------------------
+# Engine adapters (registered in stockpred.engines.ENGINES)
+# -----------------------------
+FASTLINEAR_PARAMS = dict(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
+# Constructor arguments stored with a fitted model (daily_seasonality is not used)
+FASTLINEAR_ARGS = (
+    "yearly_seasonality", "weekly_seasonality", "n_changepoints", "changepoint_range",
+    "changepoint_prior_scale", "seasonality_prior_scale", "interval_width",
+)
+
+def fit_fastlinear(df_p: pd.DataFrame, params: dict, progress=None) -> FastLinear:
+    return FastLinear(**params).fit(df_p)
+
+def warm_fit_fastlinear(df_p: pd.DataFrame, params: dict, previous: FastLinear, progress=None) -> FastLinear:
+    # A closed-form fit is already cheaper than any warm start
+    return fit_fastlinear(df_p, params)
+
+def predict_fastlinear(model: FastLinear, df_p: pd.DataFrame, periods: int, exchange: str = DEFAULT_EXCHANGE) -> pd.DataFrame:
+    return model.predict(future_frame(model.history["ds"], periods, exchange))
+
+def dump_fastlinear(model: FastLinear) -> bytes:
+    # Constructor arguments as JSON and the fit as plain arrays: loading never unpickles
+    params = {name: getattr(model, name) for name in FASTLINEAR_ARGS}
+    buf = io.BytesIO()
+    np.savez(
+        buf,
+        params=np.array(json.dumps(params, default=lambda value: value.item())),
+        scalars=np.array([model.start, model.t_scale, model.y_scale, model.sigma]),
+        changepoints_t=model.changepoints_t,
+        coef=model.coef,
+        ds=model.history["ds"].to_numpy(dtype="datetime64[ns]"),
+        y=model.history["y"].to_numpy(),
+    )
+    return buf.getvalue()
+
+def load_fastlinear(payload: bytes) -> FastLinear:
+    with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+        model = FastLinear(**json.loads(str(data["params"])))
+        model.start, model.t_scale, model.y_scale, model.sigma = (float(v) for v in data["scalars"])
+        model.changepoints_t = data["changepoints_t"]
+        model.coef = data["coef"]
+        model.history = pd.DataFrame({"ds": data["ds"], "y": data["y"]})
+    model.deltas = model.coef[2:2 + len(model.changepoints_t)]
+    return model
+
+ENGINE = Engine(
+    "fastlinear", FASTLINEAR_PARAMS,
+    fit_fastlinear, warm_fit_fastlinear, predict_fastlinear, dump_fastlinear, load_fastlinear,
+)
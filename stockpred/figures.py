@@ -0,0 +1,204 @@
+import json
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+# -----------------------------
+# Point budget
+# -----------------------------
+# The wide layout leaves roughly this many horizontal pixels for a chart; more
+# than a couple of points per pixel cannot be seen, only shipped to the browser.
+PLOT_WIDTH_PX = 1200
+POINTS_PER_PX = 1.5
+# Above this many points per trace WebGL renders far faster than SVG
+SCATTERGL_THRESHOLD = 5000
+
+LAYOUT = dict(template="plotly_dark", hovermode="x unified", margin=dict(l=30, r=30, t=60, b=30))
+ACTUAL_COLOR, FORECAST_COLOR, COMPONENT_COLOR = "#FF6B6B", "#4D96FF", "#00D2A8"
+BAND_COLOR = "rgba(77,150,255,0.30)"
+
+
+def target_points(width_px: int = PLOT_WIDTH_PX, per_px: float = POINTS_PER_PX) -> int:
+    return int(width_px * per_px)
+
+
+def _numeric(x) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``n_out`` points keeping the visual shape.
+
+    The first and last points are always kept; each bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    mean of the next bucket, so spikes and turning points survive.
+    """
+    n = len(y)
+    # Series within the budget are sent as-is
+    if n_out < 3 or n <= n_out:
+        return np.arange(n)
+    # The kept point of each bucket depends on the previous one, so this walk is
+    # sequential; plain floats beat per-bucket NumPy calls on ~10-point buckets
+    x, y = _numeric(x), np.nan_to_num(np.asarray(y, dtype=float))
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean of bucket i + 1 for every bucket i; the last bucket looks at the final point
+    sizes = np.diff(edges)[1:]
+    next_x = (np.add.reduceat(x[: edges[-1]], edges[:-1])[1:] / sizes).tolist() + [x[-1]]
+    next_y = (np.add.reduceat(y[: edges[-1]], edges[:-1])[1:] / sizes).tolist() + [y[-1]]
+    xs, ys, edges = x.tolist(), y.tolist(), edges.tolist()
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        xa, ya = xs[a], ys[a]
+        dx, dy = xa - next_x[i], next_y[i] - ya
+        best, a_next = -1.0, edges[i]
+        for j in range(edges[i], edges[i + 1]):
+            area = abs(dx * (ys[j] - ya) - (xa - xs[j]) * dy)
+            if area > best:
+                best, a_next = area, j
+        a = a_next
+        out[i + 1] = a
+    return out
+
+
+def downsample(df: pd.DataFrame, x: str, y: str, max_points: Optional[int] = None) -> pd.DataFrame:
+    # Rows of ``df`` picked by LTTB on ``y``; other columns (e.g. bounds) follow the same rows
+    max_points = target_points() if max_points is None else max_points
+    if not max_points or len(df) <= max_points:
+        return df
+    return df.iloc[lttb_indices(df[x].to_numpy(), df[y].to_numpy(), max_points)]
+
+
+def line_trace(x, y, *, name=None, color=None, width=2, **kwargs):
+    trace_cls = go.Scattergl if len(x) > SCATTERGL_THRESHOLD else go.Scatter
+    line = dict(width=width) if color is None else dict(color=color, width=width)
+    return trace_cls(x=x, y=y, mode=kwargs.pop("mode", "lines"), name=name, line=line, **kwargs)
+
+
+# -----------------------------
+# App figures
+# -----------------------------
+def forecast_figure(
+    title: str,
+    actual: pd.DataFrame,
+    forecast: pd.DataFrame,
+    yhat_col: str,
+    lower_col: Optional[str] = None,
+    upper_col: Optional[str] = None,
+    max_points: Optional[int] = None,
+) -> go.Figure:
+    actual = downsample(actual, "ds", "y", max_points)
+    forecast = downsample(forecast, "ds", yhat_col, max_points)
+    fig = go.Figure()
+    fig.add_trace(line_trace(actual["ds"], actual["y"], name="Actual", color=ACTUAL_COLOR))
+    fig.add_trace(line_trace(forecast["ds"], forecast[yhat_col], name="Forecast", color=FORECAST_COLOR))
+    if lower_col and upper_col:
+        fig.add_trace(line_trace(forecast["ds"], forecast[upper_col], width=0, showlegend=False))
+        fig.add_trace(line_trace(forecast["ds"], forecast[lower_col], width=0, name="Confidence Interval",
+                                 fill="tonexty", fillcolor=BAND_COLOR))
+    fig.update_layout(title=title, xaxis_title="Date", yaxis_title="Adjusted Close (USD)", **LAYOUT)
+    return fig
+
+
+def component_figure(
+    title: str,
+    forecast: pd.DataFrame,
+    col: str,
+    *,
+    name: str,
+    yaxis_title: str,
+    color: str = COMPONENT_COLOR,
+    max_points: Optional[int] = None,
+) -> go.Figure:
+    forecast = downsample(forecast, "ds", col, max_points)
+    fig = go.Figure()
+    fig.add_trace(line_trace(forecast["ds"], forecast[col], name=name, color=color))
+    fig.update_layout(title=title, xaxis_title="Date", yaxis_title=yaxis_title, **LAYOUT)
+    return fig
+
+
+def monthly_figure(title: str, mdf: pd.DataFrame, col: str) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=mdf["month"], y=mdf[col], mode="lines+markers", name="Avg Forecast",
+                             line=dict(color=COMPONENT_COLOR, width=2), marker=dict(size=8)))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Month", yaxis_title="Average Forecasted Price",
+        xaxis=dict(dtick=1), template=LAYOUT["template"], margin=LAYOUT["margin"],
+    )
+    return fig
+
+
+ENGINE_COLORS = {"prophet": FORECAST_COLOR, "neuralprophet": ACTUAL_COLOR, "fastlinear": COMPONENT_COLOR}
+
+
+def backtest_figure(title: str, folds: pd.DataFrame, metric: str = "mape", yaxis_title: str = "MAPE (%)") -> go.Figure:
+    # One bar per engine and cutoff, so fold-to-fold spread is visible next to the mean
+    fig = go.Figure()
+    for engine, rows in folds[folds["error"].isna()].groupby("engine", sort=False):
+        fig.add_trace(go.Bar(
+            x=pd.to_datetime(rows["cutoff"]).dt.strftime("%Y-%m-%d"), y=rows[metric], name=engine,
+            marker_color=ENGINE_COLORS.get(engine),
+        ))
+    fig.update_layout(title=title, xaxis_title="Cutoff", yaxis_title=yaxis_title, barmode="group", **LAYOUT)
+    return fig
+
+
+PORTFOLIO_COLORS = qualitative.Plotly
+
+
+def portfolio_figure(title: str, series: list, max_points: Optional[int] = None) -> go.Figure:
+    # ``series``: (label, history, future, yhat_col) per ticker. Each is rebased to 100 at its last
+    # close so different price levels share one axis; history covers one horizon back.
+    fig = go.Figure()
+    for i, (label, history, future, yhat_col) in enumerate(series):
+        color = PORTFOLIO_COLORS[i % len(PORTFOLIO_COLORS)]
+        last = history["ds"].max()
+        base = float(history.loc[history["ds"] == last, "y"].iloc[-1])
+        recent = history[history["ds"] >= last - (future["ds"].max() - last)] if len(future) else history
+        recent = downsample(recent, "ds", "y", max_points)
+        future = downsample(future, "ds", yhat_col, max_points)
+        fig.add_trace(line_trace(recent["ds"], recent["y"] / base * 100, name=label, color=color, width=1,
+                                 legendgroup=label))
+        fig.add_trace(line_trace(future["ds"], future[yhat_col] / base * 100, name=f"{label} forecast", color=color,
+                                 width=3, legendgroup=label, showlegend=False))
+    fig.add_hline(y=100, line_dash="dot", line_color="gray")
+    fig.update_layout(title=title, xaxis_title="Date", yaxis_title="Price (last close = 100)", **LAYOUT)
+    return fig
+
+
+class SerializedFigure(go.Figure):
+    """A figure kept as its Plotly JSON, for caches of rendered charts.
+
+    ``st.plotly_chart`` re-validates every trace of a plain dict, so a cached
+    spec is handed over as a figure whose ``to_dict`` / ``to_json`` read the
+    stored JSON back instead of building and serializing the traces again.
+    """
+
+    def __init__(self, spec: str):
+        super().__init__()
+        self._spec = spec
+
+    @classmethod
+    def of(cls, fig: go.Figure) -> "SerializedFigure":
+        return cls(fig.to_json())
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._spec)
+
+    def to_dict(self) -> dict:
+        return json.loads(self._spec)
+
+    def to_plotly_json(self) -> dict:
+        return self.to_dict()
+
+    def to_json(self, *args, **kwargs) -> str:
+        return self._spec
@@ -0,0 +1,82 @@
+import io
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from stockpred.cache_backend import CacheBackend, LocalBackend, open_backend
+from stockpred.frames import compact_frame, compact_table
+
+# v4: keys carry a digest of the training history (v3 had none, v2 was a SQLite file per node)
+FORMAT_VERSION = "v4"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ForecastStore:
+    """Precomputed forecast frames keyed by ticker, engine, window, horizon and history.
+
+    Frames are stored as Parquet values with the engine's columns in float32, so
+    the app can render its charts from a hit without refitting. They live in the
+    ``forecasts`` namespace of the cache backend, so replicas sharing a backend
+    share every nightly and live result. Keys include a digest of the training
+    history (``model_store.frame_digest``): a window whose prices were still
+    arriving when it was fitted misses once they change. On a local backend the
+    entries are kept under ``max_bytes`` by evicting the least recently used ones.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        *,
+        backend: Optional[CacheBackend] = None,
+    ):
+        if backend is None:
+            backend = LocalBackend(root) if root is not None else open_backend("forecasts")
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        ticker: str, engine: str, start: date, as_of: date, periods: int, digest: str, variant: str = "",
+    ) -> str:
+        # ``variant`` tags forecasts made with tuned parameters or from intraday bars (api.forecast_variant)
+        suffix = f"-{variant}" if variant else ""
+        return f"{FORMAT_VERSION}/{ticker}/{engine}/{start}_{as_of}_{int(periods)}_{digest[:16]}{suffix}.parquet"
+
+    def get(
+        self, ticker: str, engine: str, start: date, as_of: date, periods: int, digest: str, variant: str = "",
+    ) -> Optional[pd.DataFrame]:
+        key = self.key(ticker, engine, start, as_of, periods, digest, variant)
+        payload = self.backend.get(key)
+        if payload is None:
+            return None
+        self.backend.touch(key)
+        return compact_frame(pq.read_table(io.BytesIO(payload)))
+
+    def put(
+        self, ticker: str, engine: str, start: date, as_of: date, periods: int, digest: str, forecast: pd.DataFrame,
+        variant: str = "",
+    ):
+        buf = io.BytesIO()
+        pq.write_table(compact_table(pa.Table.from_pandas(forecast, preserve_index=False)), buf)
+        self.backend.put(self.key(ticker, engine, start, as_of, periods, digest, variant), buf.getvalue())
+        self.evict()
+
+    def evict(self):
+        if self.backend.manages_size:
+            return
+        with self._lock:
+            # One value per entry; reads touch it, so mtime is the last use
+            entries = self.backend.entries()
+            total = sum(size for _, size, _ in entries)
+            for key, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                if total <= self.max_bytes:
+                    break
+                self.backend.delete(key)
+                total -= size
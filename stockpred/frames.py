@@ -0,0 +1,116 @@
+import pandas as pd
+import pyarrow as pa
+
+
+# -----------------------------
+# Compact columnar layout
+# -----------------------------
+def compact_table(table: pa.Table) -> pa.Table:
+    # float32 numbers (7 significant digits, plenty for prices) and ns timestamps; as-is when already compact
+    fields = []
+    for field in table.schema:
+        kind = field.type
+        if pa.types.is_floating(kind) or pa.types.is_integer(kind):
+            kind = pa.float32()
+        elif pa.types.is_date(kind) or (pa.types.is_timestamp(kind) and kind.tz is None):
+            kind = pa.timestamp("ns")
+        fields.append(pa.field(field.name, kind))
+    schema = pa.schema(fields)
+    return table if schema.equals(table.schema) else table.cast(schema, safe=False)
+
+
+def compact_frame(table: pa.Table) -> pd.DataFrame:
+    # Columns without nulls are zero-copy, read-only views of the table's buffers; for a
+    # memory-mapped file those are page-cache pages shared by every session and process
+    return compact_table(table).to_pandas(split_blocks=True)
+
+
+# -----------------------------
+# Prophet / NeuralProphet helpers
+# -----------------------------
+def _ds_y(df_prices: pd.DataFrame) -> pd.DataFrame:
+    # ``ds`` / ``y`` view the price frame's Date / Close arrays; rows are copied only to drop missing prices
+    ds = df_prices["Date"]
+    if not pd.api.types.is_datetime64_dtype(ds):
+        ds = pd.to_datetime(ds)
+    close = df_prices["Close"]
+    df = pd.DataFrame({"ds": ds.to_numpy(), "y": close.to_numpy()}, copy=False)
+    missing = close.isna().to_numpy()
+    return df[~missing].reset_index(drop=True) if missing.any() else df
+
+
+def to_prophet_df(df_prices: pd.DataFrame) -> pd.DataFrame:
+    return _ds_y(df_prices)
+
+
+# NeuralProphet trains on the same ds / y frame
+to_neuralprophet_df = to_prophet_df
+
+
+def period_ordinals(ds: pd.Series, rule: str):
+    # Integer period numbers of ``ds`` (grouping on Period objects is far slower)
+    return ds.dt.to_period(rule).array.asi8
+
+
+def last_per_period(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    # Last ``y`` of each ``rule`` period ("h", "D", ...) of a sorted ds/y frame, dated at the period start
+    last = df["y"].groupby(period_ordinals(df["ds"], rule)).last()
+    starts = pd.PeriodIndex.from_ordinals(last.index.to_numpy(), freq=rule).to_timestamp()
+    return pd.DataFrame({"ds": starts, "y": last.to_numpy()})
+
+
+# Training frame builder per engine (fastlinear mirrors Prophet's input)
+ENGINE_FRAMES = {"prophet": to_prophet_df, "neuralprophet": to_neuralprophet_df, "fastlinear": to_prophet_df}
+
+
+def monthly_summary_from_yhat(forecast_future: pd.DataFrame, yhat_col: str) -> pd.DataFrame:
+    out = forecast_future.copy()
+    out["month"] = pd.to_datetime(out["ds"]).dt.month
+    return out.groupby("month", as_index=False)[yhat_col].mean()
+
+
+def find_yearly_col(df: pd.DataFrame):
+    if "yearly" in df.columns:
+        return "yearly"
+    yearly_cols = [c for c in df.columns if "yearly" in c.lower()]
+    return yearly_cols[0] if yearly_cols else None
+
+
+def find_weekly_col(df: pd.DataFrame):
+    if "weekly" in df.columns:
+        return "weekly"
+    weekly_cols = [c for c in df.columns if "weekly" in c.lower()]
+    return weekly_cols[0] if weekly_cols else None
+
+
+def find_yhat_col(df: pd.DataFrame):
+    # Prophet: "yhat"; NeuralProphet: "yhat1"
+    for col in ("yhat", "yhat1"):
+        if col in df.columns:
+            return col
+    yhat_candidates = [c for c in df.columns if c.lower().startswith("yhat")]
+    return yhat_candidates[0] if yhat_candidates else None
+
+
+# -----------------------------
+# Engine-independent forecast columns
+# -----------------------------
+COMPONENT_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper", "trend", "yearly", "weekly"]
+
+
+def to_components_df(forecast: pd.DataFrame) -> pd.DataFrame:
+    yhat_col = find_yhat_col(forecast)
+    sources = {
+        "ds": "ds",
+        "yhat": yhat_col,
+        "yhat_lower": f"{yhat_col}_lower",
+        "yhat_upper": f"{yhat_col}_upper",
+        "trend": "trend",
+        "yearly": find_yearly_col(forecast),
+        "weekly": find_weekly_col(forecast),
+    }
+    out = pd.DataFrame(index=forecast.index)
+    for col, src in sources.items():
+        out[col] = forecast[src] if src in forecast.columns else float("nan")
+    out["ds"] = pd.to_datetime(out["ds"])
+    return out.reset_index(drop=True)
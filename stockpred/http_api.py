@@ -0,0 +1,330 @@
+"""Async HTTP forecast API (ASGI) over the same stores the Streamlit UI uses.
+
+    GET /tickers
+    GET /prices/{ticker}?start=2016-01-01&end=2026-01-01
+    GET /forecast/{ticker}?start=...&end=...&horizon=1&engine=prophet
+    GET /components/{ticker}?start=...&end=...&horizon=1&engine=prophet
+    GET /metrics
+
+The event loop only parses requests and writes responses. Price loads, store
+reads and serialization run on the loop's default executor; fits run on a
+separate bounded pool, so a forecast already in the forecast store is answered
+straight away even while every fit worker is busy. Forecast responses carry an
+ETag derived from the forecast store key, which covers the ticker's tuned
+parameters and a digest of the prices; ``If-None-Match`` is answered with 304
+once the prices are read, before any forecast is read or serialized.
+
+Serve it with ``python -m stockpred serve`` (needs ``uvicorn``) or next to the
+UI by setting ``STOCKPRED_API_PORT`` before ``streamlit run app.py``.
+"""
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Optional
+from urllib.parse import parse_qs
+
+import pandas as pd
+
+from stockpred import api
+from stockpred.companies import DEFAULT_COMPANIES_XML, read_companies
+from stockpred.engines import ENGINES
+from stockpred.forecast_store import ForecastStore
+from stockpred.model_store import ModelStore, frame_digest
+from stockpred.price_store import PriceStore
+from stockpred.tracing import RECORDER, labels, trace
+from stockpred.tuned_params import TunedParamsStore, params_digest
+
+log = logging.getLogger(__name__)
+
+API_PORT_ENV_VAR = "STOCKPRED_API_PORT"
+DEFAULT_PORT = 8600
+DEFAULT_FIT_WORKERS = 2
+MAX_HORIZON_YEARS = 10
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def forecast_etag(store_key: str, digest: str) -> str:
+    # Weak: a refit for the same key may differ in the last digits but means the same forecast.
+    # New prices change ``digest`` and a new sweep winner changes the key's variant.
+    tag = f"{store_key}|{digest}"
+    return 'W/"' + hashlib.sha256(tag.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag.removeprefix("W/") for t in tags)
+
+
+def _frame_json(payload: dict, frame: pd.DataFrame) -> bytes:
+    # Records with ISO dates; NaN (e.g. NeuralProphet's missing bounds) becomes null
+    rows = frame.to_json(orient="records", date_format="iso", double_precision=6)
+    head = json.dumps(payload, default=str)[:-1]
+    return f'{head}, "columns": {json.dumps(list(frame.columns))}, "data": {rows}}}'.encode("utf-8")
+
+
+class ForecastAPI:
+    """ASGI application serving prices and forecasts for the companies.xml universe."""
+
+    def __init__(
+        self,
+        *,
+        companies: Optional[dict] = None,
+        prices: Optional[PriceStore] = None,
+        models: Optional[ModelStore] = None,
+        forecasts: Optional[ForecastStore] = None,
+        tuned: Optional[TunedParamsStore] = None,
+        fit_workers: int = DEFAULT_FIT_WORKERS,
+    ):
+        self.companies = companies if companies is not None else read_companies(DEFAULT_COMPANIES_XML)
+        self.tickers = set(self.companies.values())
+        self.prices = prices if prices is not None else api.default_price_store()
+        self.models = models if models is not None else api.default_model_store()
+        self.forecasts = forecasts if forecasts is not None else api.default_forecast_store()
+        self.tuned = tuned if tuned is not None else api.default_tuned_store()
+        self.fit_workers = fit_workers
+        self._fit_pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # Forecast key -> pending fit task; only touched from the event loop
+        self._inflight = {}
+        self.routes = {
+            "tickers": self.get_tickers,
+            "prices": self.get_prices,
+            "forecast": self.get_forecast,
+            "components": self.get_components,
+            "metrics": self.get_metrics,
+        }
+
+    # -----------------------------
+    # Executors
+    # -----------------------------
+    @property
+    def fit_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._fit_pool is None:
+                self._fit_pool = ThreadPoolExecutor(self.fit_workers, thread_name_prefix="stockpred-http-fit")
+            return self._fit_pool
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._fit_pool is not None:
+                self._fit_pool.shutdown(wait=False, cancel_futures=True)
+                self._fit_pool = None
+
+    @staticmethod
+    async def run(fn, *args, executor=None, **kwargs):
+        # run_in_executor does not carry contextvars; copy them so spans keep their labels
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, fn, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+    # -----------------------------
+    # Request parsing
+    # -----------------------------
+    def _ticker(self, parts: list) -> str:
+        if len(parts) != 2:
+            raise HTTPError(404, "Expected /<resource>/<ticker>.")
+        ticker = parts[1].upper()
+        if ticker not in self.tickers:
+            raise HTTPError(404, f"Unknown ticker {ticker!r}; see /tickers.")
+        return ticker
+
+    @staticmethod
+    def _date(query: dict, name: str, default: date) -> date:
+        if name not in query:
+            return default
+        try:
+            return date.fromisoformat(query[name])
+        except ValueError:
+            raise HTTPError(400, f"{name} must be an ISO date (YYYY-MM-DD).") from None
+
+    def _window(self, query: dict):
+        start = self._date(query, "start", api.DEFAULT_START)
+        end = self._date(query, "end", api.DEFAULT_END)
+        if start >= end:
+            raise HTTPError(400, "start must be before end.")
+        return start, end
+
+    def _forecast_request(self, parts: list, query: dict):
+        ticker = self._ticker(parts)
+        start, end = self._window(query)
+        engine = query.get("engine", api.DEFAULT_ENGINE)
+        if engine not in ENGINES:
+            raise HTTPError(400, f"engine must be one of {sorted(ENGINES)}.")
+        try:
+            horizon = int(query.get("horizon", 1))
+        except ValueError:
+            raise HTTPError(400, "horizon must be a whole number of years.") from None
+        if not 1 <= horizon <= MAX_HORIZON_YEARS:
+            raise HTTPError(400, f"horizon must be between 1 and {MAX_HORIZON_YEARS} years.")
+        return ticker, engine, start, end, api.horizon_days(horizon)
+
+    # -----------------------------
+    # Handlers: (parts, query, headers) -> (status, headers, body)
+    # -----------------------------
+    async def get_tickers(self, parts, query, headers):
+        body = json.dumps({"tickers": self.companies}).encode("utf-8")
+        return 200, [], body
+
+    async def get_metrics(self, parts, query, headers):
+        return 200, [(b"content-type", b"text/plain; version=0.0.4; charset=utf-8")], RECORDER.prometheus().encode()
+
+    async def get_prices(self, parts, query, headers):
+        ticker = self._ticker(parts)
+        start, end = self._window(query)
+
+        def load() -> bytes:
+            df = api.load_prices(ticker, start, end, prices=self.prices)
+            return _frame_json({"ticker": ticker, "start": start, "end": end}, df)
+
+        with labels(ticker=ticker):
+            return 200, [], await self.run(load)
+
+    async def get_forecast(self, parts, query, headers):
+        return await self._forecast_response(parts, query, headers, components=False)
+
+    async def get_components(self, parts, query, headers):
+        return await self._forecast_response(parts, query, headers, components=True)
+
+    async def _forecast_response(self, parts, query, headers, *, components: bool):
+        ticker, engine, start, end, periods = self._forecast_request(parts, query)
+        params = await self.run(api.tuned_params, ticker, engine, tuned=self.tuned)
+
+        with labels(ticker=ticker, engine=engine):
+            history = await self.run(self._history, ticker, engine, start, end)
+            digest = await self.run(frame_digest, history)
+            store_key = api.stored_forecast_key(
+                ticker, start, end, engine, history=history, periods=periods, params=params, digest=digest,
+            )
+            etag = forecast_etag(store_key, digest)
+            cache_headers = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+            if _etag_matches(headers.get("if-none-match"), etag):
+                return 304, cache_headers, b""
+            result = await self.run(
+                api.stored_forecast, ticker, start, end, engine=engine,
+                history=history, periods=periods, forecasts=self.forecasts, params=params, digest=digest,
+            )
+            if result is None:
+                # Only misses queue for a fit worker
+                key = (ticker, engine, start, end, periods, params_digest(params))
+                result = await self._fit(key, history, params or {})
+            body = await self.run(self._forecast_json, result, components)
+        return 200, cache_headers + [(b"x-forecast-source", result.source.encode())], body
+
+    async def _fit(self, key: tuple, history: pd.DataFrame, params: dict) -> api.ForecastResult:
+        # Identical concurrent requests await one pool task instead of each holding a worker;
+        # shield keeps the fit going for the others (and the store) if a client disconnects
+        task = self._inflight.get(key)
+        if task is None:
+            ticker, engine, start, end, periods, _ = key
+            task = asyncio.ensure_future(self.run(
+                api.forecast, ticker, start, end, engine=engine, periods=periods, history=history,
+                models=self.models, forecasts=self.forecasts, params=params, executor=self.fit_pool,
+            ))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def _history(self, ticker: str, engine: str, start: date, end: date) -> pd.DataFrame:
+        df = api.training_frame(engine, api.load_prices(ticker, start, end, prices=self.prices))
+        if len(df) < 2:
+            raise api.InsufficientDataError(f"Not enough valid data points to train the {engine} model for {ticker}.")
+        return df
+
+    @staticmethod
+    def _forecast_json(result: api.ForecastResult, components: bool) -> bytes:
+        payload = {
+            "ticker": result.ticker, "engine": result.engine, "start": result.start, "end": result.end,
+            "periods": result.periods, "source": result.source,
+        }
+        frame = result.components
+        if not components:
+            # Future session days only, with the engine-independent yhat / bound columns
+            frame = frame.loc[frame["ds"] > result.history["ds"].max(), ["ds", "yhat", "yhat_lower", "yhat_upper"]]
+        return _frame_json(payload, frame)
+
+    # -----------------------------
+    # ASGI
+    # -----------------------------
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        query = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode("latin-1")).items()}
+        parts = [p for p in scope["path"].split("/") if p]
+        try:
+            handler = self.routes.get(parts[0]) if parts else None
+            if handler is None:
+                raise HTTPError(404, "Not found.")
+            if scope["method"] not in ("GET", "HEAD"):
+                raise HTTPError(405, "Only GET is supported.")
+            with trace("http", route=parts[0]) as span:
+                status, extra, body = await handler(parts, query, headers)
+                span["status_code"] = status
+        except HTTPError as exc:
+            status, extra, body = exc.status, [], json.dumps({"detail": exc.detail}).encode("utf-8")
+        except api.InsufficientDataError as exc:
+            status, extra, body = 422, [], json.dumps({"detail": str(exc)}).encode("utf-8")
+        except Exception as exc:
+            log.exception("request %s failed", scope["path"])
+            status, extra, body = 500, [], json.dumps({"detail": f"{type(exc).__name__}: {exc}"}).encode("utf-8")
+
+        if not any(k == b"content-type" for k, _ in extra):
+            extra.append((b"content-type", b"application/json"))
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": extra + [(b"content-length", str(len(body)).encode())],
+        })
+        if scope["method"] == "HEAD" or not body:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        # Bodies are built whole off the loop, so they go out as one message
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_app(**kwargs) -> ForecastAPI:
+    return ForecastAPI(**kwargs)
+
+
+def serve(app: ForecastAPI, host: str = "0.0.0.0", port: int = DEFAULT_PORT):
+    import uvicorn
+
+    uvicorn.run(app, host=host, port=port, log_level="info")
+
+
+def start_api_server(app: ForecastAPI, port: int, host: str = "0.0.0.0") -> threading.Thread:
+    # Background server next to the Streamlit UI, sharing its in-process stores
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="stockpred-api", daemon=True)
+    thread.start()
+    return thread
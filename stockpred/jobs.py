@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Hashable, Optional
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_FINISHED = 64
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """One forecast computation shared by every session that asked for the same key."""
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.owners = set()
+        self.future: Optional[Future] = None
+        self._cancel = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def report(self, fraction: float, message: str = ""):
+        # Progress callback handed to the work function; doubles as a cancellation point
+        if self._cancel.is_set():
+            raise JobCancelled(self.key)
+        self.progress = max(0.0, min(1.0, float(fraction)))
+        if message:
+            self.message = message
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self._finish(CANCELLED, message="Cancelled")
+
+    def _finish(self, status: str, result=None, error=None, message: str = ""):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished = time.time()
+        if status == DONE:
+            self.progress = 1.0
+        self.message = message or status.capitalize()
+
+
+class JobManager:
+    """Bounded worker pool with a job table keyed by request parameters.
+
+    ``submit`` deduplicates identical requests: while a job for ``key`` is queued,
+    running or done, every caller gets the same ``Job``; ``fresh`` replaces a
+    done job instead of returning its old result. Each caller is recorded
+    as an owner; ``release`` drops an owner and cancels the job once nobody is
+    waiting for it any more.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_finished: int = DEFAULT_MAX_FINISHED):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stockpred-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_finished = max_finished
+
+    def get(self, key: Hashable) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def submit(self, key: Hashable, fn: Callable[[Job], object], owner: Hashable = None, *, fresh: bool = False) -> Job:
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.status in (FAILED, CANCELLED) or (fresh and job.status == DONE):
+                job = Job(key)
+                self._jobs[key] = job
+                job.future = self._pool.submit(self._run, job, fn)
+            self._jobs.move_to_end(key)
+            if owner is not None:
+                job.owners.add(owner)
+            self._trim()
+            return job
+
+    def release(self, key: Hashable, owner: Hashable):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return
+            job.owners.discard(owner)
+            if not job.owners and not job.done:
+                job.cancel()
+
+    def cancel(self, key: Hashable):
+        job = self.get(key)
+        if job is not None and not job.done:
+            job.cancel()
+
+    def _run(self, job: Job, fn: Callable[[Job], object]):
+        if job.cancelled:
+            job._finish(CANCELLED, message="Cancelled")
+            return
+        job.status = RUNNING
+        job.message = "Running"
+        try:
+            result = fn(job)
+        except JobCancelled:
+            job._finish(CANCELLED, message="Cancelled")
+        except Exception as exc:
+            job._finish(FAILED, error=exc, message=str(exc))
+        else:
+            job._finish(DONE, result=result)
+
+    def _trim(self):
+        finished = [k for k, j in self._jobs.items() if j.done]
+        for key in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[key]
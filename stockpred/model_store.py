@@ -0,0 +1,252 @@
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from stockpred.cache_backend import CacheBackend, LocalBackend, LockTimeout, open_backend
+from stockpred.singleflight import SingleFlight
+from stockpred.trading_calendar import DEFAULT_EXCHANGE
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_MEMORY_ITEMS = 8
+# Warm-start only when the new window adds at most this share of rows
+DEFAULT_MAX_GROWTH = 0.10
+# ``index/<engine>/<ticker>.json`` lists that ticker's saved fits, so a warm-start lookup reads one key
+INDEX_DIR = "index"
+# Index updates are best effort: a save that cannot take the index lock only loses a warm start
+INDEX_LOCK_TIMEOUT = 10.0
+# Concurrent identical fits (same key and horizon) share one computation. One flight for the whole
+# process: a forecast depends only on its key, so callers holding different stores still coalesce.
+FIT_FLIGHT = SingleFlight("fits")
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    hashed = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+class ModelStore:
+    """Fitted models and forecast frames on disk, with an in-process LRU in front.
+
+    Entries live under ``<key>/`` in the cache backend and are keyed by a hash
+    of the training frame, the engine name and its constructor arguments. Each
+    ticker's fits are also listed under ``index/`` for warm-start lookups. On a
+    local backend the entries are kept under ``max_bytes`` by evicting the least
+    recently used ones.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_memory_items: int = DEFAULT_MAX_MEMORY_ITEMS,
+        *,
+        backend: Optional[CacheBackend] = None,
+    ):
+        if backend is None:
+            backend = LocalBackend(root) if root is not None else open_backend("models")
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.max_memory_items = max_memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self.flight = FIT_FLIGHT
+
+    # -----------------------------
+    # Keys
+    # -----------------------------
+    def key(self, engine: str, df: pd.DataFrame, params: dict) -> str:
+        h = hashlib.sha256()
+        h.update(engine.encode("utf-8"))
+        h.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+        h.update(frame_digest(df).encode("utf-8"))
+        return h.hexdigest()[:32]
+
+    # -----------------------------
+    # In-memory LRU
+    # -----------------------------
+    def _remember(self, item_key, value):
+        with self._lock:
+            self._memory[item_key] = value
+            self._memory.move_to_end(item_key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _recall(self, item_key):
+        with self._lock:
+            if item_key not in self._memory:
+                return None
+            self._memory.move_to_end(item_key)
+            return self._memory[item_key]
+
+    def _touch(self, key: str):
+        self.backend.touch(f"{key}/meta.json")
+
+    def lock(self, key: str, periods: int, calendar: str = DEFAULT_EXCHANGE):
+        # Held while one node fits and predicts ``key``; other nodes wait, then read its forecast
+        return self.backend.lock(f"{key}-{self._forecast_name(periods, calendar)}")
+
+    # -----------------------------
+    # Models
+    # -----------------------------
+    def load_model(self, key: str, engine):
+        model = self._recall(("model", key))
+        if model is not None:
+            return model
+        payload = self.backend.get(f"{key}/model.bin")
+        if payload is None:
+            return None
+        model = engine.load(payload)
+        self._touch(key)
+        self._remember(("model", key), model)
+        return model
+
+    def save_model(self, key: str, engine, model, *, ticker=None, df=None, params=None):
+        self.backend.put(f"{key}/model.bin", engine.dump(model))
+        meta = {"engine": engine.name, "ticker": ticker, "params": params, "created": time.time()}
+        if df is not None and len(df):
+            meta.update(
+                rows=len(df), digest=frame_digest(df),
+                ds_min=str(df["ds"].min()), ds_max=str(df["ds"].max()),
+            )
+        self.backend.put(f"{key}/meta.json", json.dumps(meta, default=str).encode("utf-8"))
+        if ticker is not None and "rows" in meta:
+            entry = {field: meta[field] for field in ("rows", "digest", "ds_min", "params")}
+            entry["key"] = key
+            self._update_index(
+                engine.name, ticker, lambda entries: [e for e in entries if e.get("key") != key] + [entry],
+            )
+        self._remember(("model", key), model)
+        self.evict()
+
+    # -----------------------------
+    # Warm-start index
+    # -----------------------------
+    @staticmethod
+    def _index_key(engine: str, ticker: str) -> str:
+        return f"{INDEX_DIR}/{engine}/{ticker}.json"
+
+    def _read_index(self, engine: str, ticker: str) -> List[dict]:
+        try:
+            return json.loads(self.backend.get(self._index_key(engine, ticker)) or b"[]")
+        except ValueError:
+            return []
+
+    def _update_index(self, engine: str, ticker: str, update: Callable[[List[dict]], List[dict]]):
+        # Read-modify-write under the backend's lock, so saves from other nodes are not lost
+        try:
+            with self.backend.lock(f"{INDEX_DIR}-{engine}-{ticker}", timeout=INDEX_LOCK_TIMEOUT):
+                entries = update(self._read_index(engine, ticker))
+                self.backend.put(self._index_key(engine, ticker), json.dumps(entries, default=str).encode("utf-8"))
+        except LockTimeout:
+            log.warning("Could not update the %s model index of %s", engine, ticker, exc_info=True)
+
+    def find_prefix(
+        self,
+        engine: str,
+        ticker: Optional[str],
+        df: pd.DataFrame,
+        params: dict,
+        max_growth: float = DEFAULT_MAX_GROWTH,
+    ) -> Optional[str]:
+        # Latest cached fit whose training frame is a strict prefix of ``df``
+        if ticker is None or df.empty:
+            return None
+        ds_min = str(df["ds"].min())
+        params_json = json.dumps(params, sort_keys=True, default=str)
+        candidates = []
+        for entry in self._read_index(engine, ticker):
+            rows = entry.get("rows") or 0
+            if (
+                entry.get("ds_min") != ds_min
+                or not 0 < rows < len(df)
+                or (len(df) - rows) > max_growth * rows
+                or json.dumps(entry.get("params"), sort_keys=True, default=str) != params_json
+            ):
+                continue
+            candidates.append((rows, entry.get("digest"), entry.get("key")))
+        found, gone = None, set()
+        for rows, digest, key in sorted(candidates, reverse=True):
+            if not self.backend.exists(f"{key}/model.bin"):
+                # Evicted or expired on a backend that manages its own size
+                gone.add(key)
+            elif frame_digest(df.iloc[:rows]) == digest:
+                found = key
+                break
+        if gone:
+            self._update_index(engine, ticker, lambda entries: [e for e in entries if e.get("key") not in gone])
+        return found
+
+    # -----------------------------
+    # Forecast frames
+    # -----------------------------
+    @staticmethod
+    def _forecast_name(periods: int, calendar: str) -> str:
+        return f"forecast-{calendar.replace('/', '_')}-{periods}.parquet"
+
+    def load_forecast(self, key: str, periods: int, calendar: str = DEFAULT_EXCHANGE) -> Optional[pd.DataFrame]:
+        # ``calendar`` is the exchange whose session days make up the future rows
+        forecast = self._recall(("forecast", key, periods, calendar))
+        if forecast is not None:
+            return forecast.copy()
+        payload = self.backend.get(f"{key}/{self._forecast_name(periods, calendar)}")
+        if payload is None:
+            return None
+        forecast = pd.read_parquet(io.BytesIO(payload))
+        self._touch(key)
+        self._remember(("forecast", key, periods, calendar), forecast)
+        return forecast.copy()
+
+    def save_forecast(self, key: str, periods: int, forecast: pd.DataFrame, calendar: str = DEFAULT_EXCHANGE):
+        buf = io.BytesIO()
+        forecast.to_parquet(buf, index=False)
+        self.backend.put(f"{key}/{self._forecast_name(periods, calendar)}", buf.getvalue())
+        self._remember(("forecast", key, periods, calendar), forecast.copy())
+        self.evict()
+
+    # -----------------------------
+    # Size-bounded eviction (least recently used first)
+    # -----------------------------
+    def evict(self):
+        if self.backend.manages_size:
+            return
+        with self._lock:
+            # Entry -> [bytes, last used]; meta.json is touched on every hit
+            entries = {}
+            for item, size, mtime in self.backend.entries():
+                key, _, name = item.partition("/")
+                if key == INDEX_DIR:
+                    continue
+                entry = entries.setdefault(key, [0, mtime])
+                entry[0] += size
+                if name == "meta.json":
+                    entry[1] = mtime
+            total = sum(size for size, _ in entries.values())
+            for used, size, key in sorted((used, size, key) for key, (size, used) in entries.items()):
+                if total <= self.max_bytes:
+                    break
+                self._unindex(key)
+                self.backend.delete_prefix(f"{key}/")
+                total -= size
+                for item_key in [k for k in self._memory if k[1] == key]:
+                    del self._memory[item_key]
+
+    def _unindex(self, key: str):
+        # Drop an entry being evicted from its ticker's warm-start index
+        try:
+            meta = json.loads(self.backend.get(f"{key}/meta.json") or b"{}")
+        except ValueError:
+            return
+        if meta.get("ticker") is not None and "rows" in meta:
+            self._update_index(
+                meta["engine"], meta["ticker"], lambda entries: [e for e in entries if e.get("key") != key],
+            )
@@ -0,0 +1,140 @@
+import io
+import os
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+import torch
+from neuralprophet import NeuralProphet, configure, df_utils
+from neuralprophet.logger import MetricsLogger
+from numpy.core.multiarray import _reconstruct, scalar
+from pandas._libs.tslibs.timedeltas import _timedelta_unpickle
+from pandas._libs.tslibs.timestamps import _unpickle_timestamp
+
+from stockpred.engines import FIT_PROGRESS, Engine
+from stockpred.resolution import DAILY, DATE_FREQS, infer_resolution
+from stockpred.trading_calendar import DEFAULT_EXCHANGE, future_dates
+
+# Default hyperparameters (as used by app.py)
+NEURALPROPHET_PARAMS = dict(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False, epochs=50)
+# Extra epochs when refitting NeuralProphet from a previous fit on a shorter window
+WARM_START_EPOCHS = 5
+# What a NeuralProphet checkpoint holds besides tensors and builtins: its config dataclasses and
+# the values inside them. torch >= 2.6 loads weights only by default; registering these lets that
+# default read our model store payloads and the checkpoint the learning-rate finder reloads,
+# without unpickling anything else.
+SAFE_GLOBALS = [
+    configure.Model, configure.Normalization, configure.MissingDataHandling, configure.Train, configure.Trend,
+    configure.Season, configure.ConfigSeasonality, configure.AR, configure.LaggedRegressor, configure.Regressor,
+    configure.ConfigFutureRegressors, configure.Event, configure.Holidays, configure.ConfigCountryHolidays,
+    df_utils.ShiftScale,
+    torch.nn.SmoothL1Loss, torch.optim.AdamW, torch.optim.lr_scheduler.OneCycleLR,
+    np.ndarray, np.dtype, _reconstruct, scalar, _unpickle_timestamp, _timedelta_unpickle,
+    np.dtypes.Float32DType, np.dtypes.Float64DType, np.dtypes.Int64DType, np.dtypes.BoolDType,
+    np.dtypes.DateTime64DType,
+]
+torch.serialization.add_safe_globals(SAFE_GLOBALS)
+# Forecaster attributes rebuilt on load rather than stored; the network is stored as its state_dict
+REBUILT_ATTRIBUTES = ("model", "trainer", "metrics_logger")
+
+# -----------------------------
+# NeuralProphet
+# -----------------------------
+def _progress_hook(model, progress: Callable) -> Callable:
+    # Wraps the LightningModule's batch hook to report epochs; ``progress`` may raise to cancel
+    hook = model.on_train_batch_end
+
+    def on_train_batch_end(*args, **kwargs):
+        hook(*args, **kwargs)
+        trainer = model.trainer
+        max_epochs = max(1, trainer.max_epochs or 1)
+        done = min(1.0, (trainer.current_epoch + 1) / max_epochs)
+        progress(
+            FIT_PROGRESS[0] + (FIT_PROGRESS[1] - FIT_PROGRESS[0]) * done,
+            f"Training epoch {trainer.current_epoch + 1}/{max_epochs}",
+        )
+
+    return on_train_batch_end
+
+def _fit_neuralprophet(
+    np_model: NeuralProphet, df_np: pd.DataFrame, *, previous=None, progress=None, **fit_kwargs,
+) -> NeuralProphet:
+    # Hooks into model construction to seed weights from ``previous`` and report progress.
+    # (Custom trainer callbacks hit a removed Lightning API inside NeuralProphet 0.9.)
+    init_model = np_model._init_model
+
+    def _init_model():
+        model = init_model()
+        if previous is not None:
+            model.load_state_dict(previous.model.state_dict())
+        if progress is not None:
+            model.on_train_batch_end = _progress_hook(model, progress)
+        return model
+
+    np_model._init_model = _init_model
+    try:
+        # Weekends are not missing data: "D" would make NeuralProphet impute every one of them.
+        # Weekly / monthly bars (stockpred.resolution) keep their own regular frequency.
+        resolution = infer_resolution(df_np["ds"])
+        if resolution != DAILY:
+            freq = DATE_FREQS[resolution]
+        else:
+            freq = "D" if (pd.to_datetime(df_np["ds"]).dt.dayofweek >= 5).any() else "B"
+        np_model.fit(df_np, freq=freq, **fit_kwargs)
+    finally:
+        # Instance-level hooks close over caller objects and must not be pickled with the model
+        np_model.__dict__.pop("_init_model", None)
+        if getattr(np_model, "model", None) is not None:
+            np_model.model.__dict__.pop("on_train_batch_end", None)
+    return np_model
+
+def fit_neuralprophet(df_np: pd.DataFrame, params: dict, progress: Optional[Callable] = None) -> NeuralProphet:
+    return _fit_neuralprophet(NeuralProphet(**params), df_np, progress=progress)
+
+def warm_fit_neuralprophet(
+    df_np: pd.DataFrame, params: dict, previous: NeuralProphet, progress: Optional[Callable] = None,
+) -> NeuralProphet:
+    # NeuralProphet 0.9 does not implement continue_training, so seed the freshly
+    # initialised network with the previous weights and train a few epochs.
+    return _fit_neuralprophet(
+        NeuralProphet(**params), df_np, previous=previous, progress=progress,
+        epochs=WARM_START_EPOCHS, learning_rate=previous.model.learning_rate,
+    )
+
+def predict_neuralprophet(
+    np_model: NeuralProphet, df_np: pd.DataFrame, periods: int, exchange: str = DEFAULT_EXCHANGE,
+) -> pd.DataFrame:
+    # History plus session days (or bar dates) with unknown y, i.e. make_future_dataframe on the exchange calendar
+    future = future_dates(df_np["ds"], periods, exchange)
+    future_np = pd.concat([df_np[["ds", "y"]], pd.DataFrame({"ds": future, "y": np.nan})], ignore_index=True)
+    return np_model.predict(future_np)
+
+def dump_neuralprophet(np_model: NeuralProphet) -> bytes:
+    # Config and fitted state plus the network's weights, all readable with weights_only=True
+    state = {k: v for k, v in np_model.__dict__.items() if k not in REBUILT_ATTRIBUTES}
+    buf = io.BytesIO()
+    torch.save(
+        {"forecaster": state, "state_dict": np_model.model.state_dict(), "learning_rate": np_model.model.learning_rate},
+        buf,
+    )
+    return buf.getvalue()
+
+def load_neuralprophet(payload: bytes) -> NeuralProphet:
+    # Weights only: the cache backend may be shared, and a payload must not be able to run code
+    saved = torch.load(io.BytesIO(payload), map_location=torch.device("cpu"), weights_only=True)
+    np_model = NeuralProphet.__new__(NeuralProphet)
+    np_model.__dict__.update(saved["forecaster"])
+    np_model.metrics_logger = MetricsLogger(save_dir=os.getcwd())
+    # Building the network prepends t=0 to the configured changepoints; the saved config has it already
+    if np_model.config_trend.changepoints is not None:
+        np_model.config_trend.changepoints = np_model.config_trend.changepoints[1:]
+    model = np_model._init_model()
+    model.load_state_dict(saved["state_dict"])
+    model.learning_rate = saved["learning_rate"]
+    np_model.restore_trainer(accelerator="cpu")
+    return np_model
+
+ENGINE = Engine(
+    "neuralprophet", NEURALPROPHET_PARAMS,
+    fit_neuralprophet, warm_fit_neuralprophet, predict_neuralprophet, dump_neuralprophet, load_neuralprophet,
+)
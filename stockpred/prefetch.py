@@ -0,0 +1,66 @@
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import Iterable, List
+
+from stockpred.price_store import PriceStore
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 25
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 2.0
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def fetch_batch(store: PriceStore, tickers: List[str], start: date, end: date,
+                retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF) -> List[str]:
+    # One batched provider call for the whole gap; retries only tickers still missing
+    pending = list(tickers)
+    for attempt in range(retries + 1):
+        try:
+            frames = store.provider.fetch_many(pending, start, end)
+        except Exception as exc:
+            log.warning("Batch fetch failed (%s tickers, attempt %d): %s", len(pending), attempt + 1, exc)
+            frames = {}
+        for ticker, frame in frames.items():
+            store.ingest(ticker, frame, start, end)
+        pending = [t for t in pending if t not in frames]
+        if not pending or attempt == retries:
+            break
+        time.sleep(backoff * (2 ** attempt))
+    return pending
+
+
+def prefetch(store: PriceStore, tickers: Iterable[str], start: date, end: date,
+             batch_size: int = DEFAULT_BATCH_SIZE, max_workers: int = DEFAULT_MAX_WORKERS,
+             retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF) -> dict:
+    # Group tickers by their missing gaps so each batch shares one date range
+    by_gap = defaultdict(list)
+    for ticker in dict.fromkeys(tickers):
+        for gap in store.missing(ticker, start, end):
+            by_gap[gap].append(ticker)
+
+    jobs = [(gap, batch) for gap, group in by_gap.items() for batch in _chunks(group, batch_size)]
+    started = time.perf_counter()
+    failed = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch_batch, store, batch, gap[0], gap[1], retries, backoff) for gap, batch in jobs]
+        for future in as_completed(futures):
+            failed.update(future.result())
+
+    summary = {
+        "tickers": len({t for group in by_gap.values() for t in group}),
+        "batches": len(jobs),
+        "failed": sorted(failed),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    log.info("Prefetch finished: %s", summary)
+    return summary
@@ -0,0 +1,371 @@
+import json
+import os
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from stockpred.cache_backend import CacheBackend, LocalBackend, open_backend
+from stockpred.frames import compact_frame, compact_table
+from stockpred.singleflight import SingleFlight
+from stockpred.tracing import trace
+
+FIXTURES_ENV_VAR = "STOCKPRED_FIXTURES_DIR"
+# Same column order yfinance returns with auto_adjust=True
+PRICE_COLUMNS = ["Date", "Close", "High", "Low", "Open", "Volume"]
+# Stored and served as datetime64[ns] dates and float32 prices and volumes (frames.compact_table)
+PRICE_DTYPE = "float32"
+# Empty fetches over gaps shorter than this are recorded as covered (weekends, holidays)
+MAX_EMPTY_GAP_DAYS = 7
+DEFAULT_INTERVAL = "1d"
+# Calendar days per provider call and per streamed chunk: a chunk of bars stays a few thousand
+# rows at every interval (Yahoo also refuses 1m requests longer than 8 days)
+CHUNK_DAYS = {"1d": 3650, "1h": 30, "30m": 14, "15m": 7, "5m": 7, "1m": 7}
+INTERVALS = tuple(CHUNK_DAYS)
+# How far back Yahoo serves each intraday interval
+INTRADAY_LOOKBACK_DAYS = {"1h": 729, "30m": 59, "15m": 59, "5m": 59, "1m": 29}
+
+Interval = Tuple[date, date]
+
+
+def normalize_prices(df: pd.DataFrame) -> pd.DataFrame:
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    if "Date" not in df.columns:
+        df = df.reset_index()
+    if "Date" not in df.columns and "Datetime" in df.columns:
+        df = df.rename(columns={"Datetime": "Date"})
+    if df.empty:
+        return pd.DataFrame({c: pd.Series(dtype="datetime64[ns]" if c == "Date" else PRICE_DTYPE) for c in PRICE_COLUMNS})
+    df = df[[c for c in PRICE_COLUMNS if c in df.columns]].copy()
+    df["Date"] = pd.to_datetime(df["Date"]).dt.tz_localize(None).astype("datetime64[ns]")
+    for col in df.columns[df.columns != "Date"]:
+        df[col] = df[col].astype(PRICE_DTYPE)
+    return df.sort_values("Date").reset_index(drop=True)
+
+
+# -----------------------------
+# Providers
+# -----------------------------
+class YahooProvider:
+    def fetch(self, ticker: str, start: date, end: date, interval: str = DEFAULT_INTERVAL) -> pd.DataFrame:
+        import yfinance as yf
+
+        if interval in INTRADAY_LOOKBACK_DAYS:
+            # Older intraday bars are an error, not an empty frame
+            start = max(start, date.today() - timedelta(days=INTRADAY_LOOKBACK_DAYS[interval]))
+            if start >= end:
+                return normalize_prices(pd.DataFrame())
+        df = yf.download(
+            ticker,
+            start=start,
+            end=end,
+            interval=interval,
+            auto_adjust=True,
+            progress=False,
+            group_by="column",
+        )
+        return normalize_prices(df)
+
+    def fetch_many(self, tickers: List[str], start: date, end: date) -> dict:
+        import yfinance as yf
+
+        df = yf.download(
+            tickers=list(tickers),
+            start=start,
+            end=end,
+            auto_adjust=True,
+            progress=False,
+            group_by="ticker",
+            threads=True,
+        )
+        frames = {}
+        if df is None or df.empty:
+            return frames
+        if not isinstance(df.columns, pd.MultiIndex):
+            # A single-ticker batch comes back without the ticker level
+            return {tickers[0]: normalize_prices(df)} if len(tickers) == 1 else frames
+        present = set(df.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker not in present:
+                continue
+            sub = df[ticker].dropna(how="all")
+            if not sub.empty:
+                frames[ticker] = normalize_prices(sub)
+        return frames
+
+
+class FixtureProvider:
+    """Offline provider reading ``<root>/<TICKER>.csv`` or ``.parquet`` files.
+
+    Intraday bars are read from ``<TICKER>@<interval>.csv`` / ``.parquet``.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def fetch(self, ticker: str, start: date, end: date, interval: str = DEFAULT_INTERVAL) -> pd.DataFrame:
+        name = ticker if interval == DEFAULT_INTERVAL else f"{ticker}@{interval}"
+        parquet = self.root / f"{name}.parquet"
+        if parquet.exists():
+            df = pd.read_parquet(parquet)
+        else:
+            csv = self.root / f"{name}.csv"
+            if not csv.exists():
+                return normalize_prices(pd.DataFrame())
+            df = pd.read_csv(csv, parse_dates=["Date"])
+        df = normalize_prices(df)
+        mask = (df["Date"] >= pd.Timestamp(start)) & (df["Date"] < pd.Timestamp(end))
+        return df.loc[mask].reset_index(drop=True)
+
+    def fetch_many(self, tickers: List[str], start: date, end: date) -> dict:
+        frames = {ticker: self.fetch(ticker, start, end) for ticker in tickers}
+        return {ticker: df for ticker, df in frames.items() if not df.empty}
+
+
+def default_provider():
+    fixtures = os.environ.get(FIXTURES_ENV_VAR)
+    return FixtureProvider(fixtures) if fixtures else YahooProvider()
+
+
+# -----------------------------
+# Interval bookkeeping ([start, end) with exclusive end, like yfinance)
+# -----------------------------
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def missing_intervals(covered: List[Interval], start: date, end: date) -> List[Interval]:
+    gaps: List[Interval] = []
+    cursor = start
+    for c_start, c_end in merge_intervals(covered):
+        if c_end <= cursor:
+            continue
+        if c_start >= end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start))
+        cursor = max(cursor, c_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def date_chunks(start: date, end: date, days: int) -> Iterator[Interval]:
+    # [start, end) cut into consecutive slices of at most ``days`` days
+    cursor = start
+    while cursor < end:
+        stop = min(end, cursor + timedelta(days=days))
+        yield cursor, stop
+        cursor = stop
+
+
+# -----------------------------
+# Store
+# -----------------------------
+class PriceStore:
+    """Per-ticker OHLCV cache in front of a price provider.
+
+    Daily bars of a ticker are one uncompressed Arrow IPC file
+    (``<TICKER>.arrow``) of datetime64 dates and float32 prices. Intraday bars
+    are split by month (``<TICKER>@<interval>/<YYYY-MM>.arrow``), so appending a
+    chunk rewrites one month rather than the whole history. Files are
+    memory-mapped on read when the backend is a local directory, so ``read``
+    returns read-only frames viewing the shared mapping instead of private
+    copies. A ``<TICKER>.json`` (``<TICKER>@<interval>.json``) sidecar lists the
+    date intervals already fetched. Only the gaps of a request are fetched, one
+    date chunk (``CHUNK_DAYS``) per provider call, by one node at a time per
+    ticker.
+    """
+
+    def __init__(self, root: Optional[Path] = None, provider=None, *, backend: Optional[CacheBackend] = None):
+        if backend is None:
+            backend = LocalBackend(root) if root is not None else open_backend("prices")
+        self.backend = backend
+        self.provider = provider if provider is not None else default_provider()
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        # Concurrent requests for the same range share one provider download
+        self.flight = SingleFlight("prices")
+
+    def _lock(self, series: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(series, threading.Lock())
+
+    @staticmethod
+    def _series(ticker: str, interval: str = DEFAULT_INTERVAL) -> str:
+        return ticker if interval == DEFAULT_INTERVAL else f"{ticker}@{interval}"
+
+    @classmethod
+    def _data_key(cls, ticker: str, interval: str = DEFAULT_INTERVAL, month: str = "") -> str:
+        if interval == DEFAULT_INTERVAL:
+            return f"{ticker}.arrow"
+        return f"{cls._series(ticker, interval)}/{month}.arrow"
+
+    @classmethod
+    def _coverage_key(cls, ticker: str, interval: str = DEFAULT_INTERVAL) -> str:
+        return f"{cls._series(ticker, interval)}.json"
+
+    @staticmethod
+    def _months(interval: str, start: date, end: date) -> List[str]:
+        # The files holding [start, end): the one daily file, or each month touched
+        if interval == DEFAULT_INTERVAL:
+            return [""]
+        return [str(m) for m in pd.period_range(start, end - timedelta(days=1), freq="M")]
+
+    # -----------------------------
+    # Coverage
+    # -----------------------------
+    def coverage(self, ticker: str, interval: str = DEFAULT_INTERVAL) -> List[Interval]:
+        try:
+            raw = json.loads(self.backend.get(self._coverage_key(ticker, interval)) or b"{}")
+        except ValueError:
+            return []
+        return [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in raw.get("intervals", [])]
+
+    def _write_coverage(self, ticker: str, interval: str, intervals: List[Interval]):
+        payload = {"intervals": [[s.isoformat(), e.isoformat()] for s, e in merge_intervals(intervals)]}
+        self.backend.put(self._coverage_key(ticker, interval), json.dumps(payload).encode("utf-8"))
+
+    def missing(self, ticker: str, start: date, end: date, interval: str = DEFAULT_INTERVAL) -> List[Interval]:
+        return missing_intervals(self.coverage(ticker, interval), start, end)
+
+    def first_date(self, ticker: str, interval: str = DEFAULT_INTERVAL) -> Optional[date]:
+        # Day of the oldest stored bar, or None before anything is stored
+        if interval == DEFAULT_INTERVAL:
+            keys = [self._data_key(ticker)]
+        else:
+            keys = sorted(self.backend.keys(f"{self._series(ticker, interval)}/"))[:1]
+        for key in keys:
+            table = self._read_table(key)
+            if table is not None and table.num_rows:
+                return pd.Timestamp(table.column("Date")[0].as_py()).date()
+        return None
+
+    # -----------------------------
+    # Arrow file I/O
+    # -----------------------------
+    def _read_table(self, key: str) -> Optional[pa.Table]:
+        path = self.backend.local_path(key)
+        if path is not None:
+            if not path.exists():
+                return None
+            with pa.memory_map(str(path), "r") as source:
+                return pa.ipc.open_file(source).read_all()
+        payload = self.backend.get(key)
+        if payload is None:
+            return None
+        return pa.ipc.open_file(pa.BufferReader(payload)).read_all()
+
+    def _write_frame(self, key: str, df: pd.DataFrame):
+        table = compact_table(pa.Table.from_pandas(df, preserve_index=False))
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        self.backend.put(key, sink.getvalue().to_pybytes())
+
+    def read(self, ticker: str, start: date, end: date, interval: str = DEFAULT_INTERVAL) -> pd.DataFrame:
+        frames = []
+        for month in self._months(interval, start, end):
+            table = self._read_table(self._data_key(ticker, interval, month))
+            if table is None or table.num_rows == 0:
+                continue
+            dates = table.column("Date").to_numpy()
+            lo = int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left"))
+            hi = int(np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side="left"))
+            if hi > lo:
+                frames.append(compact_frame(table.slice(lo, hi - lo)))
+        if not frames:
+            return normalize_prices(pd.DataFrame())
+        # A single file (always, for daily bars) stays a view of its mapping
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def ingest(self, ticker: str, frame: pd.DataFrame, start: date, end: date, interval: str = DEFAULT_INTERVAL):
+        # Merge freshly fetched rows for [start, end) into the files they fall in and record the interval
+        frame = normalize_prices(frame)
+        series = self._series(ticker, interval)
+        with self._lock(series), self.backend.lock(f"{series}.write"):
+            if not frame.empty:
+                if interval == DEFAULT_INTERVAL:
+                    parts = [("", frame)]
+                else:
+                    parts = frame.groupby(frame["Date"].dt.strftime("%Y-%m"), sort=False)
+                for month, rows in parts:
+                    key = self._data_key(ticker, interval, month)
+                    table = self._read_table(key)
+                    merged = rows if table is None else pd.concat([compact_frame(table), rows], ignore_index=True)
+                    merged = merged.drop_duplicates("Date", keep="last").sort_values("Date").reset_index(drop=True)
+                    self._write_frame(key, merged)
+            # Never mark today or later as covered: the current bar is still moving
+            end = min(end, date.today())
+            if start < end and (not frame.empty or (end - start) < timedelta(days=MAX_EMPTY_GAP_DAYS)):
+                self._write_coverage(ticker, interval, self.coverage(ticker, interval) + [(start, end)])
+
+    def _fill(self, ticker: str, start: date, end: date, interval: str = DEFAULT_INTERVAL):
+        # Gaps are re-read under the lock: another node may have filled them while we waited.
+        # Each chunk is stored (and covered) as soon as it lands, so an interrupted fill resumes.
+        series = self._series(ticker, interval)
+        with self.backend.lock(f"{series}.fill"):
+            empty = []
+            for gap_start, gap_end in self.missing(ticker, start, end, interval):
+                for chunk_start, chunk_end in date_chunks(gap_start, gap_end, CHUNK_DAYS[interval]):
+                    with trace("download", ticker=ticker, interval=interval, days=(chunk_end - chunk_start).days):
+                        if interval == DEFAULT_INTERVAL:
+                            frame = self.provider.fetch(ticker, chunk_start, chunk_end)
+                        else:
+                            frame = self.provider.fetch(ticker, chunk_start, chunk_end, interval)
+                    self.ingest(ticker, frame, chunk_start, chunk_end, interval)
+                    if frame.empty:
+                        empty.append((chunk_start, chunk_end))
+            # Empty chunks ending before the oldest bar the provider has (before the listing, or
+            # beyond its intraday lookback) will stay empty: cover them so they are not refetched
+            first = self.first_date(ticker, interval) if empty else None
+            leading = [(s, e) for s, e in empty if first is not None and e <= first]
+            if leading:
+                with self._lock(series), self.backend.lock(f"{series}.write"):
+                    self._write_coverage(ticker, interval, self.coverage(ticker, interval) + leading)
+
+    def _ensure(self, ticker: str, start: date, end: date, interval: str):
+        def covered():
+            return True if not self.missing(ticker, start, end, interval) else None
+
+        self.flight.do((ticker, interval, start, end), lambda: self._fill(ticker, start, end, interval), lookup=covered)
+
+    def get(self, ticker: str, start: date, end: date, interval: str = DEFAULT_INTERVAL) -> pd.DataFrame:
+        self._ensure(ticker, start, end, interval)
+        return self.read(ticker, start, end, interval)
+
+    def stream(
+        self,
+        ticker: str,
+        start: date,
+        end: date,
+        interval: str = DEFAULT_INTERVAL,
+        progress: Optional[Callable[[float, str], None]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Bars of ``[start, end)`` one ``CHUNK_DAYS`` slice at a time, oldest first.
+
+        Each slice is downloaded and stored (if missing) just before it is read,
+        so neither the download nor the caller holds more than one slice.
+        Empty slices (holidays, beyond the provider's lookback) are skipped.
+        """
+        chunks = list(date_chunks(start, end, CHUNK_DAYS[interval]))
+        for i, (chunk_start, chunk_end) in enumerate(chunks, 1):
+            self._ensure(ticker, chunk_start, chunk_end, interval)
+            frame = self.read(ticker, chunk_start, chunk_end, interval)
+            if progress is not None:
+                progress(i / len(chunks), f"Loaded {ticker} {interval} bars up to {chunk_end}")
+            if not frame.empty:
+                yield frame
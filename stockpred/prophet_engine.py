@@ -0,0 +1,53 @@
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
+
+from stockpred.engines import Engine
+from stockpred.trading_calendar import DEFAULT_EXCHANGE, future_frame
+
+# Default hyperparameters (as used by app.py)
+PROPHET_PARAMS = dict(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
+
+# -----------------------------
+# Prophet
+# -----------------------------
+def fit_prophet(df_p: pd.DataFrame, params: dict, progress: Optional[Callable] = None) -> Prophet:
+    model = Prophet(**params)
+    model.fit(df_p)
+    return model
+
+def prophet_init(model: Prophet) -> dict:
+    # Stan initial values from a previous fit (Prophet docs, "Updating fitted models")
+    init = {}
+    for pname in ["k", "m", "sigma_obs"]:
+        if model.mcmc_samples == 0:
+            init[pname] = model.params[pname][0][0]
+        else:
+            init[pname] = np.mean(model.params[pname])
+    for pname in ["delta", "beta"]:
+        if model.mcmc_samples == 0:
+            init[pname] = model.params[pname][0]
+        else:
+            init[pname] = np.mean(model.params[pname], axis=0)
+    return init
+
+def warm_fit_prophet(
+    df_p: pd.DataFrame, params: dict, previous: Prophet, progress: Optional[Callable] = None,
+) -> Prophet:
+    model = Prophet(**params)
+    model.fit(df_p, init=prophet_init(previous))
+    return model
+
+def predict_prophet(model: Prophet, df_p: pd.DataFrame, periods: int, exchange: str = DEFAULT_EXCHANGE) -> pd.DataFrame:
+    return model.predict(future_frame(model.history_dates, periods, exchange))
+
+def dump_prophet(model: Prophet) -> bytes:
+    return model_to_json(model).encode("utf-8")
+
+def load_prophet(payload: bytes) -> Prophet:
+    return model_from_json(payload.decode("utf-8"))
+
+ENGINE = Engine("prophet", PROPHET_PARAMS, fit_prophet, warm_fit_prophet, predict_prophet, dump_prophet, load_prophet)
@@ -0,0 +1,83 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+RENDER_CACHE_MB_ENV_VAR = "STOCKPRED_RENDER_CACHE_MB"
+DEFAULT_RENDER_CACHE_MB = 128
+# Budget of the app's intraday cache (training frames and latest chunks), kept apart from the views'
+INTRADAY_CACHE_MB_ENV_VAR = "STOCKPRED_INTRADAY_CACHE_MB"
+DEFAULT_INTRADAY_CACHE_MB = 64
+
+
+class SizedLRU:
+    """Thread-safe LRU bounded by the total size callers declare for their entries.
+
+    Used for rendered forecast views (figures and tables) and intraday frames
+    shared by every session of a server: entries are evicted least-recently-used
+    first once ``max_bytes`` is exceeded, and a single entry larger than the
+    budget is never stored.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value, nbytes: int):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._items[key] = (value, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, (_, size) = self._items.popitem(last=False)
+                self.bytes -= size
+                self.evictions += 1
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is not None:
+                self.bytes -= item[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _budget_bytes(env_var: str, default_mb: float, mb: Optional[float]) -> int:
+    mb = float(os.environ.get(env_var, default_mb)) if mb is None else mb
+    return int(mb * 1024 * 1024)
+
+
+def render_cache_bytes(mb: Optional[float] = None) -> int:
+    return _budget_bytes(RENDER_CACHE_MB_ENV_VAR, DEFAULT_RENDER_CACHE_MB, mb)
+
+
+def intraday_cache_bytes(mb: Optional[float] = None) -> int:
+    return _budget_bytes(INTRADAY_CACHE_MB_ENV_VAR, DEFAULT_INTRADAY_CACHE_MB, mb)
@@ -0,0 +1,103 @@
+"""Training resolution: fit on daily, weekly or monthly bars.
+
+A fit pays for every row, but a multi-year forecast gains little from daily
+noise: Prophet's optimizer and NeuralProphet's epochs both scale with the row
+count. Coarser bars are aggregated OHLC-style per period (first open, highest
+high, lowest low, last close, summed volume) and dated at the period's end,
+weekly bars on Friday and monthly bars on the last day of the month; a period
+still open at the end of the history is dated at its last observed day. The
+regular spacing is what NeuralProphet's frequency handling needs, and it lets
+the engines recognise a coarse history (``infer_resolution``) and forecast at
+the same step. ``SEASONALITY`` holds the matching engine params: weekly bars
+carry no day-of-week cycle, and monthly bars support only a low-order yearly one.
+
+``choose_resolution`` is the opt-in ``AUTO`` policy: the coarsest resolution
+the horizon allows that still leaves enough bars to train on. Its thresholds
+come from ``python -m benchmarks.resolution`` (see the README), which also shows
+why daily stays the default: coarse fits are faster, but their uncertainty
+intervals cover far fewer of the realised prices.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from stockpred.frames import period_ordinals
+
+DAILY, WEEKLY, MONTHLY = "daily", "weekly", "monthly"
+RESOLUTIONS = (DAILY, WEEKLY, MONTHLY)
+# Resolved per forecast by choose_resolution
+AUTO = "auto"
+# Period (to_period) and bar date (date_range) frequencies of the coarse resolutions
+PERIOD_FREQS = {WEEKLY: "W-FRI", MONTHLY: "M"}
+DATE_FREQS = {WEEKLY: "W-FRI", MONTHLY: "ME"}
+# Calendar days per bar
+BAR_DAYS = {DAILY: 365.25 / 252, WEEKLY: 7.0, MONTHLY: 365.25 / 12}
+# Engine params overlay per resolution; monthly bars alias any yearly Fourier order above 5
+SEASONALITY: Dict[str, dict] = {
+    DAILY: {},
+    WEEKLY: {"weekly_seasonality": False},
+    MONTHLY: {"weekly_seasonality": False, "yearly_seasonality": 4},
+}
+# Policy: a resolution needs at least this horizon (calendar days) and this many training bars
+MIN_HORIZON_DAYS = {WEEKLY: 2 * 365, MONTHLY: 5 * 365}
+MIN_TRAIN_BARS = {WEEKLY: 156, MONTHLY: 96}
+# How each price column aggregates; ``y`` is the training frames' close
+AGGREGATIONS = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum", "y": "last"}
+
+
+def resample_bars(frame: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    """``frame`` (prices with ``Date``, or a ``ds``/``y`` training frame) as ``resolution`` bars.
+
+    Daily frames are returned as they are. Periods without a close are dropped.
+    The last period is dated no later than the frame's last date.
+    """
+    if resolution == DAILY:
+        return frame
+    date_col = "Date" if "Date" in frame.columns else "ds"
+    close = "Close" if "Close" in frame.columns else "y"
+    aggs = {col: AGGREGATIONS[col] for col in frame.columns if col in AGGREGATIONS}
+    bars = frame.groupby(period_ordinals(frame[date_col], PERIOD_FREQS[resolution])).agg(aggs)
+    bars = bars[bars[close].notna()]
+    ends = pd.PeriodIndex.from_ordinals(bars.index.to_numpy(), freq=PERIOD_FREQS[resolution]).end_time.normalize()
+    # A partial last period holds the latest close, not the close at a future period end
+    last = pd.Timestamp(frame[date_col].max()).normalize()
+    ends = ends.where(ends <= last, last)
+    bars.insert(0, date_col, ends.to_numpy(dtype="datetime64[ns]"))
+    return bars.reset_index(drop=True)
+
+
+def infer_resolution(ds: pd.Series) -> str:
+    # From the median spacing of the dates; too few dates read as daily
+    dates = np.unique(pd.to_datetime(pd.Series(ds)).to_numpy(dtype="datetime64[D]"))
+    if len(dates) < 3:
+        return DAILY
+    step = float(np.median(np.diff(dates).astype(float)))
+    if step < 4:
+        return DAILY
+    return WEEKLY if step < 20 else MONTHLY
+
+
+def bar_dates(last, periods: int, resolution: str) -> pd.DatetimeIndex:
+    # Weekly / monthly bar dates after ``last`` within the next ``periods`` calendar days
+    last = pd.Timestamp(last).normalize()
+    return pd.date_range(last + pd.Timedelta(days=1), last + pd.Timedelta(days=int(periods)),
+                         freq=DATE_FREQS[resolution])
+
+
+def choose_resolution(periods: int, history_ds: pd.Series) -> str:
+    """The coarsest resolution for a ``periods``-day horizon over this history."""
+    ds = pd.to_datetime(pd.Series(history_ds))
+    span = (ds.max() - ds.min()).days if len(ds) else 0
+    for resolution in (MONTHLY, WEEKLY):
+        if periods >= MIN_HORIZON_DAYS[resolution] and span / BAR_DAYS[resolution] >= MIN_TRAIN_BARS[resolution]:
+            return resolution
+    return DAILY
+
+
+def resolve(resolution: str, periods: int, history_ds: pd.Series) -> str:
+    if resolution == AUTO:
+        return choose_resolution(periods, history_ds)
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution {resolution!r}; choose from {', '.join(RESOLUTIONS + (AUTO,))}")
+    return resolution
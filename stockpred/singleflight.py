@@ -0,0 +1,101 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional
+
+from stockpred.jobs import JobCancelled
+
+# Set on a flight whose leader was cancelled: followers did not ask for that, so they retry
+_RETRY = object()
+
+# Counters summed per flight name over every flight in the process (``flight_stats``)
+_totals: Dict[str, Dict[str, int]] = {}
+_totals_lock = threading.Lock()
+
+
+def _add(name: str, field: str, n: int = 1):
+    with _totals_lock:
+        totals = _totals.setdefault(name, {"hits": 0, "misses": 0, "coalesced": 0, "inflight": 0})
+        totals[field] += n
+
+
+def flight_stats() -> List[dict]:
+    """Hits, misses, coalesced waits and computations in flight, per flight name.
+
+    Read by ``tracing.Recorder.prometheus`` (/metrics) and the app's Performance panel.
+    """
+    with _totals_lock:
+        return [{"name": name, **totals} for name, totals in sorted(_totals.items())]
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one computation.
+
+    The first caller for a key runs ``fn``; callers arriving while it is still
+    running wait on the same future instead of repeating the work. ``lookup``
+    (optional) is consulted first so cache hits never enter the flight table.
+    If the leader's job is cancelled (``JobCancelled``), only the leader sees
+    it; waiting callers start over, and one of them leads the next flight.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], object], lookup: Optional[Callable[[], object]] = None):
+        while True:
+            if lookup is not None:
+                cached = lookup()
+                if cached is not None:
+                    with self._lock:
+                        self.hits += 1
+                    _add(self.name, "hits")
+                    return cached
+
+            with self._lock:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._inflight[key] = future
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+            _add(self.name, "misses" if leader else "coalesced")
+            if leader:
+                _add(self.name, "inflight")
+
+            if not leader:
+                result = future.result()
+                if result is _RETRY:
+                    continue
+                return result
+
+            try:
+                result = fn()
+            except JobCancelled:
+                future.set_result(_RETRY)
+                raise
+            except BaseException as exc:
+                future.set_exception(exc)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                _add(self.name, "inflight", -1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+            }
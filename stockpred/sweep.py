@@ -0,0 +1,199 @@
+"""Per-ticker hyperparameter sweeps by successive halving and Hyperband.
+
+Every configuration in an engine's search grid starts on a small budget and
+only the best ``1 / eta`` of each rung is promoted to the next, ``eta`` times
+larger budget; only the survivors of the last rung get a full fit. The budget
+is what makes a fit expensive for each engine:
+
+* Prophet: the training window. Low rungs fit only the most recent slice of
+  the history (at least ``MIN_TRAIN_ROWS`` rows), which is where Stan spends
+  its time.
+* NeuralProphet: training epochs, so losing configurations stop after a few.
+
+Trials are scored by MAPE on one holdout fold (the last ``periods`` days of the
+window, see ``backtest.make_folds``) and run in a process pool. The winner is
+saved to the ``TunedParamsStore``, where ``api.forecast`` picks it up.
+"""
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from itertools import product
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from stockpred.api import InsufficientDataError, horizon_days, load_prices
+from stockpred.backtest import MIN_TRAIN_ROWS, Fold, make_folds, prepare_frames, run_fold
+from stockpred.engines import ENGINES
+from stockpred.price_store import PriceStore
+from stockpred.trading_calendar import exchange_for_ticker
+from stockpred.tuned_params import TunedParamsStore
+
+# Prophet's defaults (0.05, 10.0) are in its grid; NeuralProphet's fixed learning
+# rates also skip its learning-rate finder, which costs more than a short rung
+SEARCH_SPACES = {
+    "prophet": {
+        "changepoint_prior_scale": [0.001, 0.01, 0.05, 0.5],
+        "seasonality_prior_scale": [0.1, 1.0, 10.0],
+    },
+    "neuralprophet": {
+        "learning_rate": [0.001, 0.01, 0.1],
+        "trend_reg": [0.0, 1.0, 10.0],
+    },
+}
+# What a fraction of the budget cuts: "epochs" of training, or the training "window"
+BUDGET_KINDS = {"prophet": "window", "neuralprophet": "epochs"}
+METHODS = ("halving", "hyperband")
+DEFAULT_METHOD = "halving"
+DEFAULT_ETA = 3
+# Rungs per bracket: budgets 1/9, 1/3 and 1 of a full fit with eta = 3
+DEFAULT_RUNGS = 3
+DEFAULT_SEED = 0
+
+
+def grid(engine: str) -> List[dict]:
+    space = SEARCH_SPACES[engine]
+    return [dict(zip(space, values)) for values in product(*space.values())]
+
+
+def brackets(method: str, n_configs: int, eta: int = DEFAULT_ETA, rungs: int = DEFAULT_RUNGS) -> List[tuple]:
+    # (configurations, rungs) per bracket: the first rung runs at eta ** -(rungs - 1) of a
+    # full fit, every bracket ends on full fits
+    if method == "halving":
+        return [(n_configs, rungs)]
+    if method == "hyperband":
+        return [(min(n_configs, math.ceil(rungs / (s + 1) * eta ** s)), s + 1) for s in range(rungs - 1, -1, -1)]
+    raise ValueError(f"Unknown sweep method {method!r}; choose from {', '.join(METHODS)}")
+
+
+def _promoted(n: int, eta: int) -> int:
+    return max(1, n // eta)
+
+
+def run_trial(engine: str, df: pd.DataFrame, fold: Fold, exchange: str, config: dict, budget: float) -> dict:
+    # One configuration at a fraction of a full fit (module level so it pickles into the pool)
+    # ``cost`` is the share of a full fit actually spent, after rounding and minimums
+    params = {**ENGINES[engine].params, **config}
+    if BUDGET_KINDS.get(engine, "window") == "epochs":
+        full = params.get("epochs", 1)
+        params["epochs"] = max(1, round(full * budget))
+        cost = params["epochs"] / full
+    else:
+        # Keep the most recent rows up to the cutoff; the holdout stays the same
+        keep = min(fold.train_rows, max(MIN_TRAIN_ROWS, round(fold.train_rows * budget)))
+        first = fold.train_rows - keep
+        df = df.iloc[first:fold.test_end].reset_index(drop=True)
+        cost = keep / fold.train_rows
+        fold = Fold(fold.index, fold.cutoff, keep, fold.test_end - first)
+    row = run_fold(engine, df, fold, exchange, params)
+    return {"mape": row["mape"], "rmse": row["rmse"], "train_rows": row["train_rows"], "cost": cost,
+            "fit_seconds": row["fit_seconds"] + row["predict_seconds"], "error": None}
+
+
+def _trial_key(config: dict) -> tuple:
+    return tuple(sorted(config.items()))
+
+
+def sweep(
+    ticker: str,
+    start: date,
+    end: date,
+    horizon: int = 1,
+    engine: str = "prophet",
+    method: str = DEFAULT_METHOD,
+    eta: int = DEFAULT_ETA,
+    *,
+    periods: Optional[int] = None,
+    rungs: int = DEFAULT_RUNGS,
+    seed: int = DEFAULT_SEED,
+    prices: Optional[PriceStore] = None,
+    tuned: Optional[TunedParamsStore] = None,
+    workers: Optional[int] = None,
+    save: bool = True,
+    progress: Optional[Callable[[float, str], None]] = None,
+) -> dict:
+    """Search ``SEARCH_SPACES[engine]`` for ``ticker`` and save the winner.
+
+    Returns a report with the winning ``params`` and its holdout ``mape``, every
+    trial, and the compute spent against a full grid of full fits
+    (``budget_used`` / ``grid_budget`` in full-fit units, ``saved_fraction``,
+    ``seconds`` / ``grid_seconds_estimate`` of fitting).
+    """
+    configs = grid(engine)
+    plan = brackets(method, len(configs), eta, rungs)
+    periods = horizon_days(horizon) if periods is None else int(periods)
+    report = progress or (lambda fraction, message="": None)
+
+    df = prepare_frames(load_prices(ticker, start, end, prices=prices), [engine])[engine]
+    folds = make_folds(df["ds"], 1, periods)
+    if not folds:
+        raise InsufficientDataError(
+            f"Not enough history to hold out {periods} days for {ticker}; widen the date range or shorten the horizon."
+        )
+    fold, exchange = folds[0], exchange_for_ticker(ticker)
+    rng = random.Random(seed)
+
+    total = 0
+    for n, n_rungs in plan:
+        for _ in range(n_rungs):
+            total, n = total + n, _promoted(n, eta)
+    trials: List[dict] = []
+    started = time.perf_counter()
+    from stockpred.batch import init_worker
+
+    pool = ProcessPoolExecutor(
+        max_workers=min(len(configs), workers or os.cpu_count() or 2),
+        mp_context=multiprocessing.get_context("spawn"), initializer=init_worker, initargs=(1,),
+    )
+    try:
+        for bracket, (n, n_rungs) in enumerate(plan):
+            survivors = configs if n >= len(configs) else rng.sample(configs, n)
+            for rung in range(n_rungs):
+                budget = float(eta) ** (rung - n_rungs + 1)
+                futures = {
+                    pool.submit(run_trial, engine, df, fold, exchange, config, budget): config
+                    for config in survivors
+                }
+                scores: Dict[tuple, float] = {}
+                for future in as_completed(futures):
+                    config = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        result = {"mape": np.nan, "rmse": np.nan, "train_rows": None, "cost": budget, "fit_seconds": 0.0,
+                                  "error": f"{type(exc).__name__}: {exc}"}
+                    trials.append({"bracket": bracket, "rung": rung, "budget": budget, "params": config, **result})
+                    scores[_trial_key(config)] = result["mape"] if np.isfinite(result["mape"]) else np.inf
+                    report(len(trials) / total, f"{engine}: {len(trials)} of {total} trials, budget {budget:.2f}")
+                survivors = sorted(survivors, key=lambda c: scores[_trial_key(c)])[:_promoted(len(survivors), eta)]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    trials_df = pd.DataFrame(trials)
+    finals = trials_df[(trials_df["budget"] >= 1) & trials_df["error"].isna()]
+    full_seconds = finals["fit_seconds"].mean() if len(finals) else np.nan
+    out = {
+        "ticker": ticker, "engine": engine, "method": method, "eta": eta,
+        "params": None, "mape": None,
+        "trials": len(trials_df), "grid_size": len(configs),
+        "budget_used": float(trials_df["cost"].sum()), "grid_budget": float(len(configs)),
+        "seconds": time.perf_counter() - started,
+        "fit_seconds": float(trials_df["fit_seconds"].sum()),
+        "grid_seconds_estimate": float(full_seconds * len(configs)),
+        "per_trial": trials_df,
+    }
+    out["saved_fraction"] = 1 - out["budget_used"] / out["grid_budget"]
+    if len(finals):
+        best = finals.loc[finals["mape"].idxmin()]
+        out["params"], out["mape"] = dict(best["params"]), float(best["mape"])
+        if save:
+            tuned = tuned if tuned is not None else TunedParamsStore()
+            tuned.put(ticker, engine, out["params"], mape=out["mape"], method=method, eta=eta, periods=periods,
+                      trials=out["trials"], saved_fraction=out["saved_fraction"])
+    return out
+
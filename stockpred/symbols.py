@@ -0,0 +1,191 @@
+"""Search index over the companies.xml universe: prefix and fuzzy lookup by name or ticker.
+
+Everything lives in sorted NumPy arrays, so a lookup is a few binary searches
+and one ``bincount`` even with tens of thousands of symbols:
+
+* ``keys``: the normalized ticker, the full name and the name from each later
+  word on ("alphabet class a", "class a", "a"), so "class" finds every share
+  class. A prefix lookup is the ``searchsorted`` range between ``q`` and
+  ``q + b"\\xff"``.
+* ``grams``: the character trigrams of every name and ticker. A fuzzy lookup
+  ranks entries by the trigram Jaccard similarity to the query, which tolerates
+  typos ("mircosoft") and word order.
+
+The built arrays are saved as a ``.npz`` next to the other caches, keyed by a
+digest of the XML, so a restart loads them instead of parsing and rebuilding.
+"""
+import hashlib
+import logging
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from stockpred.companies import DEFAULT_COMPANIES_XML, read_companies
+from stockpred.config import cache_dir, temp_path
+
+log = logging.getLogger(__name__)
+
+# Bump when the arrays' layout or the normalization changes, so old cache files are ignored
+FORMAT_VERSION = 2
+DEFAULT_LIMIT = 200
+# Fuzzy matches below this trigram similarity are noise
+MIN_SIMILARITY = 0.25
+# Prefix ranks: exact ticker, ticker prefix, name prefix, later-word prefix
+EXACT, TICKER, NAME, WORD = 0, 1, 2, 3
+_ARRAYS = ("names", "tickers", "keys", "key_entry", "key_kind", "grams", "gram_entry", "gram_counts")
+# Word characters of any script, plus the symbols tickers use (^GSPC, BRK-B, EURUSD=X, AT&T)
+_UNSAFE = re.compile(r"[^\w.&^=\-]+")
+# Strings are stored as UTF-8 bytes ("S" arrays): a quarter of NumPy's UCS-4 "U" arrays, same sort order
+_MAX_BYTE = b"\xff"
+
+
+def normalize(text: str) -> str:
+    # Accents are dropped ("Nestlé" -> "nestle"), so queries typed without them still match
+    text = "".join(c for c in unicodedata.normalize("NFKD", text.casefold()) if not unicodedata.combining(c))
+    return " ".join(_UNSAFE.sub(" ", text).split())
+
+
+def _utf8(strings: list) -> np.ndarray:
+    return np.array([s.encode("utf-8") for s in strings], dtype=bytes)
+
+
+def trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolIndex:
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        for name in _ARRAYS:
+            setattr(self, name, arrays[name])
+        self._by_ticker = {ticker: i for i, ticker in enumerate(self._text(self.tickers))}
+
+    # -----------------------------
+    # Build / persist
+    # -----------------------------
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, str]]) -> "SymbolIndex":
+        # ``entries``: (name, ticker) in display order; a repeated ticker keeps its first name
+        names, tickers, seen = [], [], set()
+        for name, ticker in entries:
+            if ticker not in seen:
+                seen.add(ticker)
+                names.append(name)
+                tickers.append(ticker)
+
+        keys, key_entry, key_kind = [], [], []
+        grams, gram_entry, gram_counts = [], [], []
+        for i, (name, ticker) in enumerate(zip(names, tickers)):
+            words = normalize(name).split()
+            entry_keys = [(normalize(ticker), TICKER)] + [(" ".join(words[k:]), NAME if k == 0 else WORD)
+                                                          for k in range(len(words))]
+            for key, kind in entry_keys:
+                keys.append(key)
+                key_entry.append(i)
+                key_kind.append(kind)
+            entry_grams = trigrams(" ".join(words)) | trigrams(normalize(ticker))
+            grams.extend(entry_grams)
+            gram_entry.extend([i] * len(entry_grams))
+            gram_counts.append(len(entry_grams))
+
+        keys = _utf8(keys)
+        key_order = np.argsort(keys, kind="stable")
+        gram_array = _utf8(grams)
+        gram_order = np.argsort(gram_array, kind="stable")
+        return cls({
+            "names": _utf8(names),
+            "tickers": _utf8(tickers),
+            "keys": keys[key_order],
+            "key_entry": np.array(key_entry, dtype=np.int32)[key_order],
+            "key_kind": np.array(key_kind, dtype=np.int8)[key_order],
+            "grams": gram_array[gram_order],
+            "gram_entry": np.array(gram_entry, dtype=np.int32)[gram_order],
+            "gram_counts": np.array(gram_counts, dtype=np.int32),
+        })
+
+    def save(self, path: Path):
+        tmp = temp_path(path)
+        with open(tmp, "wb") as f:
+            np.savez(f, **{name: getattr(self, name) for name in _ARRAYS})
+        tmp.replace(path)
+
+    @classmethod
+    def read(cls, path: Path) -> "SymbolIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in _ARRAYS})
+
+    @classmethod
+    def load(cls, xml_path: str = DEFAULT_COMPANIES_XML, root: Optional[Path] = None) -> "SymbolIndex":
+        # The cached index for this exact XML, built and saved on first use
+        digest = hashlib.sha256(Path(xml_path).read_bytes()).hexdigest()[:16]
+        path = Path(root or cache_dir("symbols")) / f"v{FORMAT_VERSION}-{digest}.npz"
+        if path.exists():
+            try:
+                return cls.read(path)
+            except (OSError, ValueError, KeyError) as exc:
+                log.warning("Rebuilding unreadable symbol index %s: %s", path, exc)
+        index = cls.build(read_companies(xml_path).items())
+        index.save(path)
+        return index
+
+    # -----------------------------
+    # Lookup
+    # -----------------------------
+    @staticmethod
+    def _text(values: np.ndarray) -> List[str]:
+        return [v.decode("utf-8") for v in values.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._by_ticker
+
+    def name(self, ticker: str) -> str:
+        return self.names[self._by_ticker[ticker]].decode("utf-8")
+
+    def label(self, ticker: str) -> str:
+        return f"{self.name(ticker)} ({ticker})"
+
+    def companies(self) -> Dict[str, str]:
+        # name -> ticker, like companies.read_companies
+        return dict(zip(self._text(self.names), self._text(self.tickers)))
+
+    def prefix(self, query: str, limit: int = DEFAULT_LIMIT) -> List[str]:
+        q = normalize(query).encode("utf-8")
+        if not q:
+            return self._text(self.tickers[:limit])
+        lo = int(np.searchsorted(self.keys, q, side="left"))
+        hi = int(np.searchsorted(self.keys, q + _MAX_BYTE, side="left"))
+        entries, kinds = self.key_entry[lo:hi], self.key_kind[lo:hi].copy()
+        kinds[(kinds == TICKER) & (self.keys[lo:hi] == q)] = EXACT
+        # Best rank per entry, then shorter names first ("Apple" before "Applied Materials")
+        order = np.lexsort((np.char.str_len(self.names[entries]), kinds))
+        _, first = np.unique(entries[order], return_index=True)
+        ranked = entries[order][np.sort(first)]
+        return self._text(self.tickers[ranked[:limit]])
+
+    def fuzzy(self, query: str, limit: int = DEFAULT_LIMIT, min_similarity: float = MIN_SIMILARITY) -> List[str]:
+        q = normalize(query)
+        if not q:
+            return []
+        q_grams = np.sort(_utf8(list(trigrams(q))))
+        lo = np.searchsorted(self.grams, q_grams, side="left")
+        hi = np.searchsorted(self.grams, q_grams, side="right")
+        hits = np.concatenate([self.gram_entry[a:b] for a, b in zip(lo, hi)] or [np.empty(0, np.int32)])
+        shared = np.bincount(hits, minlength=len(self)).astype(float)
+        similarity = shared / (len(q_grams) + self.gram_counts - shared)
+        candidates = np.flatnonzero(similarity >= min_similarity)
+        ranked = candidates[np.argsort(-similarity[candidates], kind="stable")]
+        return self._text(self.tickers[ranked[:limit]])
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[str]:
+        # Prefix matches first, topped up with fuzzy matches for typos and words out of order
+        found = self.prefix(query, limit)
+        if len(found) < limit and normalize(query):
+            seen = set(found)
+            found += [t for t in self.fuzzy(query, limit) if t not in seen][:limit - len(found)]
+        return found
@@ -0,0 +1,202 @@
+import contextvars
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+log = logging.getLogger("stockpred.trace")
+
+METRICS_PORT_ENV_VAR = "STOCKPRED_METRICS_PORT"
+DEFAULT_MAX_SPANS = 2000
+# Histogram buckets in seconds: cache hits are milliseconds, cold NeuralProphet fits minutes
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# singleflight.flight_stats counters and their ``outcome`` label
+FLIGHT_OUTCOMES = {"hits": "hit", "misses": "miss", "coalesced": "coalesced"}
+
+# Labels (ticker, engine, ...) inherited by every span opened inside ``labels(...)``
+_labels: contextvars.ContextVar = contextvars.ContextVar("stockpred_trace_labels", default={})
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+class Recorder:
+    """Keeps recent spans plus per-(stage, engine) histograms for Prometheus.
+
+    ``wall`` is elapsed time, ``cpu`` is CPU time of the calling thread (work a
+    stage hands to a subprocess, such as CmdStan, shows up as wall but not cpu)
+    and ``peak_rss`` is the process high-water mark when the stage ended;
+    ``rss_growth`` is how far the stage pushed that mark up.
+    """
+
+    def __init__(self, max_spans: int = DEFAULT_MAX_SPANS):
+        self._spans = deque(maxlen=max_spans)
+        self._histograms: Dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, span: dict):
+        key = (span["stage"], span.get("engine") or "")
+        with self._lock:
+            self._spans.append(span)
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0, "cpu": 0.0}
+            for i, bound in enumerate(BUCKETS):
+                if span["wall"] <= bound:
+                    hist["buckets"][i] += 1
+            hist["count"] += 1
+            hist["sum"] += span["wall"]
+            hist["cpu"] += span["cpu"]
+
+    def spans(self, **match) -> List[dict]:
+        with self._lock:
+            spans = list(self._spans)
+        return [s for s in spans if all(s.get(k) == v for k, v in match.items())]
+
+    def latest(self, **match) -> List[dict]:
+        # Most recent span per stage (and chart), in the order they last ran
+        latest = {}
+        for span in self.spans(**match):
+            key = (span["stage"], span.get("chart"))
+            latest.pop(key, None)
+            latest[key] = span
+        return list(latest.values())
+
+    def summary(self) -> List[dict]:
+        by_stage: Dict[tuple, List[float]] = {}
+        for span in self.spans():
+            by_stage.setdefault((span["stage"], span.get("engine") or ""), []).append(span["wall"])
+        rows = []
+        for (stage, engine), walls in sorted(by_stage.items()):
+            walls.sort()
+            rows.append({
+                "stage": stage,
+                "engine": engine,
+                "count": len(walls),
+                "p50": walls[int(0.50 * (len(walls) - 1))],
+                "p95": walls[int(0.95 * (len(walls) - 1))],
+                "max": walls[-1],
+            })
+        return rows
+
+    def prometheus(self) -> str:
+        lines = [
+            "# HELP stockpred_stage_seconds Wall-clock time per pipeline stage.",
+            "# TYPE stockpred_stage_seconds histogram",
+        ]
+        with self._lock:
+            histograms = {k: dict(v, buckets=list(v["buckets"])) for k, v in self._histograms.items()}
+        for (stage, engine), hist in sorted(histograms.items()):
+            labels = f'stage="{stage}",engine="{engine}"'
+            for bound, count in zip(BUCKETS, hist["buckets"]):
+                lines.append(f'stockpred_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'stockpred_stage_seconds_bucket{{{labels},le="+Inf"}} {hist["count"]}')
+            lines.append(f"stockpred_stage_seconds_sum{{{labels}}} {hist['sum']:.6f}")
+            lines.append(f"stockpred_stage_seconds_count{{{labels}}} {hist['count']}")
+        lines += [
+            "# HELP stockpred_stage_cpu_seconds_total CPU time of the calling thread per pipeline stage.",
+            "# TYPE stockpred_stage_cpu_seconds_total counter",
+        ]
+        for (stage, engine), hist in sorted(histograms.items()):
+            lines.append(f'stockpred_stage_cpu_seconds_total{{stage="{stage}",engine="{engine}"}} {hist["cpu"]:.6f}')
+        # Imported here: singleflight sits above this module
+        from stockpred.singleflight import flight_stats
+
+        flights = flight_stats()
+        lines += [
+            "# HELP stockpred_singleflight_calls_total Calls per coalescing flight: answered by the lookup (hit),"
+            " leading a computation (miss) or waiting on one (coalesced).",
+            "# TYPE stockpred_singleflight_calls_total counter",
+        ]
+        for stats in flights:
+            for field, outcome in FLIGHT_OUTCOMES.items():
+                lines.append(f'stockpred_singleflight_calls_total{{flight="{stats["name"]}",outcome="{outcome}"}} {stats[field]}')
+        lines += [
+            "# HELP stockpred_singleflight_inflight Computations currently running per coalescing flight.",
+            "# TYPE stockpred_singleflight_inflight gauge",
+        ]
+        for stats in flights:
+            lines.append(f'stockpred_singleflight_inflight{{flight="{stats["name"]}"}} {stats["inflight"]}')
+        peak = peak_rss_bytes()
+        if peak is not None:
+            lines += [
+                "# HELP stockpred_peak_rss_bytes Peak resident set size of the process.",
+                "# TYPE stockpred_peak_rss_bytes gauge",
+                f"stockpred_peak_rss_bytes {peak}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+RECORDER = Recorder()
+
+
+@contextmanager
+def labels(**values):
+    token = _labels.set({**_labels.get(), **{k: v for k, v in values.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+@contextmanager
+def trace(stage: str, **values):
+    # Times the block and records it even when it raises (status="error")
+    span = {"stage": stage, **_labels.get(), **{k: v for k, v in values.items() if v is not None}}
+    rss_before = peak_rss_bytes()
+    wall0, cpu0 = time.perf_counter(), time.thread_time()
+    status = "ok"
+    try:
+        yield span
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        span["wall"] = time.perf_counter() - wall0
+        span["cpu"] = time.thread_time() - cpu0
+        span["peak_rss"] = peak_rss_bytes()
+        span["rss_growth"] = span["peak_rss"] - rss_before if rss_before is not None else None
+        span["status"] = status
+        span["ts"] = time.time()
+        RECORDER.add(span)
+        log.info(json.dumps(span, default=str))
+
+
+# -----------------------------
+# Prometheus text endpoint
+# -----------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = RECORDER.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="stockpred-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,83 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import holidays
+import numpy as np
+import pandas as pd
+
+from stockpred.resolution import DAILY, bar_dates, infer_resolution
+
+log = logging.getLogger(__name__)
+
+DEFAULT_EXCHANGE = "NYSE"
+ALWAYS_OPEN = "24/7"
+# Yahoo Finance ticker suffix -> exchange calendar code in ``holidays.financial_holidays``
+SUFFIX_EXCHANGES = {
+    ".AX": "XASX", ".BA": "XBUE", ".BO": "XBOM", ".DE": "XETR", ".F": "XFRA", ".HK": "XHKG",
+    ".IS": "XIST", ".JO": "XJSE", ".KS": "XKRX", ".L": "XLON", ".MC": "XMAD", ".MX": "XMEX",
+    ".NS": "XNSE", ".NZ": "XNZE", ".SA": "BVMF", ".SI": "XSES", ".SS": "XSHG", ".SW": "XSWX",
+    ".SZ": "XSHE", ".T": "XJPX", ".TO": "XTSE", ".TW": "XTAI", ".WA": "XWAR",
+}
+# Calendars are built once per exchange over this span and sliced afterwards
+FIRST_YEAR, LAST_YEAR = 1970, 2100
+
+
+def exchange_for_ticker(ticker: Optional[str]) -> str:
+    if not ticker:
+        return DEFAULT_EXCHANGE
+    ticker = ticker.upper()
+    if ticker.endswith("-USD"):  # crypto pairs trade every day
+        return ALWAYS_OPEN
+    for suffix, exchange in SUFFIX_EXCHANGES.items():
+        if ticker.endswith(suffix):
+            return exchange
+    return DEFAULT_EXCHANGE
+
+
+@lru_cache(maxsize=None)
+def _sessions(exchange: str) -> np.ndarray:
+    # Sorted datetime64[ns] of every session day from FIRST_YEAR through LAST_YEAR
+    start, end = f"{FIRST_YEAR}-01-01", f"{LAST_YEAR}-12-31"
+    if exchange == ALWAYS_OPEN:
+        return pd.date_range(start, end, freq="D").to_numpy()
+    days = pd.bdate_range(start, end)
+    try:
+        closed = holidays.financial_holidays(exchange, years=range(FIRST_YEAR, LAST_YEAR + 1))
+    except NotImplementedError:
+        # Older ``holidays`` releases lack some exchange calendars; weekdays are the closest guess
+        log.warning("No %s holiday calendar in holidays %s; using weekdays", exchange, holidays.__version__)
+        return days.to_numpy()
+    closed = pd.DatetimeIndex(list(closed))
+    return days[~days.isin(closed)].to_numpy()
+
+
+def trading_days(start, end, exchange: str = DEFAULT_EXCHANGE) -> pd.DatetimeIndex:
+    """Session days in ``[start, end)`` for ``exchange`` (weekends and exchange holidays removed)."""
+    sessions = _sessions(exchange)
+    lo = np.searchsorted(sessions, np.datetime64(pd.Timestamp(start)), side="left")
+    hi = np.searchsorted(sessions, np.datetime64(pd.Timestamp(end)), side="left")
+    return pd.DatetimeIndex(sessions[lo:hi])
+
+
+def future_trading_days(last, periods: int, exchange: str = DEFAULT_EXCHANGE) -> pd.DatetimeIndex:
+    # The horizon stays ``periods`` calendar days; only non-session days are dropped
+    last = pd.Timestamp(last).normalize()
+    return trading_days(last + pd.Timedelta(days=1), last + pd.Timedelta(days=int(periods) + 1), exchange)
+
+
+def future_dates(history_ds: pd.Series, periods: int, exchange: str = DEFAULT_EXCHANGE) -> pd.DatetimeIndex:
+    # Session days of the next ``periods`` calendar days, or bar dates when the history is weekly / monthly bars
+    history = pd.to_datetime(pd.Series(history_ds))
+    resolution = infer_resolution(history)
+    if resolution == DAILY:
+        return future_trading_days(history.max(), periods, exchange)
+    return bar_dates(history.max(), periods, resolution)
+
+
+def future_frame(history_ds: pd.Series, periods: int, exchange: str = DEFAULT_EXCHANGE) -> pd.DataFrame:
+    # History dates followed by the future dates of the next ``periods`` calendar days
+    history = pd.to_datetime(pd.Series(history_ds)).drop_duplicates().sort_values()
+    future = future_dates(history, periods, exchange)
+    return pd.DataFrame({"ds": np.concatenate([history.to_numpy(), future.to_numpy()])})
+
@@ -0,0 +1,51 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+from stockpred.cache_backend import CacheBackend, LocalBackend, open_backend
+
+
+def params_digest(params: Optional[dict]) -> str:
+    # Short, stable tag for a parameter overlay; "" for engine defaults
+    if not params:
+        return ""
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+class TunedParamsStore:
+    """Per-ticker sweep winners: the hyperparameters that override an engine's defaults.
+
+    Written by ``python -m stockpred sweep`` and read on every forecast, so the
+    app, the batch job and the HTTP API pick up a winner without configuration.
+    """
+
+    def __init__(self, root: Optional[Path] = None, *, backend: Optional[CacheBackend] = None):
+        if backend is None:
+            backend = LocalBackend(root) if root is not None else open_backend("params")
+        self.backend = backend
+
+    @staticmethod
+    def _key(ticker: str, engine: str) -> str:
+        return f"{ticker}/{engine}.json"
+
+    def get_record(self, ticker: str, engine: str) -> Optional[dict]:
+        payload = self.backend.get(self._key(ticker, engine))
+        if payload is None:
+            return None
+        try:
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def get(self, ticker: str, engine: str) -> Optional[dict]:
+        record = self.get_record(ticker, engine)
+        return record.get("params") if record else None
+
+    def put(self, ticker: str, engine: str, params: dict, **details):
+        record = {"ticker": ticker, "engine": engine, "params": params, "created": time.time(), **details}
+        self.backend.put(self._key(ticker, engine), json.dumps(record, default=str).encode("utf-8"))
+
+    def delete(self, ticker: str, engine: str):
+        self.backend.delete(self._key(ticker, engine))
@@ -0,0 +1,216 @@
+"""Cache backends and their distributed locks.
+
+The Redis tests need a server: set ``STOCKPRED_TEST_REDIS_URL`` (default
+``redis://localhost:6379/15``); they are skipped when it cannot be reached.
+"""
+import os
+import threading
+import time
+import uuid
+
+import pytest
+
+from stockpred.cache_backend import CacheBackend, DistributedLock, LocalBackend, LockTimeout
+
+REDIS_URL_ENV_VAR = "STOCKPRED_TEST_REDIS_URL"
+
+
+def test_backends_are_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+    with pytest.raises(TypeError):
+        DistributedLock("name", ttl=1.0, timeout=1.0)
+
+
+def test_local_roundtrip(tmp_path):
+    backend = LocalBackend(tmp_path)
+    backend.put("a/b.bin", b"one")
+    backend.put("a/c.bin", b"two!")
+    assert backend.get("a/b.bin") == b"one"
+    assert sorted(backend.keys("a/")) == ["a/b.bin", "a/c.bin"]
+    assert sorted((key, size) for key, size, _ in backend.entries()) == [("a/b.bin", 3), ("a/c.bin", 4)]
+    backend.delete_prefix("a/")
+    assert backend.get("a/b.bin") is None
+
+
+def test_file_lock_excludes_other_holders(tmp_path):
+    backend = LocalBackend(tmp_path)
+    with backend.lock("fit", ttl=30.0, timeout=1.0):
+        with pytest.raises(LockTimeout):
+            backend.lock("fit", ttl=30.0, timeout=0.2).acquire()
+        # Other names are independent
+        with backend.lock("other", ttl=30.0, timeout=0.2):
+            pass
+    with backend.lock("fit", ttl=30.0, timeout=0.2):
+        pass
+
+
+def test_file_lock_waiter_gets_it_after_release(tmp_path):
+    backend = LocalBackend(tmp_path)
+    order = []
+    holder = backend.lock("fit", ttl=30.0, timeout=1.0)
+    holder.acquire()
+
+    def wait():
+        with backend.lock("fit", ttl=30.0, timeout=5.0):
+            order.append("waiter")
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    time.sleep(0.3)
+    order.append("holder")
+    holder.release()
+    thread.join(5.0)
+    assert order == ["holder", "waiter"]
+
+
+def test_heartbeat_keeps_a_long_hold_alive(tmp_path):
+    # Held for three ttls: without the heartbeat the lock file would look stale and be broken
+    backend = LocalBackend(tmp_path)
+    ttl = 0.6
+    with backend.lock("fit", ttl=ttl, timeout=1.0) as held:
+        with pytest.raises(LockTimeout):
+            backend.lock("fit", ttl=ttl, timeout=3 * ttl).acquire()
+        assert held.path.read_text() == held.token
+
+
+def test_stale_lock_is_broken(tmp_path):
+    backend = LocalBackend(tmp_path)
+    crashed = backend.lock("fit", ttl=0.5, timeout=1.0)
+    # A holder that died: its lock file exists but is never refreshed
+    crashed.path.write_text(crashed.token)
+    past = time.time() - 10
+    os.utime(crashed.path, (past, past))
+
+    with backend.lock("fit", ttl=0.5, timeout=2.0) as taken:
+        assert taken.path.read_text() == taken.token
+        # The old holder's late release must not remove the new holder's lock
+        crashed.release()
+        assert taken.path.exists()
+    assert not taken.path.exists()
+
+
+def test_concurrent_waiters_on_a_stale_lock_take_turns(tmp_path):
+    backend = LocalBackend(tmp_path)
+    crashed = backend.lock("fit", ttl=5.0, timeout=1.0)
+    crashed.path.write_text(crashed.token)
+    past = time.time() - 60
+    os.utime(crashed.path, (past, past))
+
+    inside, overlaps, done = [], [], []
+    guard = threading.Lock()
+
+    def work():
+        with backend.lock("fit", ttl=5.0, timeout=20.0):
+            with guard:
+                inside.append(1)
+                overlaps.append(len(inside))
+            time.sleep(0.02)
+            with guard:
+                inside.pop()
+        done.append(1)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30.0)
+    assert len(done) == 8
+    assert max(overlaps) == 1
+    assert not list((tmp_path / ".locks").glob("*.tmp"))
+
+
+def test_late_breaker_puts_back_a_fresh_lock(tmp_path):
+    # Two waiters saw the same stale lock; the first broke it and now holds a new one
+    backend = LocalBackend(tmp_path)
+    crashed = backend.lock("fit", ttl=0.5, timeout=1.0)
+    crashed.path.write_text(crashed.token)
+    past = time.time() - 10
+    os.utime(crashed.path, (past, past))
+    late = backend.lock("fit", ttl=0.5, timeout=1.0)
+    stale_view = late._read(late.path)
+
+    with backend.lock("fit", ttl=0.5, timeout=2.0) as first:
+        reads = [stale_view]
+        original_read = late._read
+        late._read = lambda path: reads.pop() if reads else original_read(path)
+        late._break_if_stale()
+        assert first.path.read_text() == first.token
+        assert not list(first.path.parent.glob("*.tmp"))
+
+
+def test_release_after_takeover_keeps_the_new_lock(tmp_path):
+    # The old holder checked ownership just before its lock was broken and taken over
+    backend = LocalBackend(tmp_path)
+    old = backend.lock("fit", ttl=0.5, timeout=1.0)
+    old.path.write_text(old.token)
+    past = time.time() - 10
+    os.utime(old.path, (past, past))
+    with backend.lock("fit", ttl=0.5, timeout=2.0) as new:
+        old._owned = lambda: True
+        old._release()
+        assert new.path.read_text() == new.token
+
+
+def test_heartbeat_survives_refresh_errors(tmp_path, caplog):
+    backend = LocalBackend(tmp_path)
+    ttl = 0.3
+    held = backend.lock("fit", ttl=ttl, timeout=1.0)
+    calls = []
+    refresh = held._refresh
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("share unavailable")
+        return refresh()
+
+    held._refresh = flaky
+    with held:
+        time.sleep(4 * ttl)
+        assert held._heartbeat.is_alive()
+    assert len(calls) >= 3
+    assert "Could not refresh lock 'fit'" in caplog.text
+
+
+@pytest.fixture
+def redis_backend():
+    redis = pytest.importorskip("redis")
+    from stockpred.cache_backend import RedisBackend
+
+    url = os.environ.get(REDIS_URL_ENV_VAR, "redis://localhost:6379/15")
+    backend = RedisBackend(url, namespace=f"test-{uuid.uuid4().hex[:8]}")
+    try:
+        backend.client.ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip(f"no Redis server at {url}")
+    yield backend
+    backend.delete_prefix("")
+
+
+def test_redis_roundtrip(redis_backend):
+    redis_backend.put("a/b.bin", b"one")
+    redis_backend.put("a/c.bin", b"two!")
+    assert redis_backend.get("a/b.bin") == b"one"
+    assert redis_backend.exists("a/c.bin")
+    assert sorted(redis_backend.keys("a/")) == ["a/b.bin", "a/c.bin"]
+    assert sorted((key, size) for key, size, _ in redis_backend.entries("a/")) == [("a/b.bin", 3), ("a/c.bin", 4)]
+    redis_backend.delete_prefix("a/")
+    assert redis_backend.get("a/b.bin") is None
+
+
+def test_redis_lock(redis_backend):
+    ttl = 0.6
+    with redis_backend.lock("fit", ttl=ttl, timeout=1.0) as held:
+        # The heartbeat extends the expiry past several ttls
+        with pytest.raises(LockTimeout):
+            redis_backend.lock("fit", ttl=ttl, timeout=3 * ttl).acquire()
+        assert redis_backend.client.get(held.key) == held.token.encode()
+    assert redis_backend.client.get(held.key) is None
+
+    crashed = redis_backend.lock("fit", ttl=ttl, timeout=1.0)
+    assert crashed._try_acquire()
+    # Never refreshed, so it expires after ttl and the next holder gets it
+    with redis_backend.lock("fit", ttl=ttl, timeout=3 * ttl) as taken:
+        crashed.release()
+        assert redis_backend.client.get(taken.key) == taken.token.encode()
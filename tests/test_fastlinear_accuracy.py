@@ -0,0 +1,43 @@
+"""The fast linear engine tracks Prophet on the deterministic synthetic fixtures.
+
+Same measurements as ``python -m benchmarks.fastlinear_accuracy`` (8 years of
+training, 252 held-out sessions); the fixtures are generated into a temporary
+directory so recorded prices never change the numbers.
+"""
+import pytest
+
+pytest.importorskip("prophet")
+
+from benchmarks.fastlinear_accuracy import run  # noqa: E402
+
+TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN"]
+
+
+@pytest.fixture(scope="module")
+def report(tmp_path_factory):
+    return run(TICKERS, years=8, horizon=252, fixtures=tmp_path_factory.mktemp("fixtures"))
+
+
+def test_tracks_prophet_in_sample(report):
+    assert report["mean"]["in_sample_mape_vs_prophet"] < 5.0
+    for row in report["per_ticker"]:
+        assert row["in_sample_mape_vs_prophet"] < 7.5, row["ticker"]
+
+
+def test_tracks_prophet_over_the_horizon(report):
+    assert report["mean"]["horizon_mape_vs_prophet"] < 12.5
+    for row in report["per_ticker"]:
+        assert row["horizon_mape_vs_prophet"] < 20.0, row["ticker"]
+
+
+def test_components_follow_prophet(report):
+    assert report["mean"]["trend_corr"] > 0.85
+    assert report["mean"]["yearly_corr"] > 0.95
+    for row in report["per_ticker"]:
+        assert row["trend_corr"] > 0.75, row["ticker"]
+        assert row["yearly_corr"] > 0.9, row["ticker"]
+
+
+def test_holdout_error_close_to_prophet(report):
+    mean = report["mean"]
+    assert mean["fastlinear_holdout_mape"] < mean["prophet_holdout_mape"] + 10.0
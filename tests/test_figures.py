@@ -0,0 +1,35 @@
+"""Point budgets of the app's charts."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockpred.figures import downsample, lttb_indices
+
+
+@pytest.mark.parametrize("n, n_out", [(10_000, 1800), (2001, 2000), (3000, 2000), (50, 3)])
+def test_lttb_keeps_endpoints_and_the_budget(n, n_out):
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=n).cumsum()
+    idx = lttb_indices(np.arange(n), y, n_out)
+    assert len(idx) == n_out
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert (np.diff(idx) > 0).all()
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(5000)
+    y[1234] = 100.0
+    assert 1234 in lttb_indices(np.arange(5000), y, 500)
+
+
+def test_series_within_the_budget_are_untouched():
+    np.testing.assert_array_equal(lttb_indices(np.arange(100), np.arange(100.0), 100), np.arange(100))
+    np.testing.assert_array_equal(lttb_indices(np.arange(100), np.arange(100.0), 2), np.arange(100))
+
+
+def test_downsample_follows_dates():
+    df = pd.DataFrame({"ds": pd.date_range("2000-01-01", periods=4000), "y": np.sin(np.arange(4000) / 50)})
+    out = downsample(df, "ds", "y", 1000)
+    assert len(out) == 1000
+    assert out["ds"].iloc[0] == df["ds"].iloc[0] and out["ds"].iloc[-1] == df["ds"].iloc[-1]
+    assert downsample(df, "ds", "y", 5000) is df
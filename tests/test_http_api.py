@@ -0,0 +1,85 @@
+"""Forecast responses and their ETags, driven through the ASGI interface."""
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockpred.forecast_store import ForecastStore
+from stockpred.http_api import create_app
+from stockpred.model_store import ModelStore
+from stockpred.price_store import FixtureProvider, PriceStore
+from stockpred.tuned_params import TunedParamsStore
+
+FORECAST = "/forecast/TEST"
+QUERY = b"start=2020-01-01&end=2023-01-01&engine=fastlinear"
+
+
+def request(app, path: str, query: bytes = QUERY, headers: dict = None):
+    scope = {
+        "type": "http", "method": "GET", "path": path, "query_string": query,
+        "headers": [(k.encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, body = messages
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body["body"]
+
+
+@pytest.fixture
+def app(tmp_path):
+    days = pd.bdate_range("2020-01-01", "2022-12-30")
+    closes = 100 + np.sin(np.arange(len(days)) / 20) * 5
+    pd.DataFrame(
+        {"Date": days, "Close": closes, "High": closes, "Low": closes, "Open": closes, "Volume": 1.0}
+    ).to_csv(tmp_path / "TEST.csv", index=False)
+    app = create_app(
+        companies={"Test Corp": "TEST"},
+        prices=PriceStore(tmp_path / "prices", FixtureProvider(tmp_path)),
+        models=ModelStore(tmp_path / "models"),
+        forecasts=ForecastStore(tmp_path / "forecasts"),
+        tuned=TunedParamsStore(tmp_path / "params"),
+        fit_workers=1,
+    )
+    yield app
+    app.shutdown()
+
+
+def test_etag_round_trip(app):
+    status, headers, body = request(app, FORECAST)
+    assert status == 200 and headers["x-forecast-source"] == "fit"
+    etag = headers["etag"]
+    assert etag.startswith('W/"')
+    assert json.loads(body)["columns"] == ["ds", "yhat", "yhat_lower", "yhat_upper"]
+
+    status, headers, body = request(app, FORECAST, headers={"If-None-Match": etag})
+    assert (status, headers["etag"], body) == (304, etag, b"")
+    # Weak comparison, and any tag of a list
+    assert request(app, FORECAST, headers={"If-None-Match": f'"other", {etag[2:]}'})[0] == 304
+
+    status, headers, _ = request(app, FORECAST)
+    assert (status, headers["etag"], headers["x-forecast-source"]) == (200, etag, "store")
+
+
+def test_etag_follows_the_forecast(app):
+    etag = request(app, FORECAST)[1]["etag"]
+    # Another horizon is another forecast
+    status, headers, _ = request(app, FORECAST, QUERY + b"&horizon=2", headers={"If-None-Match": etag})
+    assert status == 200 and headers["etag"] != etag
+    # So is a new sweep winner for the ticker
+    app.tuned.put("TEST", "fastlinear", {"yearly_seasonality": 4})
+    status, headers, _ = request(app, FORECAST, headers={"If-None-Match": etag})
+    assert status == 200 and headers["etag"] != etag
+
+
+def test_unknown_ticker_is_404(app):
+    status, _, body = request(app, "/forecast/NOPE")
+    assert status == 404 and json.loads(body) == {"detail": "Unknown ticker 'NOPE'; see /tickers."}
@@ -0,0 +1,91 @@
+"""Job table: deduplication, owners and cancellation."""
+import threading
+import time
+
+from stockpred.jobs import CANCELLED, DONE, FAILED, JobManager
+
+
+def wait_done(job, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.done
+
+
+def blocking_work(started: threading.Event, release: threading.Event, calls: list):
+    # A job that reports progress until released, so it can be cancelled mid-run
+    def work(job):
+        calls.append(job.key)
+        started.set()
+        while not release.wait(0.01):
+            job.report(0.5, "Fitting")
+        return "forecast"
+
+    return work
+
+
+def test_identical_requests_share_one_job():
+    jobs = JobManager(max_workers=2)
+    started, release, calls = threading.Event(), threading.Event(), []
+    work = blocking_work(started, release, calls)
+    first = jobs.submit("key", work, owner="a")
+    second = jobs.submit("key", work, owner="b")
+    assert first is second and first.owners == {"a", "b"}
+    started.wait(5.0)
+    release.set()
+    wait_done(first)
+    assert (first.status, first.result, calls) == (DONE, "forecast", ["key"])
+    # A finished job is still returned to later callers
+    assert jobs.submit("key", work) is first
+
+
+def test_fresh_replaces_a_done_job():
+    jobs = JobManager()
+    first = jobs.submit("key", lambda job: 1)
+    wait_done(first)
+    again = jobs.submit("key", lambda job: 2, fresh=True)
+    assert again is not first
+    wait_done(again)
+    assert again.result == 2
+
+
+def test_fresh_joins_a_running_job():
+    jobs = JobManager()
+    started, release, calls = threading.Event(), threading.Event(), []
+    running = jobs.submit("key", blocking_work(started, release, calls))
+    started.wait(5.0)
+    assert jobs.submit("key", lambda job: 2, fresh=True) is running
+    release.set()
+    wait_done(running)
+    assert running.result == "forecast"
+
+
+def test_job_is_cancelled_when_its_last_owner_leaves():
+    jobs = JobManager()
+    started, release, calls = threading.Event(), threading.Event(), []
+    job = jobs.submit("key", blocking_work(started, release, calls), owner="a")
+    jobs.submit("key", blocking_work(started, release, calls), owner="b")
+    started.wait(5.0)
+    jobs.release("key", "a")
+    assert not job.cancelled
+    jobs.release("key", "b")
+    wait_done(job)
+    assert job.status == CANCELLED
+    # A cancelled job is resubmitted rather than shared
+    assert jobs.submit("key", lambda job: 1) is not job
+
+
+def test_cancel_before_start_and_failures():
+    jobs = JobManager(max_workers=1)
+    started, release, calls = threading.Event(), threading.Event(), []
+    busy = jobs.submit("busy", blocking_work(started, release, calls))
+    queued = jobs.submit("queued", blocking_work(started, release, calls))
+    started.wait(5.0)
+    jobs.cancel("queued")
+    assert queued.status == CANCELLED and calls == ["busy"]
+
+    failing = jobs.submit("failing", lambda job: 1 / 0)
+    release.set()
+    wait_done(busy)
+    wait_done(failing)
+    assert failing.status == FAILED and isinstance(failing.error, ZeroDivisionError)
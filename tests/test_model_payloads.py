@@ -0,0 +1,68 @@
+"""Model store payloads load without unpickling arbitrary objects.
+
+The cache backend may be a shared Redis or directory, so a payload written by
+someone else must fail to load rather than run code.
+"""
+import io
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockpred.fastlinear import FASTLINEAR_PARAMS, dump_fastlinear, fit_fastlinear, load_fastlinear, predict_fastlinear
+
+EXECUTED = []
+
+
+def _payload_ran():
+    EXECUTED.append(True)
+
+
+class Exploit:
+    def __reduce__(self):
+        return _payload_ran, ()
+
+
+def training_frame(days: int = 600) -> pd.DataFrame:
+    ds = pd.bdate_range("2020-01-01", periods=days)
+    t = np.arange(days)
+    y = 100 + 0.05 * t + 3 * np.sin(2 * np.pi * t / 252)
+    return pd.DataFrame({"ds": ds, "y": y.astype("float32")})
+
+
+def test_fastlinear_roundtrip():
+    df = training_frame()
+    model = fit_fastlinear(df, {**FASTLINEAR_PARAMS, "yearly_seasonality": np.int64(6)})
+    loaded = load_fastlinear(dump_fastlinear(model))
+    assert loaded.yearly_seasonality == 6
+    pd.testing.assert_frame_equal(predict_fastlinear(model, df, 90), predict_fastlinear(loaded, df, 90))
+
+
+def test_fastlinear_refuses_pickles():
+    with pytest.raises(ValueError):
+        load_fastlinear(pickle.dumps(Exploit()))
+    assert not EXECUTED
+
+
+def test_neuralprophet_roundtrip_and_refuses_pickles():
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("neuralprophet")
+    from stockpred.neuralprophet_engine import (
+        NEURALPROPHET_PARAMS, dump_neuralprophet, fit_neuralprophet, load_neuralprophet, predict_neuralprophet,
+    )
+
+    df = training_frame(300)
+    # Runs the learning-rate finder, whose checkpoint reload takes torch's weights-only default
+    model = fit_neuralprophet(df, {**NEURALPROPHET_PARAMS, "epochs": 2})
+    loaded = load_neuralprophet(dump_neuralprophet(model))
+    assert loaded.model.learning_rate == model.model.learning_rate
+    expected = predict_neuralprophet(model, df, 30)["yhat1"].to_numpy(dtype=float)
+    actual = predict_neuralprophet(loaded, df, 30)["yhat1"].to_numpy(dtype=float)
+    np.testing.assert_allclose(actual, expected, rtol=1e-5)
+
+    buf = io.BytesIO()
+    torch.save({"forecaster": Exploit()}, buf)
+    with pytest.raises(pickle.UnpicklingError):
+        load_neuralprophet(buf.getvalue())
+    assert not EXECUTED
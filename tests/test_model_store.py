@@ -0,0 +1,96 @@
+"""Model store hits, size-bounded eviction and warm-start prefix lookup."""
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from stockpred.model_store import ModelStore
+
+
+class BytesEngine:
+    # Stands in for an engine: the "model" is its payload
+    name = "fake"
+
+    @staticmethod
+    def dump(model) -> bytes:
+        return model
+
+    @staticmethod
+    def load(payload: bytes):
+        return payload
+
+
+def prices(days: int) -> pd.DataFrame:
+    return pd.DataFrame({"ds": pd.bdate_range("2020-01-01", periods=days), "y": np.arange(days, dtype="float32")})
+
+
+def test_saved_model_is_a_hit_in_a_new_store(tmp_path):
+    df, params = prices(100), {"a": 1}
+    store = ModelStore(tmp_path)
+    key = store.key("fake", df, params)
+    assert store.load_model(key, BytesEngine) is None
+    store.save_model(key, BytesEngine, b"fitted", ticker="AAPL", df=df, params=params)
+
+    fresh = ModelStore(tmp_path)
+    assert fresh.load_model(key, BytesEngine) == b"fitted"
+    assert fresh.key("fake", df, {"a": 2}) != key
+    forecast = pd.DataFrame({"ds": df["ds"], "yhat": df["y"]})
+    fresh.save_forecast(key, 30, forecast)
+    pd.testing.assert_frame_equal(ModelStore(tmp_path).load_forecast(key, 30), forecast)
+    assert fresh.load_forecast(key, 60) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    store = ModelStore(tmp_path, max_memory_items=0)
+    keys = []
+    for days in (100, 101, 102):
+        df = prices(days)
+        key = store.key("fake", df, {})
+        store.save_model(key, BytesEngine, b"x" * 1000, ticker="AAPL", df=df, params={})
+        keys.append(key)
+        # Entries are ordered by meta.json mtime; keep the saves apart
+        past = time.time() - 1000 + days
+        os.utime(tmp_path / key / "meta.json", (past, past))
+    # Each entry is over 1 KB, so only the newest fits under the limit
+    store.max_bytes = 2000
+    store.evict()
+    assert [store.load_model(key, BytesEngine) is not None for key in keys] == [False, False, True]
+    index = json.loads((tmp_path / "index" / "fake" / "AAPL.json").read_text())
+    assert [entry["key"] for entry in index] == [keys[2]]
+
+
+def test_find_prefix_picks_the_longest_matching_prefix(tmp_path):
+    store = ModelStore(tmp_path)
+    full, params = prices(110), {"a": 1}
+    saved = {}
+    for days in (95, 100, 105):
+        df = full.iloc[:days]
+        saved[days] = store.key("fake", df, params)
+        store.save_model(saved[days], BytesEngine, b"fit", ticker="AAPL", df=df, params=params)
+    # Same rows, other parameters: never a warm start for these params
+    store.save_model(store.key("fake", full.iloc[:108], {}), BytesEngine, b"fit", ticker="AAPL",
+                     df=full.iloc[:108], params={})
+
+    assert store.find_prefix("fake", "AAPL", full, params) == saved[105]
+    assert store.find_prefix("fake", "MSFT", full, params) is None
+    # Prices revised inside the old window: the stored digests no longer match
+    revised = full.assign(y=full["y"] + 1)
+    assert store.find_prefix("fake", "AAPL", revised, params) is None
+    # More than max_growth new rows
+    assert store.find_prefix("fake", "AAPL", full, params, max_growth=0.01) is None
+
+
+def test_find_prefix_skips_and_prunes_deleted_models(tmp_path):
+    store = ModelStore(tmp_path)
+    full = prices(110)
+    keys = {}
+    for days in (100, 105):
+        keys[days] = store.key("fake", full.iloc[:days], {})
+        store.save_model(keys[days], BytesEngine, b"fit", ticker="AAPL", df=full.iloc[:days], params={})
+    store.backend.delete_prefix(f"{keys[105]}/")
+
+    assert store.find_prefix("fake", "AAPL", full, {}) == keys[100]
+    index = json.loads((tmp_path / "index" / "fake" / "AAPL.json").read_text())
+    assert [entry["key"] for entry in index] == [keys[100]]
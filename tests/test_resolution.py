@@ -0,0 +1,59 @@
+"""Weekly and monthly training bars."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockpred.resolution import (
+    AUTO, DAILY, MONTHLY, WEEKLY, bar_dates, choose_resolution, infer_resolution, resample_bars, resolve,
+)
+
+
+def daily_prices(start: str, end: str) -> pd.DataFrame:
+    days = pd.bdate_range(start, end)
+    n = len(days)
+    return pd.DataFrame({
+        "Date": days, "Open": np.arange(n, dtype=float), "High": np.arange(n) + 10.0,
+        "Low": np.arange(n) - 10.0, "Close": np.arange(n) + 0.5, "Volume": np.ones(n),
+    })
+
+
+def test_weekly_bars_aggregate_ohlc_and_end_on_friday():
+    # Mon 2024-01-01 .. Wed 2024-01-17: two full weeks and a partial one
+    bars = resample_bars(daily_prices("2024-01-01", "2024-01-17"), WEEKLY)
+    assert list(bars["Date"]) == [pd.Timestamp("2024-01-05"), pd.Timestamp("2024-01-12"), pd.Timestamp("2024-01-17")]
+    first = bars.iloc[0]
+    assert (first["Open"], first["High"], first["Low"], first["Close"], first["Volume"]) == (0, 14, -10, 4.5, 5)
+    assert bars["Volume"].tolist() == [5, 5, 3]
+    assert infer_resolution(resample_bars(daily_prices("2023-01-02", "2024-01-17"), WEEKLY)["Date"]) == WEEKLY
+
+
+def test_monthly_bars_of_a_training_frame():
+    prices = daily_prices("2023-01-02", "2024-03-13")
+    frame = pd.DataFrame({"ds": prices["Date"], "y": prices["Close"].astype("float32")})
+    bars = resample_bars(frame, MONTHLY)
+    assert list(bars.columns) == ["ds", "y"]
+    assert bars["ds"].iloc[0] == pd.Timestamp("2023-01-31")
+    # The open month is dated at its last observed day, not at the month end
+    assert bars["ds"].iloc[-1] == pd.Timestamp("2024-03-13")
+    assert bars["y"].iloc[-1] == frame["y"].iloc[-1]
+    assert len(bars) == 15
+    assert infer_resolution(bars["ds"]) == MONTHLY
+
+
+def test_daily_frames_and_missing_closes():
+    prices = daily_prices("2024-01-01", "2024-01-31")
+    assert resample_bars(prices, DAILY) is prices
+    # A week without any close is dropped
+    prices.loc[prices["Date"].between("2024-01-08", "2024-01-12"), "Close"] = np.nan
+    assert pd.Timestamp("2024-01-12") not in set(resample_bars(prices, WEEKLY)["Date"])
+
+
+def test_future_bar_dates_and_auto_resolution():
+    assert list(bar_dates("2024-01-17", 20, WEEKLY).strftime("%m-%d")) == ["01-19", "01-26", "02-02"]
+    assert list(bar_dates("2024-01-31", 62, MONTHLY).strftime("%m-%d")) == ["02-29", "03-31"]
+    history = pd.Series(pd.bdate_range("2010-01-01", "2024-01-01"))
+    assert choose_resolution(365, history) == DAILY
+    assert choose_resolution(3 * 365, history) == WEEKLY
+    assert resolve(AUTO, 10 * 365, history) == MONTHLY
+    with pytest.raises(ValueError):
+        resolve("hourly", 365, history)
@@ -0,0 +1,119 @@
+"""Coalescing of concurrent identical calls."""
+import threading
+import time
+import uuid
+
+import pytest
+
+from stockpred.jobs import JobCancelled
+from stockpred.singleflight import SingleFlight, flight_stats
+
+
+def new_flight() -> SingleFlight:
+    # A unique name keeps these counters apart from the process-wide totals of other flights
+    return SingleFlight(f"test-{uuid.uuid4().hex[:8]}")
+
+
+def run_concurrently(n: int, call) -> list:
+    results, errors = [None] * n, [None] * n
+
+    def worker(i):
+        try:
+            results[i] = call(i)
+        except BaseException as exc:
+            errors[i] = exc
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10.0)
+    return list(zip(results, errors))
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = new_flight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5.0)
+        return "forecast"
+
+    def call(i):
+        if i:
+            started.wait(5.0)
+        return flight.do("key", compute)
+
+    threading.Timer(0.3, release.set).start()
+    outcomes = run_concurrently(5, call)
+    assert calls == [1]
+    assert outcomes == [("forecast", None)] * 5
+    assert flight.stats() == {"name": flight.name, "hits": 0, "misses": 1, "coalesced": 4, "inflight": 0}
+
+
+def test_lookup_hits_skip_the_flight():
+    flight = new_flight()
+    assert flight.do("key", lambda: pytest.fail("computed despite a cached value"), lookup=lambda: "cached") == "cached"
+    assert flight.do("other", lambda: "fresh", lookup=lambda: None) == "fresh"
+    stats = flight.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_leader_failure_reaches_followers():
+    flight = new_flight()
+    started = threading.Event()
+
+    def compute():
+        started.set()
+        time.sleep(0.3)
+        raise ValueError("fit failed")
+
+    def call(i):
+        if i:
+            started.wait(5.0)
+        return flight.do("key", compute)
+
+    outcomes = run_concurrently(3, call)
+    assert all(isinstance(error, ValueError) for _, error in outcomes)
+    # The failed flight is gone: the next call computes again
+    assert flight.do("key", lambda: "retried") == "retried"
+
+
+def test_cancelled_leader_hands_over_to_a_follower():
+    flight = new_flight()
+    started = threading.Event()
+    calls = []
+
+    def compute(i):
+        calls.append(i)
+        if i == 0:
+            started.set()
+            time.sleep(0.3)
+            raise JobCancelled("key")
+        time.sleep(0.3)
+        return f"computed by {i}"
+
+    def call(i):
+        if i:
+            started.wait(5.0)
+        return flight.do("key", lambda: compute(i))
+
+    outcomes = run_concurrently(3, call)
+    assert isinstance(outcomes[0][1], JobCancelled)
+    # Followers never see the leader's cancellation; one of them leads the retry for both
+    followers = outcomes[1:]
+    assert all(error is None for _, error in followers)
+    assert len(calls) == 2 and calls[0] == 0
+    assert {result for result, _ in followers} == {f"computed by {calls[1]}"}
+
+
+def test_flight_stats_sum_instances_by_name():
+    name = f"test-{uuid.uuid4().hex[:8]}"
+    for flight in (SingleFlight(name), SingleFlight(name)):
+        flight.do("key", lambda: 1)
+        flight.do("key", lambda: 1, lookup=lambda: 1)
+    totals = next(stats for stats in flight_stats() if stats["name"] == name)
+    assert totals == {"name": name, "hits": 2, "misses": 2, "coalesced": 0, "inflight": 0}
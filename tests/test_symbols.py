@@ -0,0 +1,51 @@
+"""Prefix and fuzzy symbol search."""
+from stockpred.symbols import SymbolIndex, normalize
+
+COMPANIES = [
+    ("Apple Inc.", "AAPL"),
+    ("Applied Materials, Inc.", "AMAT"),
+    ("Alphabet Inc. Class A", "GOOGL"),
+    ("Alphabet Inc. Class C", "GOOG"),
+    ("Microsoft", "MSFT"),
+    ("Berkshire Hathaway Inc. Class B", "BRK-B"),
+    ("Nestlé S.A.", "NESN.SW"),
+    ("トヨタ自動車", "7203.T"),
+]
+
+
+def test_prefix_ranks_tickers_then_names():
+    index = SymbolIndex.build(COMPANIES)
+    assert index.prefix("aapl") == ["AAPL"]
+    # Shorter names first among name prefixes
+    assert index.prefix("app") == ["AAPL", "AMAT"]
+    # An exact ticker beats a longer ticker with the same prefix
+    assert index.prefix("goog")[:2] == ["GOOG", "GOOGL"]
+    # Later words of a name are searchable too
+    assert index.prefix("class") == ["GOOGL", "GOOG", "BRK-B"]
+    assert index.prefix("brk-b") == ["BRK-B"]
+    assert index.prefix("") == [ticker for _, ticker in COMPANIES]
+
+
+def test_fuzzy_tolerates_typos_and_word_order():
+    index = SymbolIndex.build(COMPANIES)
+    assert index.fuzzy("mircosoft")[0] == "MSFT"
+    assert index.fuzzy("hathaway berkshire")[0] == "BRK-B"
+    assert index.fuzzy("zzzz") == []
+    assert index.search("aplied materals") == ["AMAT"]
+
+
+def test_non_ascii_names_are_searchable():
+    index = SymbolIndex.build(COMPANIES)
+    assert normalize("Nestlé S.A.") == "nestle s.a."
+    assert index.prefix("nestle") == ["NESN.SW"]
+    assert index.prefix("Nestlé") == ["NESN.SW"]
+    assert index.prefix("トヨタ") == ["7203.T"]
+
+
+def test_saved_index_reads_back(tmp_path):
+    index = SymbolIndex.build(COMPANIES)
+    index.save(tmp_path / "index.npz")
+    loaded = SymbolIndex.read(tmp_path / "index.npz")
+    assert loaded.companies() == index.companies()
+    assert loaded.search("class") == index.search("class")
+    assert loaded.label("MSFT") == "Microsoft (MSFT)"
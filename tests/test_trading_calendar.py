@@ -0,0 +1,42 @@
+"""Session days around exchange holidays."""
+import pandas as pd
+
+from stockpred import trading_calendar
+from stockpred.trading_calendar import ALWAYS_OPEN, exchange_for_ticker, future_trading_days, trading_days
+
+
+def test_nyse_holidays_are_skipped():
+    days = trading_days("2024-06-17", "2024-07-09")
+    assert pd.Timestamp("2024-06-19") not in days  # Juneteenth
+    assert pd.Timestamp("2024-07-04") not in days  # Independence Day
+    assert pd.Timestamp("2024-07-05") in days
+    assert not (days.dayofweek >= 5).any()
+    # ``end`` is exclusive
+    assert days[-1] == pd.Timestamp("2024-07-08")
+
+
+def test_future_trading_days_span_calendar_days():
+    # From Christmas Eve through the New Year: two holidays and a weekend fall in the 10 days
+    future = future_trading_days("2024-12-23", 10)
+    assert list(future.strftime("%m-%d")) == ["12-24", "12-26", "12-27", "12-30", "12-31", "01-02"]
+
+
+def test_exchanges_by_suffix():
+    assert exchange_for_ticker("AAPL") == "NYSE"
+    assert exchange_for_ticker("bhp.ax") == "XASX"
+    assert exchange_for_ticker("BTC-USD") == ALWAYS_OPEN
+    assert len(trading_days("2024-01-01", "2024-01-08", ALWAYS_OPEN)) == 7
+
+
+def test_missing_exchange_calendar_falls_back_to_weekdays(monkeypatch, caplog):
+    def unsupported(*args, **kwargs):
+        raise NotImplementedError("Financial market calendar not supported")
+
+    trading_calendar._sessions.cache_clear()
+    monkeypatch.setattr(trading_calendar.holidays, "financial_holidays", unsupported)
+    try:
+        days = trading_days("2024-12-23", "2024-12-30", "XASX")
+    finally:
+        trading_calendar._sessions.cache_clear()
+    assert list(days) == list(pd.bdate_range("2024-12-23", "2024-12-27"))
+    assert "No XASX holiday calendar" in caplog.text